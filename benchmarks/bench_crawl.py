@@ -0,0 +1,162 @@
+# benchmarks/bench_crawl.py
+"""Crawl complet d'un site synthétique local, sans accès réseau.
+
+Démarre benchmarks.site_server dans un processus séparé, lance SafeCrawler
+(ou AsyncCrawler) de bout en bout sur ce site, puis ajoute une ligne JSON de
+résultats (pages/s, pic de mémoire, CPU par page, requêtes reçues) au fichier
+de résultats, pour comparer les versions entre elles.
+
+Usage:
+    python -m benchmarks.bench_crawl --pages 2000 --latency 0.01 --workers 8
+"""
+import copy
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+import click
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.site_server import SiteOptions, serve
+from src.utils import load_config
+from src.session import SafeSession
+from src.extractors import ContentExtractor
+from src.processors import URLProcessor
+from src.crawler import SafeCrawler
+from src.async_crawler import AsyncCrawler
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def bench_config(base, port, pages, workers):
+    """Configuration du dépôt adaptée au site local: pas de délai de politesse, pas de limite de pages"""
+    config = copy.deepcopy(base)
+    config['domain'] = {'name': '127.0.0.1', 'start_url': f"http://127.0.0.1:{port}/page/0"}
+    config['crawler'].update({
+        'max_workers': workers,
+        'max_pages': pages * 10,
+        'delay_min': 0,
+        'delay_max': 0,
+        'per_host_concurrency': workers,
+        'async_concurrency': workers,
+    })
+    config['timeouts'].update({'backoff_base': 0.05, 'backoff_max': 0.5})
+    config.setdefault('metrics', {})['enabled'] = False
+    config.setdefault('logging', {})['banner'] = False
+    return config
+
+
+def cpu_seconds():
+    """Temps CPU (utilisateur + système) du processus et de ses enfants terminés"""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime, children.ru_utime + children.ru_stime
+
+
+def run_crawl(config, engine, output_dir):
+    session = SafeSession.create(config)
+    crawler_class = AsyncCrawler if engine == 'async' else SafeCrawler
+    crawler = crawler_class(config, session, ContentExtractor(config), URLProcessor(config), output_dir)
+    try:
+        crawler.crawl()
+        crawler.save_state()
+    finally:
+        crawler.close()
+    return len(crawler.seen_urls)
+
+
+@click.command()
+@click.option('--pages', default=1000, help='Nombre de pages HTML du site')
+@click.option('--fanout', default=10, help="Liens vers d'autres pages par page")
+@click.option('--page-size', default=20000, help='Taille approximative des pages (octets)')
+@click.option('--latency', default=0.0, help='Latence injectée par requête (s)')
+@click.option('--error-rate', default=0.0, help='Part des URLs répondant 500')
+@click.option('--pdf-ratio', default=0.02, help='Part des pages liant un PDF')
+@click.option('--image-ratio', default=0.05, help='Part des pages liant une image')
+@click.option('--seed', default=42, help='Graine du site')
+@click.option('--workers', default=5, help='Workers du crawler')
+@click.option('--engine', type=click.Choice(['thread', 'async']), default='thread', help='Moteur de crawl')
+@click.option('--config', '-c', default=os.path.join(ROOT, 'config', 'settings.yaml'), help='Configuration de base')
+@click.option('--results', default=os.path.join(ROOT, 'benchmarks', 'results.jsonl'),
+              help='Fichier JSON Lines auquel le résultat est ajouté')
+@click.option('--keep-output', is_flag=True, help='Conserve le dossier de sortie du crawl')
+def main(pages, fanout, page_size, latency, error_rate, pdf_ratio, image_ratio, seed, workers, engine,
+         config, results, keep_output):
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+    options = SiteOptions(pages=pages, fanout=fanout, page_size=page_size, latency=latency,
+                          error_rate=error_rate, pdf_ratio=pdf_ratio, image_ratio=image_ratio, seed=seed)
+    port = free_port()
+    context = multiprocessing.get_context('spawn')
+    requests_served = context.Value('q', 0)
+    ready = context.Event()
+    server = context.Process(target=serve, args=(port, options, requests_served, ready), daemon=True)
+    server.start()
+    output_dir = tempfile.mkdtemp(prefix='bench_crawl_')
+    try:
+        if not ready.wait(30):
+            raise click.ClickException("Le serveur du site synthétique n'a pas démarré")
+        crawl_config = bench_config(load_config(config), port, pages, workers)
+        # Le CPU du serveur n'est pas compté: il n'est attendu qu'après la mesure
+        cpu_start, children_start = cpu_seconds()
+        start = time.perf_counter()
+        visited = run_crawl(crawl_config, engine, output_dir)
+        elapsed = time.perf_counter() - start
+        cpu_end, children_end = cpu_seconds()
+    finally:
+        server.terminate()
+        server.join()
+        if not keep_output:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+    cpu = (cpu_end - cpu_start) + (children_end - children_start)
+    # ru_maxrss est en kilo-octets sous Linux, en octets sous macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+    result = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'engine': engine,
+        'workers': workers,
+        'site': options.as_dict(),
+        'visited_urls': visited,
+        'requests': requests_served.value,
+        'elapsed_seconds': round(elapsed, 3),
+        'pages_per_second': round(visited / elapsed, 2),
+        'cpu_seconds': round(cpu, 3),
+        'cpu_ms_per_page': round(cpu * 1000 / max(visited, 1), 3),
+        'peak_rss_mb': round(peak_rss / 1e6, 1),
+    }
+    with open(results, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(result) + '\n')
+
+    click.echo(f"{visited} URLs en {elapsed:.1f}s: {result['pages_per_second']} pages/s, "
+               f"{result['cpu_ms_per_page']} ms CPU/page, pic RSS {result['peak_rss_mb']} Mo, "
+               f"{result['requests']} requêtes")
+    click.echo(f"Résultat ajouté à {results}")
+
+
+if __name__ == '__main__':
+    main()
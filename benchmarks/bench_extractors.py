@@ -0,0 +1,57 @@
+# benchmarks/bench_extractors.py
+"""Compare les backends d'extraction HTML sur un corpus de pages sauvegardées.
+
+Usage:
+    python -m benchmarks.bench_extractors chemin/vers/pages --repeat 3
+"""
+import os
+import sys
+import time
+import click
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.extractors import ContentExtractor
+
+
+def load_corpus(corpus_dir):
+    """Charge les fichiers .html/.htm du dossier, ou génère un corpus synthétique"""
+    pages = []
+    if corpus_dir:
+        for root, _, files in os.walk(corpus_dir):
+            for name in sorted(files):
+                if name.lower().endswith(('.html', '.htm')):
+                    with open(os.path.join(root, name), 'rb') as f:
+                        pages.append(f.read())
+    if not pages:
+        paragraph = "<p>Lorem ipsum dolor sit amet, <b>consectetur</b> adipiscing elit.</p>"
+        links = ''.join(f'<li><a href="/section/page-{i}">Lien {i}</a></li>' for i in range(80))
+        page = (f"<html><head><title>Page</title><style>p {{}}</style>"
+                f"<script>var x = 1;</script></head><body><nav><ul>{links}</ul></nav>"
+                f"{paragraph * 200}</body></html>").encode('utf-8')
+        pages = [page] * 50
+    return pages
+
+
+@click.command()
+@click.argument('corpus_dir', required=False)
+@click.option('--repeat', '-n', default=3, help='Nombre de passes sur le corpus')
+def main(corpus_dir, repeat):
+    pages = load_corpus(corpus_dir)
+    total_bytes = sum(len(p) for p in pages)
+    click.echo(f"Corpus: {len(pages)} pages, {total_bytes / 1e6:.1f} Mo")
+
+    for backend in ContentExtractor.available_backends():
+        extractor = ContentExtractor({'extractor': {'parser': backend}})
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for page in pages:
+                extractor.extract(page, 'https://example.com/section/')
+        elapsed = time.perf_counter() - start
+        count = len(pages) * repeat
+        click.echo(f"{backend:12s} {count / elapsed:10.1f} pages/s "
+                   f"{total_bytes * repeat / elapsed / 1e6:8.2f} Mo/s")
+
+
+if __name__ == '__main__':
+    main()
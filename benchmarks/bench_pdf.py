@@ -0,0 +1,74 @@
+# benchmarks/bench_pdf.py
+"""Compare les backends d'extraction PDF sur un dossier de documents.
+
+Usage:
+    python -m benchmarks.bench_pdf chemin/vers/pdfs --repeat 3 --ocr
+"""
+import os
+import sys
+import time
+import click
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.pdf_processor import PDFProcessor, load_pymupdf
+
+pymupdf = load_pymupdf()
+
+
+def load_corpus(corpus_dir):
+    """Charge les fichiers .pdf du dossier, ou génère un document synthétique avec PyMuPDF"""
+    documents = []
+    if corpus_dir:
+        for root, _, files in os.walk(corpus_dir):
+            for name in sorted(files):
+                if name.lower().endswith('.pdf'):
+                    with open(os.path.join(root, name), 'rb') as f:
+                        documents.append(f.read())
+    if not documents and pymupdf is not None:
+        paragraph = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 2
+        document = pymupdf.open()
+        for page_number in range(20):
+            page = document.new_page()
+            for line in range(40):
+                page.insert_text((50, 50 + line * 18), f"{page_number}.{line} {paragraph}", fontsize=9)
+        documents = [document.tobytes()] * 5
+        document.close()
+    return documents
+
+
+def count_pages(document):
+    if pymupdf is not None:
+        with pymupdf.open(stream=document, filetype='pdf') as pdf:
+            return pdf.page_count
+    import pdfplumber
+    with pdfplumber.open(PDFProcessor.open_source(document)) as pdf:
+        return len(pdf.pages)
+
+
+@click.command()
+@click.argument('corpus_dir', required=False)
+@click.option('--repeat', '-n', default=3, help='Nombre de passes sur le corpus')
+@click.option('--ocr/--no-ocr', default=False, help='OCR des pages sans texte (nécessite Tesseract)')
+@click.option('--dpi', default=300, help="Résolution du rendu des pages pour l'OCR")
+def main(corpus_dir, repeat, ocr, dpi):
+    documents = load_corpus(corpus_dir)
+    if not documents:
+        raise click.ClickException("Aucun PDF trouvé et PyMuPDF absent pour générer un corpus")
+    pages = sum(count_pages(document) for document in documents)
+    total_bytes = sum(len(document) for document in documents)
+    click.echo(f"Corpus: {len(documents)} documents, {pages} pages, {total_bytes / 1e6:.1f} Mo")
+
+    for backend in PDFProcessor.available_backends():
+        processor = PDFProcessor({'pdf': {'backend': backend, 'ocr': ocr, 'ocr_dpi': dpi}})
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for document in documents:
+                processor.extract_text_from_pdf(document)
+        elapsed = time.perf_counter() - start
+        click.echo(f"{backend:12s} {pages * repeat / elapsed:10.1f} pages/s "
+                   f"{len(documents) * repeat / elapsed:8.2f} documents/s")
+
+
+if __name__ == '__main__':
+    main()
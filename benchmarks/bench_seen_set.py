@@ -0,0 +1,69 @@
+# benchmarks/bench_seen_set.py
+"""Mesure la mémoire et le débit des ensembles d'URLs vues.
+
+Usage:
+    python -m benchmarks.bench_seen_set --count 1000000
+"""
+import io
+import os
+import sys
+import time
+import tracemalloc
+import click
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.fingerprints import FingerprintSet, ScalableBloomFilter
+
+
+def synthetic_urls(count, offset=0):
+    for i in range(offset, offset + count):
+        yield f"https://www.example.com/section-{i % 97}/article/{i}/index.html"
+
+
+def measure(name, factory, count):
+    seen = factory()
+    start = time.perf_counter()
+    for url in synthetic_urls(count):
+        seen.add(url)
+    elapsed = time.perf_counter() - start
+
+    # Seconde passe sous tracemalloc, qui fausserait la mesure du débit
+    del seen
+    tracemalloc.start()
+    seen = factory()
+    for url in synthetic_urls(count):
+        seen.add(url)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Faux positifs mesurés sur des URLs jamais ajoutées
+    probes = min(count, 100000)
+    false_positives = sum(url in seen for url in synthetic_urls(probes, offset=count))
+
+    checkpoint = None
+    if hasattr(seen, 'dump'):
+        buffer = io.BytesIO()
+        seen.dump(buffer)
+        checkpoint = len(buffer.getvalue())
+
+    # Octets par URL = Mo par million d'URLs
+    line = (f"{name:22s} {memory / count:8.1f} Mo/million  {count / elapsed:10.0f} ajouts/s  "
+            f"faux positifs {false_positives / probes:.4%}")
+    if checkpoint is not None:
+        line += f"  checkpoint {checkpoint / count:.1f} Mo/million"
+    click.echo(line)
+
+
+@click.command()
+@click.option('--count', '-n', default=1000000, help="Nombre d'URLs insérées")
+@click.option('--error-rate', default=0.001, help='Taux de faux positifs du filtre de Bloom')
+def main(count, error_rate):
+    click.echo(f"{count} URLs synthétiques")
+    measure('set (chaînes)', set, count)
+    measure('FingerprintSet', lambda: FingerprintSet(capacity=100000), count)
+    measure(f'Bloom ({error_rate})', lambda: ScalableBloomFilter(100000, error_rate), count)
+
+
+if __name__ == '__main__':
+    main()
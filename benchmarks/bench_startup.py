@@ -0,0 +1,77 @@
+# benchmarks/bench_startup.py
+"""Mesure le coût de démarrage du crawler avec python -X importtime.
+
+Importe run.py dans un interpréteur neuf (plusieurs fois), affiche le temps
+d'import total et les modules les plus coûteux, et échoue si une dépendance
+lourde, qui doit être chargée à la première utilisation, est importée au démarrage.
+
+Usage:
+    python -m benchmarks.bench_startup --repeat 5 --top 15 --max-ms 500
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+import click
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Chargées à la demande: PDF (processus d'extraction), analyseurs HTML, moteur
+# async, backend redis, HTTP/2, bannière
+LAZY_MODULES = (
+    'pdfplumber', 'pymupdf', 'fitz', 'pytesseract', 'PIL',
+    'bs4', 'selectolax', 'lxml',
+    'aiohttp', 'redis', 'fakeredis', 'httpx', 'pyfiglet', 'fake_useragent',
+)
+
+
+def import_profile(module):
+    """Module importé -> (temps propre, temps cumulé) en µs, pour un import dans un interpréteur neuf"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        timings[name.strip()] = (int(own), int(cumulative))
+    return timings
+
+
+def help_time():
+    """Durée (s) de python run.py --help, interpréteur compris"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, 'run.py', '--help'], cwd=ROOT, capture_output=True, check=True)
+    return time.perf_counter() - start
+
+
+@click.command()
+@click.option('--repeat', '-n', default=5, help='Nombre de mesures (la médiane est retenue)')
+@click.option('--top', default=15, help='Modules les plus coûteux affichés')
+@click.option('--max-ms', type=float, default=None, help="Échoue si l'import de run dépasse ce temps (ms)")
+def main(repeat, top, max_ms):
+    profiles = [import_profile('run') for _ in range(repeat)]
+    totals = [profile['run'][1] / 1000 for profile in profiles]
+    median = statistics.median(totals)
+    click.echo(f"import run: médiane {median:.1f} ms (min {min(totals):.1f}, max {max(totals):.1f}) "
+               f"sur {repeat} interpréteurs")
+    click.echo(f"run.py --help: {statistics.median(help_time() for _ in range(repeat)) * 1000:.1f} ms")
+
+    profile = profiles[totals.index(median)] if median in totals else profiles[0]
+    click.echo(f"\n{'propre (ms)':>12s} {'cumulé (ms)':>12s}  module")
+    for name, (own, cumulative) in sorted(profile.items(), key=lambda item: item[1][0], reverse=True)[:top]:
+        click.echo(f"{own / 1000:12.1f} {cumulative / 1000:12.1f}  {name}")
+
+    loaded = sorted({name.split('.')[0] for name in profile} & set(LAZY_MODULES))
+    if loaded:
+        raise click.ClickException(f"Dépendances lourdes importées au démarrage: {', '.join(loaded)}")
+    if max_ms is not None and median > max_ms:
+        raise click.ClickException(f"Démarrage trop lent: {median:.1f} ms > {max_ms:.1f} ms")
+    click.echo("\nAucune dépendance lourde importée au démarrage")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+# benchmarks/bench_url_filter.py
+"""Compare le filtre d'URLs compilé à l'ancienne vérification motif par motif.
+
+Usage:
+    python -m benchmarks.bench_url_filter --count 2000000
+"""
+import os
+import sys
+import time
+from urllib.parse import urlparse
+import click
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.url_filter import URLFilter
+
+LINKS_PER_PAGE = 100
+
+
+def load_config():
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'settings.yaml')
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+
+def synthetic_urls(count, domain):
+    """Mélange de liens internes, externes, ressources statiques et pages exclues"""
+    suffixes = ['/index.html', '/article', '.css', '.js?v=3', '/login', '.pdf', '/produits/', '.woff2']
+    for i in range(count):
+        host = domain if i % 7 else 'cdn.example.org'
+        yield f"https://{host}/fr-ca/section-{i % 97}/item-{i}{suffixes[i % len(suffixes)]}"
+
+
+def legacy_should_process_url(config, url):
+    """Vérification historique: un balayage par motif et par extension, puis urlparse"""
+    if not url:
+        return False
+    lower_url = url.lower()
+    if any(pattern in lower_url for pattern in config['excluded']['patterns']):
+        return False
+    if any(lower_url.endswith(ext) for ext in config['excluded']['extensions']):
+        return False
+    if len(url) > config['files']['max_url_length']:
+        return False
+    parsed = urlparse(url)
+    return all([
+        parsed.scheme,
+        parsed.netloc,
+        parsed.scheme in ['http', 'https'],
+        config['domain']['name'] in parsed.netloc
+    ])
+
+
+def measure(name, urls, run):
+    start = time.perf_counter()
+    accepted = run(urls)
+    elapsed = time.perf_counter() - start
+    click.echo(f"{name:18s} {len(urls) / elapsed:12.0f} URLs/s  {accepted} acceptées")
+
+
+@click.command()
+@click.option('--count', '-n', default=2000000, help="Nombre d'URLs filtrées")
+def main(count):
+    config = load_config()
+    urls = list(synthetic_urls(count, config['domain']['name']))
+    url_filter = URLFilter(config)
+    click.echo(f"{count} URLs synthétiques, pages de {LINKS_PER_PAGE} liens")
+
+    measure('ancien filtre', urls, lambda urls: sum(legacy_should_process_url(config, url) for url in urls))
+    measure('compilé (par URL)', urls, lambda urls: sum(url_filter.accepts(url) for url in urls))
+    measure('compilé (par page)', urls, lambda urls: sum(
+        len(url_filter.filter(urls[i:i + LINKS_PER_PAGE])) for i in range(0, len(urls), LINKS_PER_PAGE)
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+# benchmarks/site_server.py
+"""Serveur HTTP local d'un site synthétique, pour mesurer le crawler sans réseau.
+
+Le site est déterministe pour une graine donnée: pages HTML reliées entre
+elles (fan-out configurable), PDFs et images, latence injectée et taux
+d'erreurs 500.
+
+Usage:
+    python -m benchmarks.site_server --pages 1000 --fanout 10 --latency 0.02
+"""
+import functools
+import http.server
+import random
+import struct
+import time
+import zlib
+import click
+
+WORDS = ("crawler page texte contenu produit service client document section article "
+         "réseau serveur fichier lien donnée mesure temps volume qualité rapport").split()
+
+
+class SiteOptions:
+    """Paramètres du site synthétique"""
+
+    def __init__(self, pages=1000, fanout=10, page_size=20000, latency=0.0, error_rate=0.0,
+                 pdf_ratio=0.02, image_ratio=0.05, seed=42):
+        self.pages = pages
+        self.fanout = fanout
+        self.page_size = page_size
+        self.latency = latency
+        self.error_rate = error_rate
+        self.pdf_ratio = pdf_ratio  # Part des pages liant un PDF
+        self.image_ratio = image_ratio  # Part des pages liant une image
+        self.seed = seed
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+def build_pdf(text):
+    """PDF minimal valide d'une page contenant text"""
+    stream = f"BT /F1 12 Tf 50 750 Td ({text}) Tj ET".encode('latin-1')
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b''.join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def build_png(size=16):
+    """Image PNG en niveaux de gris de size x size pixels"""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    rows = b''.join(b'\x00' + bytes((x * y) % 256 for x in range(size)) for y in range(size))
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', size, size, 8, 0, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(rows)) + chunk(b'IEND', b''))
+
+
+class SyntheticSite:
+    """Contenu du site: tout est dérivé de la graine et du numéro de page"""
+
+    def __init__(self, options):
+        self.options = options
+        self.png = build_png()
+        self.page = functools.lru_cache(maxsize=4096)(self._page)
+
+    def rng(self, *key):
+        return random.Random(f"{self.options.seed}:{':'.join(map(str, key))}")
+
+    def is_error(self, path):
+        return self.options.error_rate > 0 and self.rng('error', path).random() < self.options.error_rate
+
+    def links(self, n):
+        rng = self.rng('links', n)
+        options = self.options
+        # Le lien vers la page suivante garantit que tout le site est atteignable
+        targets = [f"/page/{(n + 1) % options.pages}"]
+        targets += [f"/page/{rng.randrange(options.pages)}" for _ in range(max(0, options.fanout - 1))]
+        if rng.random() < options.pdf_ratio:
+            targets.append(f"/doc/{n}.pdf")
+        if rng.random() < options.image_ratio:
+            targets.append(f"/img/{n}.png")
+        return targets
+
+    def _page(self, n):
+        rng = self.rng('text', n)
+        links = ''.join(f'<li><a href="{target}">Lien {i}</a></li>' for i, target in enumerate(self.links(n)))
+        head = f"<html><head><title>Page {n}</title></head><body><nav><ul>{links}</ul></nav><h1>Page {n}</h1>"
+        words, size = [], len(head)
+        while size < self.options.page_size:
+            paragraph = ' '.join(rng.choice(WORDS) for _ in range(40))
+            words.append(f"<p>{paragraph}</p>")
+            size += len(paragraph) + 7
+        return (head + ''.join(words) + "</body></html>").encode('utf-8')
+
+    def respond(self, path):
+        """(statut, Content-Type, corps) pour un chemin"""
+        if self.is_error(path):
+            return 500, 'text/plain', b'erreur injectee'
+        try:
+            if path.startswith('/page/'):
+                n = int(path[len('/page/'):])
+                if 0 <= n < self.options.pages:
+                    return 200, 'text/html; charset=utf-8', self.page(n)
+            elif path.startswith('/doc/') and path.endswith('.pdf'):
+                return 200, 'application/pdf', build_pdf(f"Document {path[5:-4]}")
+            elif path.startswith('/img/') and path.endswith('.png'):
+                return 200, 'image/png', self.png
+        except ValueError:
+            pass
+        return 404, 'text/plain', b'introuvable'
+
+
+def make_handler(site, counter=None):
+    class SiteHandler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self, head=False):
+            if counter is not None:
+                with counter.get_lock():
+                    counter.value += 1
+            if site.options.latency:
+                time.sleep(site.options.latency)
+            status, content_type, body = site.respond(self.path.split('?', 1)[0])
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if not head:
+                self.wfile.write(body)
+
+        def do_HEAD(self):
+            self.do_GET(head=True)
+
+        def log_message(self, format, *args):
+            pass
+
+    return SiteHandler
+
+
+def serve(port, options, counter=None, ready=None):
+    """Sert le site jusqu'à l'arrêt du processus (cible de multiprocessing)"""
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', port), make_handler(SyntheticSite(options), counter))
+    server.daemon_threads = True
+    if ready is not None:
+        ready.set()
+    server.serve_forever()
+
+
+@click.command()
+@click.option('--port', default=8900, help="Port d'écoute")
+@click.option('--pages', default=1000, help='Nombre de pages HTML')
+@click.option('--fanout', default=10, help='Liens vers d\'autres pages par page')
+@click.option('--page-size', default=20000, help='Taille approximative des pages (octets)')
+@click.option('--latency', default=0.0, help='Latence injectée par requête (s)')
+@click.option('--error-rate', default=0.0, help='Part des URLs répondant 500')
+@click.option('--pdf-ratio', default=0.02, help='Part des pages liant un PDF')
+@click.option('--image-ratio', default=0.05, help='Part des pages liant une image')
+@click.option('--seed', default=42, help='Graine du site')
+def main(port, pages, fanout, page_size, latency, error_rate, pdf_ratio, image_ratio, seed):
+    options = SiteOptions(pages=pages, fanout=fanout, page_size=page_size, latency=latency,
+                          error_rate=error_rate, pdf_ratio=pdf_ratio, image_ratio=image_ratio, seed=seed)
+    click.echo(f"Site synthétique sur http://127.0.0.1:{port}/page/0")
+    serve(port, options)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,44 +5,123 @@ from src.session import SafeSession
 from src.extractors import ContentExtractor
 from src.processors import URLProcessor
 from src.crawler import SafeCrawler
+from src.distributed import Coordinator, SHARED_FRONTIER_FILE, start_local_redis
 import os
 import logging
 import sys
-import pyfiglet  # Import de pyfiglet
+import subprocess
 
-# Affichage de l'ASCII art au début du script
-ascii_art = pyfiglet.figlet_format("M-LAI")
-print(ascii_art)
+# Dossier de sortie d'un crawl multi-domaines, un sous-dossier par domaine
+MULTI_DOMAIN_DIR = 'domains'
+
+def print_banner():
+    """Affiche l'ASCII art du crawler (pyfiglet n'est importé que dans ce cas)"""
+    import pyfiglet
+    print(pyfiglet.figlet_format("M-LAI"))
+
+def run_coordinator(config_data, config, output, resume, engine, incremental, local_workers):
+    """Amorce la file partagée et lance les workers locaux, retourne leurs codes de sortie"""
+    settings = config_data['distributed']
+    local_redis = None
+    if settings.get('backend', 'sqlite') == 'redis' and settings.get('local_redis', False):
+        local_redis = start_local_redis(settings.get('redis_url', 'redis://localhost:6379/0'))
+
+    coordinator = Coordinator(config_data)
+    try:
+        url_processor = URLProcessor(config_data)
+        coordinator.seed(url_processor.domains.start_urls(), url_processor.normalize_url, resume)
+        logging.info("File partagée prête (%s, %s partitions, %s workers)",
+                     settings.get('backend', 'sqlite'), settings.get('shards', 64), settings.get('workers', 4))
+
+        processes = []
+        for index in range(local_workers):
+            command = [sys.executable, os.path.abspath(__file__), '--config', config, '--output', output,
+                       '--engine', engine, '--role', 'worker', '--worker-index', str(index)]
+            if resume:
+                command.append('--resume')
+            if incremental:
+                command.append('--incremental')
+            command.append('--no-banner')  # Une seule bannière, celle du coordinateur
+            processes.append(subprocess.Popen(command))
+        logging.info("%s workers locaux démarrés", local_workers)
+        return coordinator.wait(processes, interval=config_data.get('metrics', {}).get('interval', 10))
+    finally:
+        coordinator.close()
+        if local_redis is not None:
+            local_redis.shutdown()
+            local_redis.server_close()
 
 @click.command()
 @click.option('--config', '-c', default='config/settings.yaml', help='Chemin du fichier de configuration')
 @click.option('--output', '-o', default='output', help='Dossier de sortie')
 @click.option('--resume', '-r', is_flag=True, help='Reprendre un crawl précédent')
-def main(config, output, resume):
+@click.option('--engine', type=click.Choice(['thread', 'async']), default='thread', help='Moteur de crawl')
+@click.option('--incremental', is_flag=True, help='Ne retraiter que les contenus modifiés depuis le crawl précédent')
+@click.option('--role', type=click.Choice(['standalone', 'coordinator', 'worker']), default='standalone',
+              help='Crawl autonome, ou coordinateur/worker d\'un crawl distribué')
+@click.option('--worker-index', type=int, default=None, help='Numéro du worker (de 0 à distributed.workers - 1)')
+@click.option('--local-workers', type=int, default=None,
+              help='Workers lancés par le coordinateur sur cette machine (défaut: distributed.workers)')
+@click.option('--no-banner', is_flag=True, help="Pas d'ASCII art (tâches courtes, sortie redirigée)")
+def main(config, output, resume, engine, incremental, role, worker_index, local_workers, no_banner):
     """Programme principal du crawler web"""
     try:
         # Charge la configuration
         config_data = load_config(config)
+        logging_settings = config_data.setdefault('logging', {})
+        if no_banner:
+            logging_settings['banner'] = False
+        if logging_settings.get('banner', True):
+            print_banner()
+
+        distributed = config_data.setdefault('distributed', {})
+        if role == 'worker':
+            if worker_index is None or not 0 <= worker_index < distributed.get('workers', 4):
+                raise click.BadParameter("--worker-index doit être compris entre 0 et distributed.workers - 1")
+            # Un fichier de log par worker: les processus ne partagent pas la rotation
+            config_data['files']['log_dir'] = os.path.join(
+                config_data['files'].get('log_dir', 'logs'), f"worker-{worker_index}"
+            )
         
         # Configure le logging
         setup_logging(config_data)
         
         # Log les paramètres de démarrage
-        logging.info(f"Démarrage du crawler avec config: {config}")
-        logging.info(f"Dossier de sortie: {output}")
-        logging.info(f"Mode reprise: {resume}")
+        logging.info("Démarrage du crawler avec config: %s", config)
+        logging.info("Dossier de sortie: %s", output)
+        logging.info("Mode reprise: %s", resume)
+        logging.info("Moteur: %s", engine)
+        logging.info("Mode incrémental: %s", incremental)
+        logging.info("Rôle: %s", role)
         
-        # Crée le dossier de sortie
-        output_dir = os.path.join(output, config_data['files']['output_dir'], config_data['domain']['name'])
+        # Crée le dossier de sortie (commun à tous les domaines d'un crawl multi-domaines)
+        crawl_name = MULTI_DOMAIN_DIR if config_data.get('domains') else config_data['domain']['name']
+        output_dir = os.path.join(output, config_data['files']['output_dir'], crawl_name)
         os.makedirs(output_dir, exist_ok=True)
-        logging.info(f"Dossier de sortie créé: {output_dir}")
+        logging.info("Dossier de sortie créé: %s", output_dir)
+
+        if role != 'standalone':
+            # File SQLite partagée par défaut dans le dossier de sortie commun
+            if not distributed.get('sqlite_path'):
+                distributed['sqlite_path'] = os.path.join(output_dir, SHARED_FRONTIER_FILE)
+        if role == 'coordinator':
+            codes = run_coordinator(config_data, config, output, resume, engine, incremental,
+                                    local_workers if local_workers is not None else distributed.get('workers', 4))
+            if any(codes):
+                raise RuntimeError(f"Workers en échec (codes de sortie: {codes})")
+            click.echo("Crawling distribué terminé avec succès")
+            return
+        if role == 'worker':
+            # Chaque worker a ses propres fichiers, état et checkpoints
+            output_dir = os.path.join(output_dir, f"worker-{worker_index}")
+            os.makedirs(output_dir, exist_ok=True)
         
         # Initialise les composants
         try:
             session = SafeSession.create(config_data)
             logging.info("Session HTTP initialisée")
             
-            content_extractor = ContentExtractor()
+            content_extractor = ContentExtractor(config_data)
             logging.info("Extracteur de contenu initialisé")
             
             url_processor = URLProcessor(config_data)
@@ -54,7 +133,15 @@ def main(config, output, resume):
         
         # Initialise et lance le crawler
         try:
-            crawler = SafeCrawler(config_data, session, content_extractor, url_processor, output_dir, resume)
+            if engine == 'async':
+                # aiohttp n'est chargé que pour le moteur async
+                from src.async_crawler import AsyncCrawler
+                crawler_class = AsyncCrawler
+            else:
+                crawler_class = SafeCrawler
+            crawler = crawler_class(config_data, session, content_extractor, url_processor, output_dir, resume,
+                                    incremental=incremental,
+                                    worker_index=worker_index if role == 'worker' else None)
             logging.info("Crawler initialisé")
             
             crawler.crawl()
@@ -76,6 +163,7 @@ def main(config, output, resume):
             try:
                 crawler.save_state()
                 logging.info("État final sauvegardé")
+                crawler.close()
             except Exception as e:
                 logging.error(f"Erreur lors de la sauvegarde de l'état final: {str(e)}")
 
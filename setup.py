@@ -8,6 +8,11 @@ setup(
         line.strip()
         for line in open("requirements.txt").readlines()
     ],
+    extras_require={
+        'async': ['aiohttp'],
+        'distributed': ['redis', 'fakeredis'],
+        'http2': ['httpx[http2]'],
+    },
     entry_points={
         'console_scripts': [
             'crawler=run:main',
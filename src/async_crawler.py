@@ -0,0 +1,284 @@
+# src/async_crawler.py
+from src.constants import *
+import asyncio
+import concurrent.futures
+import logging
+import time
+from src.crawler import SafeCrawler
+from src.file_handler import DownloadTooLarge, SpoolFile
+from src.prefilter import PROBE, SKIP
+from src.robots import RobotsCache
+from src.scheduler import THROTTLE_STATUSES, parse_retry_after
+
+try:
+    import aiohttp
+    # Erreurs réseau transitoires du moteur async
+    ASYNC_TRANSIENT_ERRORS = (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError)
+except ImportError:
+    aiohttp = None
+    ASYNC_TRANSIENT_ERRORS = ()
+
+# Octets d'un téléchargement binaire regroupés avant chaque écriture sur disque (hors de la boucle)
+SPOOL_WRITE_SIZE = 1024 * 1024
+
+
+class AsyncCrawler(SafeCrawler):
+    """Moteur de crawl asyncio: un pool borné de workers consomme la file en continu.
+
+    La boucle ne fait que les échanges réseau. L'état du crawl (ordonnanceur,
+    file, journal, compactage du checkpoint) appartient à un thread d'état
+    unique, l'équivalent du thread principal du moteur à threads: les workers
+    y prennent leurs tâches et y remettent leurs résultats.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.concurrency = self.config['crawler'].get('async_concurrency', 100)
+        self.active_workers = 0
+        self.max_redirects = self.config['timeouts'].get('max_redirects', 10)
+        self.robots_fetches = {}  # Origine -> téléchargement de robots.txt en cours
+
+    def crawl(self):
+        if aiohttp is None:
+            raise RuntimeError("Le moteur async nécessite aiohttp (pip install aiohttp)")
+        asyncio.run(self.crawl_async())
+
+    async def crawl_async(self):
+        timeout = aiohttp.ClientTimeout(
+            sock_connect=self.config['timeouts']['connect'],
+            sock_read=self.config['timeouts']['read']
+        )
+        connector = aiohttp.TCPConnector(limit=self.concurrency, ssl=False)
+        # L'extraction HTML est CPU-intensive: elle tourne hors de la boucle
+        # (les PDFs passent par le pipeline PDF, dans des processus séparés)
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.config['crawler']['max_workers']
+        )
+        state = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='crawl-state')
+        try:
+            async with aiohttp.ClientSession(
+                connector=connector,
+                timeout=timeout,
+                headers=dict(self.session.headers)
+            ) as client:
+                workers = [
+                    asyncio.create_task(self.worker(client, executor, state))
+                    for _ in range(self.concurrency)
+                ]
+                await asyncio.gather(*workers)
+        finally:
+            state.shutdown(wait=True)
+            executor.shutdown(wait=True)
+
+    async def worker(self, client, executor, state):
+        loop = asyncio.get_running_loop()
+        while True:
+            task = await loop.run_in_executor(state, self.next_task)
+            if task is None:
+                return
+            if isinstance(task, float):
+                await asyncio.sleep(task)
+                continue
+
+            host, entry = task
+            url = entry[0]
+            result = None
+            try:
+                result = await self.process_url_async(client, executor, url)
+                if result:
+                    # Écritures disque et remise au pipeline PDF, qui peut attendre une place libre
+                    result = await loop.run_in_executor(executor, self.store_result, result)
+                    await self.prefetch_robots(executor, state, result)
+            except Exception as e:
+                logging.error("Erreur traitement %s: %s", url, e)
+            finally:
+                # Journal, débordement de la file et compactage du checkpoint: hors de la boucle
+                await loop.run_in_executor(state, self.end_task, host, entry, result)
+
+    def next_task(self):
+        """Prochaine tâche (thread d'état): (hôte, entrée), une attente en secondes, ou None à la fin"""
+        if self.should_stop():
+            return None
+        self.schedule_queued_urls()
+        task = self.scheduler.pop()
+        if task is None:
+            # Plus rien à faire si aucun autre worker ne peut encore ajouter de liens
+            if self.active_workers == 0 and not self.has_pending_urls():
+                return None
+            return min(self.scheduler.wait_time() or 0.05, 0.05)
+        self.active_workers += 1
+        return self.start_task(task)
+
+    def end_task(self, host, entry, result):
+        """Remet le résultat d'une tâche (thread d'état)"""
+        try:
+            self.finish_task(host, entry, result)
+        except Exception as e:
+            logging.error("Erreur traitement %s: %s", entry[0], e)
+        finally:
+            self.active_workers -= 1
+
+    @staticmethod
+    def followed_links(result):
+        """Liens d'un résultat stocké qui seront suivis par finish_task"""
+        if not result:
+            return ()
+        content_type, _, content = result
+        if content_type == 'page':
+            _, links, existing, duplicate_of = content
+            return () if existing or duplicate_of else links
+        if content_type == 'unchanged' and content and not content.get('duplicate_of'):
+            return content.get('links', [])
+        return ()
+
+    async def prefetch_robots(self, executor, state, result):
+        """Télécharge dans l'executor les robots.txt manquants des hôtes du crawl liés par une page.
+
+        queue_link juge ensuite les liens depuis le thread d'état avec des règles
+        déjà en cache, sans requête bloquante. Un même robots.txt n'est demandé
+        qu'une fois, même si plusieurs workers le réclament en même temps.
+        """
+        waits = []
+        origins = set()
+        for link in self.followed_links(result):
+            origin, host = RobotsCache.origin(link)
+            if origin in origins:
+                continue
+            origins.add(origin)
+            if not self.robots.expired(origin) or self.domains.for_host(host) is None:
+                continue
+            fetch = self.robots_fetches.get(origin)
+            if fetch is None:
+                fetch = self.robots_fetches[origin] = asyncio.ensure_future(
+                    self.fetch_robots(executor, state, origin, host)
+                )
+            waits.append(fetch)
+        if waits:
+            await asyncio.gather(*waits)
+
+    async def fetch_robots(self, executor, state, origin, host):
+        loop = asyncio.get_running_loop()
+        try:
+            rules, ttl = await loop.run_in_executor(executor, self.robots.fetch, origin)
+            await loop.run_in_executor(state, self.robots.store, origin, host, rules, ttl)
+        finally:
+            self.robots_fetches.pop(origin, None)
+
+    async def process_url_async(self, client, executor, url):
+        try:
+            if not self.url_processor.should_process_url(url):
+                return None
+
+            prediction = self.prefilter.predict(url)
+            if prediction == SKIP:
+                self.prefilter.skip_url(url)
+                return None
+            if prediction == PROBE and not await self.probe_url_async(client, url):
+                return None
+
+            fetch_start = time.perf_counter()
+            response = await self.safe_request_async(client, executor, url)
+            if response is None:
+                return None
+            # Téléchargements réussis seulement, comme dans le moteur à threads
+            self.metrics.observe_stage('fetch', time.perf_counter() - fetch_start)
+            status, headers, content_type, body, content_hash = response
+            if status == 304:
+                return self.unchanged_result(url, headers)
+
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                executor, self.process_download, url, content_type, body, headers, content_hash
+            )
+        except DownloadTooLarge as e:
+            logging.info("Téléchargement interrompu pour %s: %s", url, e)
+            return None
+        except aiohttp.ClientResponseError as http_err:
+            if http_err.status in THROTTLE_STATUSES:
+                logging.warning("Serveur surchargé (%s) pour %s, report de la requête", http_err.status, url)
+                retry_after = http_err.headers.get('Retry-After') if http_err.headers else None
+                return ('retry', url, parse_retry_after(retry_after))
+            logging.error("Erreur traitement %s: %s", url, http_err)
+            return None
+        except Exception as e:
+            logging.error("Erreur traitement %s: %s", url, e)
+            return None
+
+    async def probe_url_async(self, client, url):
+        """Équivalent asyncio de probe_url"""
+        try:
+            async with client.head(url, allow_redirects=True, max_redirects=self.max_redirects) as response:
+                status, headers = response.status, response.headers
+            if status in (405, 501):
+                # HEAD refusé: une requête GET limitée au premier octet donne les mêmes en-têtes
+                async with client.get(url, headers={'Range': 'bytes=0-0'}) as response:
+                    status, headers = response.status, response.headers
+            if status >= 400:
+                return True  # La requête GET gère les erreurs et les reprises
+            return self.accept_headers(url, headers) is not None
+        except Exception as e:
+            logging.warning("Vérification HEAD impossible pour %s: %s", url, e)
+            return True
+
+    async def safe_request_async(self, client, executor, url):
+        """Équivalent asyncio de safe_request.
+
+        Retourne (statut, en-têtes, Content-Type, corps ou chemin du fichier, empreinte SHA-256).
+        Les fichiers binaires sont écrits par blocs dans l'executor, jamais depuis la boucle.
+        """
+        loop = asyncio.get_running_loop()
+        policy = self.retry_policy
+        chunk_size = self.config['crawler']['chunk_size']
+        headers = self.manifest.conditional_headers(url) if self.incremental else {}
+        for attempt in range(policy.attempts):
+            start = time.perf_counter()
+            try:
+                async with client.get(url, headers=headers, max_redirects=self.max_redirects) as response:
+                    self.record_response(url, response.status, time.perf_counter() - start)
+                    response.raise_for_status()
+                    if response.status == 304:
+                        return response.status, response.headers, None, None, None
+                    download = self.start_download(url, response.headers)
+                    if download is None:
+                        return None
+                    content_type, sink = download
+                    spooled = isinstance(sink, SpoolFile)
+                    try:
+                        pending = bytearray()
+                        async for chunk in response.content.iter_chunked(chunk_size):
+                            if not spooled:
+                                sink.write(chunk)
+                                continue
+                            pending.extend(chunk)
+                            if len(pending) >= SPOOL_WRITE_SIZE:
+                                await loop.run_in_executor(executor, sink.write, bytes(pending))
+                                pending.clear()
+                        if pending:
+                            await loop.run_in_executor(executor, sink.write, bytes(pending))
+                        body = await loop.run_in_executor(executor, sink.commit) if spooled else sink.commit()
+                    except BaseException:
+                        if spooled:
+                            await loop.run_in_executor(executor, sink.abort)
+                        else:
+                            sink.abort()
+                        raise
+                    self.metrics.inc('crawler_bytes_total', sink.size)
+                    return response.status, response.headers, content_type, body, sink.digest.hexdigest()
+            except aiohttp.ClientResponseError as http_err:
+                if http_err.status == 404:
+                    logging.error("Page non trouvée: %s", url)
+                    return None
+                elif http_err.status in THROTTLE_STATUSES:
+                    raise  # Le ralentissement est géré par l'ordonnanceur de l'hôte
+                elif not policy.should_retry(attempt, http_err.status):
+                    logging.error("Abandon de %s après %s tentative(s): %s", url, attempt + 1, http_err)
+                    raise
+                logging.warning("Retrying %s (%s/%s) due to error: %s", url, attempt + 1, policy.attempts, http_err)
+                await asyncio.sleep(policy.delay(attempt))
+            except ASYNC_TRANSIENT_ERRORS as e:
+                self.record_response(url, None, time.perf_counter() - start)
+                if not policy.should_retry(attempt):
+                    logging.error("Max retries atteints pour %s: %s", url, e)
+                    raise
+                logging.warning("Retrying %s (%s/%s) due to error: %s", url, attempt + 1, policy.attempts, e)
+                await asyncio.sleep(policy.delay(attempt))
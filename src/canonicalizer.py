@@ -0,0 +1,75 @@
+# src/canonicalizer.py
+import functools
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {'http': ':80', 'https': ':443'}
+DEFAULT_STRIPPED_PARAMS = ['utm_*', 'gclid', 'fbclid', 'msclkid', 'jsessionid', 'phpsessid', 'sessionid', 'sid']
+
+
+class URLCanonicalizer:
+    """Forme canonique des URLs, pour qu'une même page ne soit ajoutée qu'une fois à la file.
+
+    Schéma et hôte en minuscules, port par défaut et fragment supprimés, chemin
+    vide remplacé par '/', paramètres de suivi et identifiants de session retirés
+    (un nom terminé par '*' est un préfixe), autres paramètres triés. Les liens
+    relatifs sont résolus selon la sémantique de urljoin, par rapport à l'URL de
+    la page ou à son <base href>. Les résultats sont mémorisés (LRU): les liens
+    de navigation se répètent sur chaque page.
+    """
+
+    def __init__(self, config=None):
+        settings = config.get('urls', {}) if config else {}
+        names = [name.lower() for name in settings.get('strip_params', DEFAULT_STRIPPED_PARAMS)]
+        self.stripped_names = frozenset(name for name in names if not name.endswith('*'))
+        self.stripped_prefixes = tuple(name[:-1] for name in names if name.endswith('*'))
+        self.sort_query = settings.get('sort_query', True)
+        cache_size = settings.get('cache_size', 100000)
+        self.canonicalize = functools.lru_cache(maxsize=cache_size)(self._canonicalize)
+        self.resolve = functools.lru_cache(maxsize=cache_size)(self._resolve)
+
+    def is_stripped(self, name):
+        name = name.lower()
+        return name in self.stripped_names or (bool(self.stripped_prefixes) and name.startswith(self.stripped_prefixes))
+
+    def _canonicalize(self, url):
+        """URL absolue sous forme canonique"""
+        parsed = urlsplit(url.strip())
+        scheme = parsed.scheme.lower()
+        netloc = parsed.netloc
+        userinfo, at, host = netloc.rpartition('@')
+        host = host.lower()
+        default_port = DEFAULT_PORTS.get(scheme)
+        if default_port and host.endswith(default_port):
+            host = host[:-len(default_port)]
+        netloc = f"{userinfo}{at}{host}"
+
+        path = parsed.path or '/'
+        if ';' in path:
+            # Paramètres de chemin, par exemple ;jsessionid=...
+            head, *params = path.split(';')
+            path = ';'.join([head] + [p for p in params if not self.is_stripped(p.partition('=')[0])])
+
+        query = parsed.query
+        if query:
+            pairs = [pair for pair in query.split('&') if pair and not self.is_stripped(pair.partition('=')[0])]
+            if self.sort_query:
+                pairs.sort()
+            query = '&'.join(pairs)
+        return urlunsplit((scheme, netloc, path, query, ''))
+
+    def _resolve(self, base_url, href):
+        """URL canonique d'un lien trouvé dans une page, ou None s'il ne mène pas à une page web"""
+        href = href.strip()
+        if not href or href.startswith('#'):
+            return None  # Ancre dans la page courante
+        url = urljoin(base_url, href)
+        parsed = urlsplit(url)
+        if parsed.scheme.lower() not in DEFAULT_PORTS or not parsed.netloc:
+            return None  # mailto:, tel:, javascript:, data:, ou base inutilisable
+        return self.canonicalize(url)
+
+    def base_for(self, page_url, base_href):
+        """URL de référence des liens relatifs d'une page, compte tenu de <base href>"""
+        if base_href and base_href.strip():
+            return urljoin(page_url, base_href.strip())
+        return page_url
@@ -0,0 +1,120 @@
+# src/checkpoint.py
+import json
+import logging
+import os
+import time
+
+# Types d'événements du journal
+ENQUEUE = 'E'  # URL ajoutée à la file, avec sa profondeur
+VISIT = 'V'    # URL visitée et sauvegardée (ajoutée aux URLs vues)
+DONE = 'D'     # URL traitée sans contenu (erreur, type non supporté...)
+MANIFEST = 'M'  # Entrée du manifeste incrémental (JSON)
+CLAIM = 'C'    # Contenu enregistré dans le stockage par contenu (empreinte, fichier)
+SIMHASH = 'S'  # SimHash d'une page indexée pour les quasi-doublons
+
+
+class CheckpointJournal:
+    """Journal append-only des événements du crawl.
+
+    Chaque ajout en file et chaque visite est ajouté au journal par lots, ce qui
+    rend le coût d'un checkpoint proportionnel au travail effectué depuis le
+    précédent. Les entrées du manifeste et du stockage par contenu y sont aussi
+    journalisées, pour survivre à un arrêt brutal entre deux compactages. Le
+    crawler compacte périodiquement le journal en réécrivant l'état complet
+    (renommage atomique) puis en vidant le journal. La relecture est
+    idempotente: rejouer un événement déjà présent dans l'état est sans effet.
+    """
+
+    def __init__(self, path, flush_every=500, flush_interval=5.0, fsync=False):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.buffer = []
+        self.file = None
+        self.last_flush = time.monotonic()
+        self.events_since_compaction = 0
+
+    def record_enqueue(self, url, depth):
+        self._record(f"{ENQUEUE}\t{depth}\t{url}\n")
+
+    def record_visit(self, url):
+        self._record(f"{VISIT}\t{url}\n")
+
+    def record_done(self, url):
+        self._record(f"{DONE}\t{url}\n")
+
+    def record_manifest(self, url, entry):
+        self._record(f"{MANIFEST}\t{url}\t{json.dumps(entry, ensure_ascii=False)}\n")
+
+    def record_claim(self, url, digest, path):
+        self._record(f"{CLAIM}\t{digest}\t{path or ''}\t{url}\n")
+
+    def record_simhash(self, url, fingerprint):
+        self._record(f"{SIMHASH}\t{fingerprint}\t{url}\n")
+
+    def _record(self, line):
+        if '\n' in line[:-1]:
+            return  # Une URL ne peut pas contenir de saut de ligne
+        self.buffer.append(line)
+        self.events_since_compaction += 1
+        if len(self.buffer) >= self.flush_every or \
+           time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            if self.file is None:
+                self.file = open(self.path, 'a', encoding='utf-8')
+            self.file.write(''.join(self.buffer))
+            self.file.flush()
+            if self.fsync:
+                os.fsync(self.file.fileno())
+            self.buffer = []
+        self.last_flush = time.monotonic()
+
+    def reset(self):
+        """Vide le journal, une fois son contenu intégré à l'état compacté"""
+        self.buffer = []
+        if self.file is not None:
+            self.file.close()
+        self.file = open(self.path, 'w', encoding='utf-8')
+        self.events_since_compaction = 0
+
+    def close(self):
+        self.flush()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def replay(self):
+        """Relit le journal, retourne (visitées, terminées, ajouts [(url, profondeur)], stockage).
+
+        stockage liste, dans l'ordre, les événements (type, url, valeurs...) du
+        manifeste et du stockage par contenu.
+        """
+        visited, done, enqueued, stored = [], [], [], []
+        if not os.path.exists(self.path):
+            return visited, done, enqueued, stored
+        with open(self.path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    break  # Dernière ligne tronquée par un arrêt brutal
+                parts = line.rstrip('\n').split('\t')
+                try:
+                    if parts[0] == ENQUEUE:
+                        enqueued.append((parts[2], int(parts[1])))
+                    elif parts[0] == VISIT:
+                        visited.append(parts[1])
+                    elif parts[0] == DONE:
+                        done.append(parts[1])
+                    elif parts[0] == MANIFEST:
+                        url, entry = line.rstrip('\n').split('\t', 2)[1:]
+                        stored.append((MANIFEST, url, json.loads(entry)))
+                    elif parts[0] == CLAIM:
+                        stored.append((CLAIM, parts[3], parts[1], parts[2] or None))
+                    elif parts[0] == SIMHASH:
+                        stored.append((SIMHASH, parts[2], int(parts[1])))
+                except (IndexError, ValueError):
+                    logging.warning("Ligne de journal ignorée: %s", line.strip())
+        return visited, done, enqueued, stored
@@ -5,33 +5,96 @@ import logging
 import sys
 import json
 from datetime import datetime
-from collections import deque
 import concurrent.futures
 import time
-import random
-from src.file_handler import FileHandler
-from src.pdf_processor import PDFProcessor
-from urllib.parse import urlparse
+from src.file_handler import FileHandler, SpoolFile, MemoryBuffer, DownloadTooLarge
+from src.pdf_pipeline import PDFExtractionPipeline
+from urllib.parse import urlparse, urlsplit
 from src.extractors import ContentExtractor
 from src.processors import URLProcessor
+from src.checkpoint import CheckpointJournal, MANIFEST, CLAIM
+from src.fingerprints import create_seen_set, load_seen_set
+from src.frontier import URLFrontier, DomainFrontier
+from src.distributed import DistributedFrontier, create_frontier_backend
+from src.manifest import CrawlManifest
+from src.dedup import ContentStore, content_hash, simhash
+from src.sinks import create_sink
+from src.prefilter import DownloadPrefilter, PROBE, SKIP
+from src.scheduler import HostScheduler, THROTTLE_STATUSES, parse_retry_after
+from src.session import RetryPolicy, TRANSIENT_ERRORS
+from src.robots import RobotsCache
+from src.sitemap import SitemapReader, lastmod_priority
+from src.traps import TrapDetector, RejectionReport, REPORT_FILE, DROP, DEPRIORITIZE
+from src.metrics import MetricsRegistry, MetricsReporter, DEFAULT_BUCKETS
 import requests
 import signal
-import pyfiglet  # Import pour l'ASCII art
+
+SEEN_URLS_FILE = 'seen_urls.bin'
+FRONTIER_SEEN_FILE = 'frontier_seen.bin'
+JOURNAL_FILE = 'crawler_journal.log'
+MANIFEST_FILE = 'crawl_manifest.json'
+CONTENT_STORE_FILE = 'content_store.json'
+
+# URLs de sitemap filtrées et ajoutées à la file par lot
+SITEMAP_BATCH = 1000
+
+# Types écrits directement sur disque pendant le téléchargement
+BINARY_CONTENT_TYPES = ('pdf', 'image', 'document')
 
 class SafeCrawler:
     """Classe principale du crawler"""
     
-    def __init__(self, config, session, content_extractor, url_processor, output_dir, resume=False):
+    def __init__(self, config, session, content_extractor, url_processor, output_dir, resume=False,
+                 incremental=False, worker_index=None):
         self.config = config
         self.session = session
+        self.retry_policy = RetryPolicy(self.config)
         self.content_extractor = content_extractor
         self.url_processor = url_processor
         self.output_dir = output_dir
         self.resume = resume
+        self.incremental = incremental
+        self.worker_index = worker_index  # Worker d'un crawl distribué, None en mode autonome
         
-        self.seen_urls = set()
-        self.queue = deque()
+        self.domains = self.url_processor.domains
+        self.domain_pages = {}  # Domaine -> pages visitées (crawl multi-domaines)
+        self.seen_urls = create_seen_set(self.config)
+        self.frontier = self.create_frontier()
+        self.scheduler = HostScheduler(self.config, policy=self.host_policy if self.domains.multi else None)
+        # Part de la file de l'ordonnanceur réservée à chaque domaine
+        self.domain_buffer = max(1, self.config['crawler'].get('scheduler_buffer', 1000) // len(self.domains))
+        self.robots = RobotsCache(self.config, self.session, on_rules=self.apply_crawl_delay)
+        self.traps = TrapDetector(self.config)
+        self.rejections = RejectionReport(create_seen_set(self.config), on_reject=self.count_rejection)
+        self.throttle_attempts = {}  # URL -> nombre de réponses 429/503 reçues
+        self.in_flight = {}  # URL -> (url, profondeur) en cours de traitement
         self.start_time = time.time()
+
+        checkpoint_config = self.config.get('checkpoint', {})
+        self.journal = CheckpointJournal(
+            os.path.join(self.output_dir, JOURNAL_FILE),
+            flush_every=checkpoint_config.get('flush_every', 500),
+            flush_interval=checkpoint_config.get('flush_interval', 5),
+            fsync=checkpoint_config.get('fsync', False)
+        )
+        self.compact_every = checkpoint_config.get('compact_every', 100000)
+
+        # Le manifeste est toujours tenu à jour, il n'est utilisé qu'en mode incrémental
+        self.manifest = CrawlManifest(os.path.join(self.output_dir, MANIFEST_FILE))
+        self.manifest.load()
+
+        # Destination des textes extraits: fichiers individuels ou segments compressés
+        self.sink = create_sink(self.config, self.output_dir, self.url_processor)
+
+        dedup_config = self.config.get('dedup', {})
+        self.dedup_enabled = dedup_config.get('enabled', True)
+        self.content_store = ContentStore(
+            os.path.join(self.output_dir, CONTENT_STORE_FILE),
+            near_duplicates=dedup_config.get('near_duplicates', False),
+            max_distance=dedup_config.get('simhash_distance', 3),
+            exists=self.sink.exists
+        )
+        self.content_store.load()
         
         self.setup_signal_handlers()
         if self.resume:
@@ -39,15 +102,54 @@ class SafeCrawler:
         else:
             self.save_initial_state()
         
-        # Initialisation de FileHandler et PDFProcessor
+        # Initialisation de FileHandler et du pipeline PDF
         self.file_handler = FileHandler(self.output_dir)
         logging.info("FileHandler initialisé")
         
-        self.pdf_processor = PDFProcessor()
-        logging.info("PDFProcessor initialisé")
+        self.pdf_pipeline = PDFExtractionPipeline(self.config, on_timing=self.record_pdf_timing)
+        logging.info("Pipeline PDF initialisé")
+
+        self.prefilter = DownloadPrefilter(self.config, self.file_handler)
 
         self.step_counter = 0  # Compteur de pas pour l'affichage ASCII art
+        self.banner = self.config.get('logging', {}).get('banner', True)
+
+        self.metrics = self.create_metrics()
+        self.metrics_reporter = None
+        if self.config.get('metrics', {}).get('enabled', True):
+            self.metrics_reporter = MetricsReporter(self.metrics, self.config, self.output_dir)
+            self.metrics_reporter.start()
+
+        # Un seul processus amorce la file depuis les sitemaps
+        if not self.resume and self.worker_index in (None, 0):
+            self.seed_from_sitemaps()
     
+    def create_metrics(self):
+        """Registre des métriques, avec les jauges lues à chaque export"""
+        metrics = MetricsRegistry(self.config.get('metrics', {}).get('latency_buckets', DEFAULT_BUCKETS))
+        metrics.describe('crawler_pages_total', 'Résultats traités, par type de contenu')
+        metrics.describe('crawler_responses_total', 'Réponses HTTP reçues, par statut')
+        metrics.describe('crawler_bytes_total', 'Octets téléchargés')
+        metrics.describe('crawler_request_seconds', "Délai jusqu'aux en-têtes de la réponse, par hôte")
+        metrics.describe('crawler_stage_seconds', 'Temps passé par étape (fetch, extract, pdf, save)')
+        metrics.describe('crawler_rejected_total', 'URLs écartées avant la mise en file, par motif')
+        metrics.gauge('crawler_queue_depth', lambda: len(self.frontier) + len(self.scheduler))
+        metrics.gauge('crawler_seen_urls', lambda: len(self.seen_urls))
+        metrics.gauge('crawler_in_flight', lambda: len(self.in_flight))
+        return metrics
+
+    def count_rejection(self, reason):
+        self.metrics.inc('crawler_rejected_total', reason=reason)
+
+    def record_pdf_timing(self, seconds):
+        self.metrics.observe_stage('pdf', seconds)
+
+    def record_response(self, url, status, seconds):
+        """Compte une réponse (ou une erreur réseau si status vaut None) et sa latence"""
+        self.metrics.inc('crawler_responses_total', status=status if status is not None else 'error')
+        if status is not None:
+            self.metrics.observe('crawler_request_seconds', seconds, host=urlparse(url).netloc)
+
     def setup_signal_handlers(self):
         signal.signal(signal.SIGINT, self.signal_handler)
         signal.signal(signal.SIGTERM, self.signal_handler)
@@ -57,43 +159,217 @@ class SafeCrawler:
         self.save_state()
         sys.exit(0)
 
+    def create_frontier(self, seen=None):
+        seen = seen if seen is not None else create_seen_set(self.config)
+        if self.worker_index is not None:
+            settings = self.config.get('distributed', {})
+            return DistributedFrontier(
+                create_frontier_backend(self.config),
+                self.url_processor.normalize_url,
+                self.worker_index,
+                settings.get('workers', 4),
+                seen=seen,
+                lease_size=settings.get('lease_size', 100),
+                lease_timeout=settings.get('lease_timeout', 300),
+                shard_by=settings.get('shard_by', 'host')
+            )
+        if self.domains.multi:
+            # Une file par domaine, même ensemble d'URLs vues
+            frontiers = {
+                domain.name: URLFrontier(
+                    self.url_processor.normalize_url,
+                    max_memory=self.config['crawler']['max_queue_size'],
+                    spill_path=os.path.join(self.output_dir, f'frontier_{index}.sqlite'),
+                    seen=seen
+                )
+                for index, domain in enumerate(self.domains)
+            }
+            frontier = DomainFrontier(frontiers, self.domain_name_of, seen, ready=self.domain_ready)
+            for name, pages in self.domain_pages.items():
+                if self.domain_limit_reached(name, pages):
+                    frontier.retire(name)
+            return frontier
+        return URLFrontier(
+            self.url_processor.normalize_url,
+            max_memory=self.config['crawler']['max_queue_size'],
+            spill_path=os.path.join(self.output_dir, 'frontier.sqlite'),
+            seen=seen
+        )
+
+    def domain_name_of(self, url):
+        domain = self.domains.domain_of(url)
+        return domain.name if domain is not None else None
+
+    def host_policy(self, host):
+        """(domaine, réglages crawler du domaine) d'un hôte, pour l'ordonnanceur"""
+        domain = self.domains.for_host(host)
+        if domain is None:
+            return None, self.config['crawler']
+        return domain.name, domain.config['crawler']
+
+    def domain_ready(self, name):
+        """Vrai si l'ordonnanceur peut recevoir d'autres URLs du domaine"""
+        return self.scheduler.pending_in(name) < self.domain_buffer
+
+    def domain_limit_reached(self, name, pages):
+        domain = self.domains.by_name.get(name)
+        limit = domain.config['crawler'].get('max_pages') if domain is not None else None
+        return limit is not None and pages >= limit
+
+    def count_domain_page(self, url):
+        """Compte une page visitée pour son domaine et arrête le domaine à sa limite de pages"""
+        name = self.domain_name_of(url)
+        if name is None:
+            return
+        pages = self.domain_pages[name] = self.domain_pages.get(name, 0) + 1
+        if self.domain_limit_reached(name, pages) and isinstance(self.frontier, DomainFrontier):
+            if name not in self.frontier.retired:
+                logging.info("Limite de pages atteinte pour %s: %s pages", name, pages)
+                self.frontier.retire(name)
+                # Les URLs déjà réparties restent en file pour un crawl ultérieur, sans être visitées
+                for url, depth in self.scheduler.drain(name):
+                    self.frontier.restore(url, depth)
+
     def save_initial_state(self):
         """Initialise l'état si ce n'est pas une reprise."""
-        self.seen_urls = set()
-        self.queue = deque()
-        self.queue.append(self.config['domain']['start_url'])
+        self.seen_urls = create_seen_set(self.config)
+        self.frontier.close()
+        self.frontier = self.create_frontier()
+        self.journal.reset()
+        for start_url in self.domains.start_urls():
+            self.enqueue(start_url, 0)
         logging.info("État initialisé")
 
     def save_state(self):
+        """Compacte le checkpoint: réécrit l'état complet puis vide le journal"""
         try:
+            # Ensembles d'URLs sauvegardés en binaire (empreintes ou filtre de Bloom):
+            # les URLs visitées, et toutes celles déjà passées par la file
+            self.write_atomic(SEEN_URLS_FILE, 'wb', self.seen_urls.dump)
+            self.write_atomic(FRONTIER_SEEN_FILE, 'wb', self.frontier.seen.dump)
+            # Les textes en attente d'écriture doivent être sur disque avant le checkpoint
+            self.sink.flush()
+            self.write_atomic(MANIFEST_FILE, 'w', self.manifest.dump)
+            self.write_atomic(CONTENT_STORE_FILE, 'w', self.content_store.dump)
+            self.write_atomic(REPORT_FILE, 'w', self.rejections.dump)
+
+            # Les URLs en cours de traitement sont remises en file à la reprise
+            pending = list(self.in_flight.values()) + self.scheduler.snapshot() + self.frontier.snapshot()
             state = {
-                'seen_urls': list(self.seen_urls),
-                'queue': list(self.queue),
+                'seen_urls_file': SEEN_URLS_FILE,
+                'frontier_seen_file': FRONTIER_SEEN_FILE,
+                'seen_count': len(self.seen_urls),
+                'queue': [list(entry) for entry in pending],
+                'domain_pages': self.domain_pages,
+                'trap_budgets': self.traps.state(),
                 'timestamp': datetime.now().isoformat()
             }
-            with open(os.path.join(self.output_dir, 'crawler_state.json'), 'w', encoding='utf-8') as f:
-                json.dump(state, f, indent=2)
+            self.write_atomic('crawler_state.json', 'w', lambda f: json.dump(state, f))
+
+            # Le journal n'est vidé qu'une fois l'état complet écrit
+            self.journal.reset()
             logging.info("État sauvegardé")
         except Exception as e:
             logging.error(f"Erreur sauvegarde état: {str(e)}")
 
+    def write_atomic(self, filename, mode, write):
+        """Écrit un fichier de l'état via un fichier temporaire renommé atomiquement"""
+        path = os.path.join(self.output_dir, filename)
+        encoding = None if 'b' in mode else 'utf-8'
+        with open(path + '.tmp', mode, encoding=encoding) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + '.tmp', path)
+
     def load_state(self):
         try:
             state_path = os.path.join(self.output_dir, 'crawler_state.json')
             if os.path.exists(state_path):
                 with open(state_path, 'r', encoding='utf-8') as f:
                     state = json.load(f)
-                self.seen_urls = set(state.get('seen_urls', []))
-                self.queue.extend(state.get('queue', []))
+                self.domain_pages = state.get('domain_pages', {})
+                self.traps.restore(state.get('trap_budgets', {}))
+                self.rejections.load(os.path.join(self.output_dir, REPORT_FILE))
+                # Les anciens états ne contiennent que l'URL, sans profondeur
+                queue = [(entry, 0) if isinstance(entry, str) else entry for entry in state.get('queue', [])]
+                if 'seen_urls' in state:
+                    # Ancien format: liste JSON des URLs visitées
+                    for url in state['seen_urls']:
+                        self.seen_urls.add(url)
+                        self.frontier.mark_seen(url)
+                    self.replay_journal(queue, restore=False)
+                else:
+                    seen_path = os.path.join(self.output_dir, state.get('seen_urls_file', SEEN_URLS_FILE))
+                    frontier_seen_path = os.path.join(
+                        self.output_dir, state.get('frontier_seen_file', FRONTIER_SEEN_FILE)
+                    )
+                    with open(seen_path, 'rb') as f:
+                        self.seen_urls = load_seen_set(f)
+                    restore = os.path.exists(frontier_seen_path)
+                    # Sans ensemble propre à la file, elle connaît au moins les URLs visitées
+                    with open(frontier_seen_path if restore else seen_path, 'rb') as f:
+                        self.frontier.close()
+                        self.frontier = self.create_frontier(seen=load_seen_set(f))
+                    self.replay_journal(queue, restore=restore)
                 logging.info("État chargé")
+            elif os.path.exists(self.journal.path):
+                # Arrêt brutal avant le premier checkpoint complet
+                self.replay_journal([(start_url, 0) for start_url in self.domains.start_urls()], restore=False)
+                logging.info("État reconstruit depuis le journal")
             else:
                 self.save_initial_state()
         except Exception as e:
             logging.error(f"Erreur chargement état: {str(e)}")
             self.save_initial_state()
 
+    def replay_journal(self, queue, restore):
+        """Reconstruit la file à partir du dernier checkpoint et du journal, puis compacte.
+
+        Avec restore=True, les URLs de la file sauvegardée sont déjà dans l'ensemble
+        de la file et y sont remises sans dédoublonnage.
+        """
+        visited, done, enqueued, stored = self.journal.replay()
+        # Manifeste et stockage par contenu: entrées écrites depuis leur dernière sauvegarde
+        for event, url, *values in stored:
+            if event == MANIFEST:
+                self.manifest.restore(url, *values)
+            elif event == CLAIM:
+                self.content_store.restore_claim(url, *values)
+            else:
+                self.content_store.restore_simhash(url, *values)
+        # Les URLs traitées depuis le checkpoint ne doivent pas être remises en file
+        finished = set()
+        for url in visited:
+            self.seen_urls.add(url)
+            finished.add(url)
+        for url in done:
+            finished.add(self.url_processor.normalize_url(url))
+        for url in finished:
+            self.frontier.mark_seen(url)
+        for url, depth in queue:
+            if self.url_processor.normalize_url(url) in finished:
+                continue
+            if restore:
+                self.frontier.restore(url, depth)
+            else:
+                self.frontier.push(url, depth)
+        for url, depth in enqueued:
+            self.frontier.push(url, depth)
+        logging.info("Journal rejoué: %s visites, %s ajouts", len(visited), len(enqueued))
+        self.save_state()
+
+    def enqueue(self, url, depth, priority=None):
+        """Ajoute une URL à la file et journalise l'ajout"""
+        if self.frontier.push(url, depth, priority):
+            self.journal.record_enqueue(url, depth)
+            return True
+        return False
+
     def safe_request(self, url, method='GET', **kwargs):
-        for attempt in range(self.config['timeouts']['max_retries']):
+        policy = self.retry_policy
+        for attempt in range(policy.attempts):
+            start = time.perf_counter()
             try:
                 response = self.session.request(
                     method,
@@ -105,189 +381,574 @@ class SafeCrawler:
                     verify=False,
                     **kwargs
                 )
+                self.record_response(url, response.status_code, time.perf_counter() - start)
                 response.raise_for_status()
                 return response
             except requests.exceptions.HTTPError as http_err:
-                if http_err.response and http_err.response.status_code == 404:
-                    logging.error(f"Page non trouvée: {url}")
-                    break  # Ne pas réessayer pour les erreurs 404
-                elif attempt == self.config['timeouts']['max_retries'] - 1:
-                    logging.error(f"Max retries atteints pour {url}: {str(http_err)}")
+                response = http_err.response
+                status = response.status_code if response is not None else None
+                if response is not None:
+                    response.close()  # Libère la connexion (réponse en flux non lue)
+                if status == 404:
+                    logging.error("Page non trouvée: %s", url)
+                    return None  # Ne pas réessayer pour les erreurs 404
+                elif status in THROTTLE_STATUSES:
+                    raise  # Le ralentissement est géré par l'ordonnanceur de l'hôte
+                elif not policy.should_retry(attempt, status):
+                    logging.error("Abandon de %s après %s tentative(s): %s", url, attempt + 1, http_err)
                     raise
-                else:
-                    logging.warning(f"Retrying {url} ({attempt + 1}/{self.config['timeouts']['max_retries']}) due to error: {str(http_err)}")
-                    time.sleep(2 ** attempt)
-            except Exception as e:
-                if attempt == self.config['timeouts']['max_retries'] - 1:
-                    logging.error(f"Max retries atteints pour {url}: {str(e)}")
+                logging.warning("Retrying %s (%s/%s) due to error: %s", url, attempt + 1, policy.attempts, http_err)
+                time.sleep(policy.delay(attempt))
+            except TRANSIENT_ERRORS as e:
+                self.record_response(url, None, time.perf_counter() - start)
+                if not policy.should_retry(attempt):
+                    logging.error("Max retries atteints pour %s: %s", url, e)
                     raise
-                logging.warning(f"Retrying {url} ({attempt + 1}/{self.config['timeouts']['max_retries']}) due to error: {str(e)}")
-                time.sleep(2 ** attempt)
+                logging.warning("Retrying %s (%s/%s) due to error: %s", url, attempt + 1, policy.attempts, e)
+                time.sleep(policy.delay(attempt))
 
     def process_url(self, url):
         try:
             if not self.url_processor.should_process_url(url):
                 return None
 
-            response = self.safe_request(url)
-            
-            content_type = response.headers.get('Content-Type', '').lower()
-            content_main_type = content_type.split(';')[0]  # Pour gérer les paramètres comme charset
-
-            if 'application/pdf' in content_main_type:
-                pdf_content = response.content  # Le contenu binaire du PDF
-                text = self.pdf_processor.extract_text_from_pdf(pdf_content)
-                return ('pdf', url, (text, pdf_content))
-            elif 'text/html' in content_main_type:
-                text = self.content_extractor.extract_text_from_html(response.content)
-                return ('html', url, text)
-            elif content_main_type.startswith('image/'):
-                return ('image', url, (response.content, content_type))
-            elif 'application/msword' in content_main_type or \
-                 'application/vnd.openxmlformats-officedocument.wordprocessingml.document' in content_main_type:
-                return ('document', url, response.content)
-            else:
-                logging.info(f"Type de contenu non supporté pour {url}: {content_type}")
+            prediction = self.prefilter.predict(url)
+            if prediction == SKIP:
+                self.prefilter.skip_url(url)
                 return None
+            if prediction == PROBE and not self.probe_url(url):
+                return None
+
+            headers = self.manifest.conditional_headers(url) if self.incremental else {}
+            fetch_start = time.perf_counter()
+            response = self.safe_request(url, stream=True, headers=headers)
+            if response is None:
+                return None
+            try:
+                if response.status_code == 304:
+                    return self.unchanged_result(url, response.headers)
+                download = self.start_download(url, response.headers)
+                if download is None:
+                    return None
+                content_type, sink = download
+                try:
+                    for chunk in response.iter_content(chunk_size=self.config['crawler']['chunk_size']):
+                        sink.write(chunk)
+                except Exception:
+                    sink.abort()
+                    raise
+                self.metrics.inc('crawler_bytes_total', sink.size)
+                self.metrics.observe_stage('fetch', time.perf_counter() - fetch_start)
+                return self.process_download(url, content_type, sink.commit(),
+                                             response.headers, sink.digest.hexdigest())
+            finally:
+                response.close()
+
+        except DownloadTooLarge as e:
+            logging.info("Téléchargement interrompu pour %s: %s", url, e)
+            return None
+        except requests.exceptions.HTTPError as http_err:
+            response = http_err.response
+            if response is not None and response.status_code in THROTTLE_STATUSES:
+                logging.warning("Serveur surchargé (%s) pour %s, report de la requête", response.status_code, url)
+                return ('retry', url, parse_retry_after(response.headers.get('Retry-After')))
+            logging.error("Erreur traitement %s: %s", url, http_err)
+            return None
+        except Exception as e:
+            logging.error("Erreur traitement %s: %s", url, e)
+            return None
 
+    def probe_url(self, url):
+        """Vérifie les en-têtes d'une URL de type incertain, retourne True si elle doit être téléchargée"""
+        try:
+            response = self.session.head(
+                url,
+                timeout=(self.config['timeouts']['connect'], self.config['timeouts']['read']),
+                allow_redirects=True,
+                verify=False
+            )
+            if response.status_code in (405, 501):
+                # HEAD refusé: une requête GET limitée au premier octet donne les mêmes en-têtes
+                response = self.session.get(
+                    url,
+                    headers={'Range': 'bytes=0-0'},
+                    timeout=(self.config['timeouts']['connect'], self.config['timeouts']['read']),
+                    verify=False,
+                    stream=True
+                )
+                response.close()
+            if response.status_code >= 400:
+                return True  # La requête GET gère les erreurs et les reprises
+            return self.accept_headers(url, response.headers) is not None
         except Exception as e:
-            logging.error(f"Erreur traitement {url}: {str(e)}")
+            logging.warning("Vérification HEAD impossible pour %s: %s", url, e)
+            return True
+
+    @staticmethod
+    def response_size(headers):
+        """Taille complète annoncée par les en-têtes (Content-Range ou Content-Length), ou None"""
+        content_range = headers.get('Content-Range', '')
+        total = content_range.rpartition('/')[2]
+        if total.isdigit():
+            return int(total)
+        content_length = headers.get('Content-Length', '')
+        return int(content_length) if content_length.isdigit() else None
+
+    def accept_headers(self, url, headers):
+        """Retourne le type de contenu géré d'après les en-têtes, ou None si le corps doit être ignoré"""
+        content_type = headers.get('Content-Type', '')
+        kind = self.classify_content_type(content_type)
+        size = self.response_size(headers)
+        if kind is None:
+            logging.debug("Type de contenu non supporté pour %s: %s", url, content_type)
+            self.prefilter.skip_response(content_type, size)
+            return None
+
+        max_bytes = self.config['crawler'].get('max_content_length')
+        if max_bytes and size and size > max_bytes:
+            logging.debug("Contenu trop volumineux ignoré pour %s: %s octets", url, size)
+            self.prefilter.skip_response(content_type, size)
+            return None
+        return kind
+
+    @staticmethod
+    def classify_content_type(content_type):
+        """Associe un en-tête Content-Type à un type de contenu géré, ou None"""
+        content_main_type = content_type.lower().split(';')[0].strip()  # Pour gérer les paramètres comme charset
+        if content_main_type == 'application/pdf':
+            return 'pdf'
+        elif content_main_type == 'text/html':
+            return 'html'
+        elif content_main_type.startswith('image/'):
+            return 'image'
+        elif content_main_type in ('application/msword',
+                                   'application/vnd.openxmlformats-officedocument.wordprocessingml.document'):
+            return 'document'
+        return None
+
+    def start_download(self, url, headers):
+        """Décide d'après les en-têtes si le corps doit être lu, avant de le télécharger.
+
+        Retourne None pour abandonner la réponse, sinon (Content-Type, destination):
+        les fichiers binaires sont écrits directement à leur emplacement final,
+        le HTML est gardé en mémoire pour l'extraction.
+        """
+        kind = self.accept_headers(url, headers)
+        if kind is None:
+            return None
+
+        content_type = headers.get('Content-Type', '')
+        max_bytes = self.config['crawler'].get('max_content_length')
+        if kind in BINARY_CONTENT_TYPES:
+            return content_type, SpoolFile(self.binary_path(url, kind, content_type), max_bytes)
+        return content_type, MemoryBuffer(max_bytes)
+
+    def binary_path(self, url, kind, content_type):
+        """Chemin de sauvegarde d'un fichier binaire sous FileHandler.files_dir"""
+        filename = self.url_processor.sanitize_filename(url)
+        content_main_type = content_type.lower().split(';')[0].strip()
+        if kind == 'image':
+            # Déterminer l'extension à partir du Content-Type
+            return os.path.join(self.file_handler.files_dir, 'image',
+                                f"{filename}.{content_main_type.split('/')[-1]}")
+        if kind == 'pdf':
+            extension = 'pdf'
+        elif content_main_type == 'application/vnd.openxmlformats-officedocument.wordprocessingml.document':
+            extension = 'docx'
+        else:
+            extension = 'doc'
+        return os.path.join(self.file_handler.files_dir, 'document', f"{filename}.{extension}")
+
+    def process_download(self, url, content_type, body, headers, content_hash):
+        """Enregistre les validateurs de la réponse puis en extrait le contenu s'il a changé.
+
+        Pour les types binaires, body est le fichier temporaire du téléchargement:
+        il n'est publié à son emplacement final que si son contenu n'est pas
+        déjà stocké pour une autre URL, sinon il est supprimé.
+        """
+        existing = None
+        if self.classify_content_type(content_type) in BINARY_CONTENT_TYPES:
+            if self.dedup_enabled:
+                existing = self.content_store.claim(url, content_hash, SpoolFile.final_path(body))
+            if existing:
+                # Fichier identique déjà stocké pour une autre URL: une seule copie est gardée
+                os.remove(body)
+            else:
+                body = SpoolFile.publish(body)
+        if self.incremental and self.manifest.is_unchanged(url, content_hash):
+            return self.unchanged_result(url, headers)
+        self.manifest.stage(
+            url,
+            etag=headers.get('ETag'),
+            last_modified=headers.get('Last-Modified'),
+            hash=content_hash
+        )
+        if existing:
+            return ('duplicate', url, existing)
+        return self.process_response(url, content_type, body)
+
+    def unchanged_result(self, url, headers):
+        """Résultat d'une URL inchangée depuis le crawl précédent (304 ou même empreinte)"""
+        validators = {
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified')
+        }
+        # Un 304 peut omettre les validateurs: on garde alors ceux du manifeste
+        self.manifest.stage(url, **{key: value for key, value in validators.items() if value})
+        return ('unchanged', url, self.manifest.get(url))
+
+    def process_response(self, url, content_type, body):
+        """Extrait le contenu d'une réponse téléchargée selon son type.
+
+        body contient le corps HTML, ou le chemin du fichier déjà écrit sur disque
+        pour les types binaires.
+        """
+        kind = self.classify_content_type(content_type)
+        if kind == 'pdf':
+            # Le texte est extrait plus tard par le pipeline PDF
+            return ('pdf', url, body)
+        elif kind == 'html':
+            # Texte et liens sont extraits du même corps de réponse
+            with self.metrics.time_stage('extract'):
+                text, links = self.content_extractor.extract(body, url)
+                signature = None
+                if self.dedup_enabled:
+                    signature = (content_hash(text), simhash(text) if self.content_store.near_duplicates else None)
+            return ('html', url, (text, links, signature))
+        elif kind == 'image':
+            return ('image', url, (body, content_type))
+        elif kind == 'document':
+            return ('document', url, body)
+        else:
+            logging.debug("Type de contenu non supporté pour %s: %s", url, content_type)
             return None
 
     def save_content(self, url, content_type, content):
-        """Sauvegarde le contenu extrait avec métadonnées"""
+        """Sauvegarde le contenu extrait avec métadonnées, retourne le chemin du fichier ou None"""
         try:
             filename = self.url_processor.sanitize_filename(url)
             
             if content_type == 'html':
-                filepath = os.path.join(self.output_dir, 'text', f"{filename}.txt")
-                os.makedirs(os.path.dirname(filepath), exist_ok=True)
-                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                formatted_content = f"""URL: {url}
-Timestamp: {timestamp}
-Content Type: {content_type}
-{'=' * 100}
-
-{content}
-
-{'=' * 100}
-Fin du contenu de : {url}"""
-                with open(filepath, "w", encoding='utf-8') as f:
-                    f.write(formatted_content)
-                logging.info(f"Contenu sauvegardé: {url} -> {filepath}")
+                with self.metrics.time_stage('save'):
+                    filepath = self.sink.write(url, content_type, content)
+                logging.debug("Contenu sauvegardé: %s -> %s", url, filepath)
+                return filepath
             elif content_type == 'pdf':
-                text, pdf_content = content  # Déballer le tuple
-                # Sauvegarder le texte extrait
-                txt_filepath = os.path.join(self.output_dir, 'text', f"{filename}.txt")
-                os.makedirs(os.path.dirname(txt_filepath), exist_ok=True)
-                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                formatted_content = f"""URL: {url}
-Timestamp: {timestamp}
-Content Type: {content_type}
-{'=' * 100}
-
-{text}
-
-{'=' * 100}
-Fin du contenu de : {url}"""
-                with open(txt_filepath, "w", encoding='utf-8') as f:
-                    f.write(formatted_content)
-                logging.info(f"Texte extrait sauvegardé : {url} -> {txt_filepath}")
-                
-                # Sauvegarder le PDF original
-                pdf_filepath = os.path.join(self.file_handler.files_dir, 'document', f"{filename}.pdf")
-                os.makedirs(os.path.dirname(pdf_filepath), exist_ok=True)
-                with open(pdf_filepath, "wb") as f:
-                    f.write(pdf_content)
-                logging.info(f"PDF original sauvegardé : {url} -> {pdf_filepath}")
+                # Le PDF original a été écrit pendant le téléchargement,
+                # son texte est sauvegardé par save_pdf_text une fois extrait
+                logging.debug("PDF original sauvegardé : %s -> %s", url, content)
+                self.pdf_pipeline.submit(url, content, self.save_pdf_text)
+                return content
             elif content_type == 'image':
-                image_content, content_type_header = content  # Déballer le tuple
-                # Déterminer l'extension à partir du Content-Type
-                extension = content_type_header.split('/')[-1]
-                filepath = os.path.join(self.file_handler.files_dir, 'image', f"{filename}.{extension}")
-                os.makedirs(os.path.dirname(filepath), exist_ok=True)
-                with open(filepath, "wb") as f:
-                    f.write(image_content)
-                logging.info(f"Image sauvegardée: {url} -> {filepath}")
+                # L'image a été écrite pendant le téléchargement
+                filepath, content_type_header = content  # Déballer le tuple
+                logging.debug("Image sauvegardée: %s -> %s", url, filepath)
+                return filepath
             elif content_type == 'document':
-                # Déterminer l'extension à partir du Content-Type
-                if 'application/vnd.openxmlformats-officedocument.wordprocessingml.document' in content_type:
-                    extension = 'docx'
-                else:
-                    extension = 'doc'
-                filepath = os.path.join(self.file_handler.files_dir, 'document', f"{filename}.{extension}")
-                os.makedirs(os.path.dirname(filepath), exist_ok=True)
-                with open(filepath, "wb") as f:
-                    f.write(content)
-                logging.info(f"Document sauvegardé: {url} -> {filepath}")
+                # Le document a été écrit pendant le téléchargement
+                logging.debug("Document sauvegardé: %s -> %s", url, content)
+                return content
             else:
                 filepath = os.path.join(self.output_dir, 'text', f"{filename}.txt")
                 os.makedirs(os.path.dirname(filepath), exist_ok=True)
                 with open(filepath, "w", encoding='utf-8') as f:
                     f.write(content)
-                logging.info(f"Contenu texte sauvegardé: {url} -> {filepath}")
+                logging.debug("Contenu texte sauvegardé: %s -> %s", url, filepath)
+                return filepath
+        except Exception as e:
+            logging.error("Erreur sauvegarde %s: %s", url, e)
+            return None
+
+    def save_pdf_text(self, url, text):
+        """Sauvegarde le texte extrait d'un PDF, appelé par le pipeline PDF"""
+        with self.metrics.time_stage('save'):
+            txt_filepath = self.sink.write(url, 'pdf', text)
+        logging.debug("Texte extrait sauvegardé : %s -> %s", url, txt_filepath)
+
+    def store_result(self, result):
+        """Écrit le contenu d'un résultat avant sa prise en compte par handle_result.
+
+        Le texte d'une page (sauf doublon) part vers la destination, un PDF vers
+        le pipeline d'extraction. Seuls le stockage par contenu (verrouillé) et
+        la destination sont utilisés: le moteur async l'exécute hors de la boucle.
+        Les pages deviennent des résultats 'page', les fichiers des résultats
+        'saved'; les autres résultats, déjà écrits, sont retournés tels quels.
+        """
+        if not result:
+            return result
+        content_type, url, content = result
+        try:
+            if content_type == 'html':
+                text, links, signature = content  # Déballer le tuple
+                existing = duplicate_of = None
+                if signature:
+                    digest, fingerprint = signature
+                    existing = self.content_store.claim(url, digest, self.sink.location(url))
+                    if not existing:
+                        duplicate_of = self.content_store.near_duplicate_of(url, fingerprint)
+                # Texte identique déjà sauvegardé (miroir, version imprimable...): rien à écrire
+                path = existing or self.save_content(url, 'html', text)
+                return ('page', url, (path, links, existing, duplicate_of))
+            if content_type in ('pdf', 'image', 'document'):
+                return ('saved', url, (content_type, self.save_content(url, content_type, content)))
         except Exception as e:
-            logging.error(f"Erreur sauvegarde {url}: {str(e)}")
+            logging.error("Erreur sauvegarde %s: %s", url, e)
+            return None
+        return result
 
-    def handle_result(self, content_type, url, content):
+    def handle_result(self, content_type, url, content, depth=0):
         try:
             normalized_url = self.url_processor.normalize_url(url)
             if normalized_url not in self.seen_urls:
                 self.seen_urls.add(normalized_url)
-                self.save_content(url, content_type, content)
+                self.journal.record_visit(normalized_url)
+                if self.domains.multi:
+                    self.count_domain_page(url)
+                if content_type == 'page':
+                    kind = 'html'
+                elif content_type == 'saved':
+                    kind = content[0]
+                else:
+                    kind = content_type
+                self.metrics.inc('crawler_pages_total', kind=kind)
                 
-                if content_type == 'html':
-                    self.queue_new_links(url)
+                if content_type == 'unchanged':
+                    # Contenu identique au crawl précédent: ni extraction ni réécriture
+                    logging.debug("Contenu inchangé: %s", url)
+                    self.manifest.commit(url)
+                    if not content.get('duplicate_of'):
+                        self.queue_new_links(url, content.get('links', []), depth + 1)
+                elif content_type == 'duplicate':
+                    logging.debug("Doublon de %s: %s", content, url)
+                    self.manifest.commit(url, path=content)
+                elif content_type == 'page':
+                    path, links, existing, duplicate_of = content  # Déballer le tuple
+                    self.handle_page(url, path, links, existing, duplicate_of, depth)
+                elif content_type == 'saved':
+                    path = content[1]
+                    if path:
+                        self.manifest.commit(url, path=path)
         except Exception as e:
-            logging.error(f"Erreur traitement résultat {url}: {str(e)}")
+            logging.error("Erreur traitement résultat %s: %s", url, e)
 
-    def queue_new_links(self, url):
+    def handle_page(self, url, path, links, existing, duplicate_of, depth):
+        """Enregistre une page déjà sauvegardée et suit ses liens, sauf si la page est un doublon"""
+        if existing:
+            logging.debug("Doublon de %s: %s", existing, url)
+            self.manifest.commit(url, path=existing, links=links, duplicate_of=existing)
+            return
+        if path:
+            self.manifest.commit(url, path=path, links=links, duplicate_of=duplicate_of)
+        if duplicate_of:
+            logging.debug("Quasi-doublon de %s, liens non suivis: %s", duplicate_of, url)
+        else:
+            self.queue_new_links(url, links, depth + 1)
+
+    def queue_new_links(self, url, links, depth):
+        """Ajoute à la file les liens déjà extraits de la page, sans nouvelle requête"""
         try:
-            response = self.safe_request(url)
-            links = self.content_extractor.extract_links(response.content, url)
-            
-            for link in links:
-                normalized_link = self.url_processor.normalize_url(link)
-                if normalized_link not in self.seen_urls and self.url_processor.should_process_url(link):
-                    self.queue.append(link)
+            accepted, rejected = self.url_processor.partition_links(links, depth)
+            for link, reason in rejected:
+                self.rejections.reject(reason, link)
+            for link in accepted:
+                self.queue_link(link, depth)
         except Exception as e:
-            logging.error(f"Erreur extraction liens {url}: {str(e)}")
+            logging.error("Erreur extraction liens %s: %s", url, e)
+
+    def queue_link(self, link, depth, priority=None):
+        """Ajoute à la file un lien déjà filtré, retourne True s'il a été ajouté"""
+        # La file ignore les URLs déjà ajoutées ou déjà visitées
+        if link in self.frontier:
+            return False
+        if not self.robots.allowed(link):
+            # Interdite: marquée comme connue pour n'être vérifiée qu'une fois
+            self.frontier.mark_seen(link)
+            self.rejections.reject('robots', link)
+            return False
+        if self.prefilter.predict(link) == SKIP:
+            # Jamais conservée: marquée comme connue pour n'être comptée qu'une fois
+            self.prefilter.skip_url(link)
+            self.frontier.mark_seen(link)
+            self.rejections.reject('prefilter', link)
+            return False
+        verdict, reason = self.traps.check(link)
+        if verdict == DROP:
+            self.frontier.mark_seen(link)
+            self.rejections.reject(reason, link)
+            return False
+        if verdict == DEPRIORITIZE:
+            # Servie après les autres URLs: explorée seulement si le reste de la file s'épuise
+            self.rejections.reject(f"deprioritized:{reason}", link)
+            priority = (depth if priority is None else priority) + self.traps.penalty
+        if self.enqueue(link, depth, priority):
+            self.traps.admit(link)
+            return True
+        return False
+
+    def apply_crawl_delay(self, host, rules):
+        """Applique le Crawl-delay d'un robots.txt à l'ordonnanceur, plafonné par robots.max_crawl_delay"""
+        if rules.crawl_delay:
+            delay = min(rules.crawl_delay, self.config.get('robots', {}).get('max_crawl_delay', 30))
+            self.scheduler.set_host_delay(host, delay)
+            logging.info("Crawl-delay de %ss appliqué à %s", delay, host)
+
+    def seed_from_sitemaps(self):
+        """Ajoute à la file les URLs des sitemaps de chaque domaine, les plus récemment modifiées en premier"""
+        if not self.config.get('sitemaps', {}).get('enabled', True):
+            return
+        for domain in self.domains:
+            try:
+                start_url = domain.start_urls[0]
+                sitemap_urls = list(domain.config['sitemaps']['urls'])
+                if self.robots.enabled:
+                    sitemap_urls += self.robots.rules_for(start_url).sitemaps
+                if not sitemap_urls:
+                    parts = urlsplit(start_url)
+                    sitemap_urls = [f"{parts.scheme}://{parts.netloc}/sitemap.xml"]
+
+                reader = SitemapReader(domain.config, self.session)
+                added, batch = 0, []
+                for entry in reader.read(sitemap_urls):
+                    batch.append(entry)
+                    if len(batch) >= SITEMAP_BATCH:
+                        added += self.queue_sitemap_batch(start_url, batch)
+                        batch = []
+                added += self.queue_sitemap_batch(start_url, batch)
+                logging.info("%s URLs ajoutées à la file depuis les sitemaps de %s", added, domain.name)
+            except Exception as e:
+                logging.error(f"Erreur amorçage depuis les sitemaps de {domain.name}: {str(e)}")
+
+    def queue_sitemap_batch(self, base_url, entries):
+        """Filtre un lot de (url, lastmod) de sitemap et l'ajoute à la file, priorité d'après lastmod"""
+        lastmods = {}
+        for loc, lastmod in entries:
+            url = self.url_processor.canonicalizer.resolve(base_url, loc)
+            if url is not None:
+                lastmods[url] = lastmod
+        added = 0
+        accepted, rejected = self.url_processor.partition_links(list(lastmods), 1)
+        for link, reason in rejected:
+            self.rejections.reject(reason, link)
+        for link in accepted:
+            if self.queue_link(link, 1, lastmod_priority(lastmods[link])):
+                added += 1
+        return added
+
+    def should_stop(self):
+        max_pages = self.config['crawler'].get('max_pages', self.config['crawler']['max_queue_size'])
+        return len(self.seen_urls) >= max_pages
+
+    def schedule_queued_urls(self):
+        """Alimente les files par hôte de l'ordonnanceur depuis la file principale"""
+        buffer_size = self.config['crawler'].get('scheduler_buffer', 1000)
+        while len(self.scheduler) < buffer_size:
+            entry = self.frontier.pop()
+            if entry is None:
+                break
+            self.scheduler.push(urlparse(entry[0]).netloc, entry)
+
+    def start_task(self, task):
+        """Marque une tâche de l'ordonnanceur comme en cours, retourne (hôte, (url, profondeur))"""
+        host, entry = task
+        self.in_flight[entry[0]] = entry
+        return host, entry
+
+    def has_pending_urls(self):
+        return self.frontier.has_pending() or len(self.scheduler) > 0
+
+    def finish_task(self, host, entry, result):
+        """Libère l'hôte et traite le résultat, ou reporte l'URL si le serveur est surchargé"""
+        url, depth = entry
+        self.in_flight.pop(url, None)
+        if result and result[0] == 'retry':
+            self.scheduler.release(host, throttled=True, retry_after=result[2])
+            attempts = self.throttle_attempts.get(url, 0) + 1
+            if attempts < self.config['timeouts']['max_retries']:
+                self.throttle_attempts[url] = attempts
+                self.scheduler.push(host, entry, front=True)
+                return
+            logging.error("Max retries atteints pour %s: serveur surchargé", url)
+        else:
+            self.scheduler.release(host)
+            self.on_result(result, depth)
+            self.manifest.discard(url)  # Réponse reçue mais contenu non sauvegardé
+        self.throttle_attempts.pop(url, None)
+        self.journal_stores()
+        self.frontier.done(url)
+        self.journal.record_done(url)
+        if self.journal.events_since_compaction >= self.compact_every:
+            self.save_state()
+
+    def journal_stores(self):
+        """Journalise les entrées du manifeste et du stockage par contenu écrites depuis le dernier appel"""
+        for url, entry in self.manifest.drain_changes():
+            self.journal.record_manifest(url, entry)
+        for change in self.content_store.drain_changes():
+            if len(change) == 3:
+                self.journal.record_claim(*change)
+            else:
+                self.journal.record_simhash(*change)
 
     def crawl(self):
-        with concurrent.futures.ThreadPoolExecutor(
-            max_workers=self.config['crawler']['max_workers']
-        ) as executor:
-            while self.queue and len(self.seen_urls) < self.config['crawler']['max_queue_size']:
+        max_workers = self.config['crawler']['max_workers']
+        futures = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while futures or (self.has_pending_urls() and not self.should_stop()):
                 try:
-                    urls_batch = []
-                    for _ in range(min(self.config['crawler']['max_workers'], len(self.queue))):
-                        if self.queue:
-                            urls_batch.append(self.queue.popleft())
-
-                    futures = {executor.submit(self.process_url, url): url for url in urls_batch}
-                    
-                    for future in concurrent.futures.as_completed(futures):
-                        url = futures[future]
+                    self.schedule_queued_urls()
+
+                    # Remplit les workers libres avec les hôtes prêts
+                    while len(futures) < max_workers and not self.should_stop():
+                        task = self.scheduler.pop()
+                        if task is None:
+                            break
+                        host, entry = self.start_task(task)
+                        futures[executor.submit(self.process_url, entry[0])] = (host, entry)
+
+                    if not futures:
+                        time.sleep(min(self.scheduler.wait_time() or 0.05, 1.0))
+                        continue
+
+                    # Se réveille dès qu'un worker termine ou qu'un hôte redevient prêt
+                    done, _ = concurrent.futures.wait(
+                        futures,
+                        timeout=self.scheduler.wait_time(),
+                        return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+                    for future in done:
+                        host, entry = futures.pop(future)
                         try:
-                            result = future.result()
-                            if result:
-                                self.handle_result(*result)
-                                self.step_counter += 1
-                                # Tous les 5 pas, afficher l'ASCII art
-                                if self.step_counter % 60 == 0:
-                                    self.display_ascii_art()
+                            self.finish_task(host, entry, future.result())
                         except Exception as e:
-                            logging.error(f"Erreur traitement {url}: {str(e)}")
-
-                    time.sleep(random.uniform(
-                        self.config['crawler']['delay_min'],
-                        self.config['crawler']['delay_max']
-                    ))
+                            logging.error("Erreur traitement %s: %s", entry[0], e)
 
                 except Exception as e:
-                    logging.error(f"Erreur boucle principale: {str(e)}")
+                    logging.error("Erreur boucle principale: %s", e)
                     continue
 
+    def close(self):
+        """Libère les ressources du crawler une fois l'état final sauvegardé"""
+        self.pdf_pipeline.close()
+        if self.metrics_reporter is not None:
+            self.metrics_reporter.close()
+        self.session.close()
+        self.sink.close()
+        self.prefilter.log_summary()
+        self.rejections.log_summary()
+        self.journal.close()
+        self.frontier.close()
+
+    def on_result(self, result, depth=0):
+        """Traite le résultat d'un worker dans le thread de la boucle principale"""
+        result = self.store_result(result)  # Déjà fait hors de la boucle par le moteur async
+        if result:
+            self.handle_result(*result, depth=depth)
+            self.step_counter += 1
+            # Tous les 60 pas, afficher l'ASCII art
+            if self.banner and self.step_counter % 60 == 0:
+                self.display_ascii_art()
+
     def display_ascii_art(self):
+        import pyfiglet  # Chargé au premier affichage seulement
         ascii_art = pyfiglet.figlet_format("Your crawling is in process")
         print(ascii_art)
@@ -0,0 +1,171 @@
+# src/dedup.py
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+
+WORD_PATTERN = re.compile(r'\w+')
+SHINGLE_SIZE = 3  # Mots par fragment pour la SimHash
+SIMHASH_BANDS = 4  # Tranches de 16 bits indexées (distance maximale détectée: BANDS - 1)
+MIN_SIMHASH_WORDS = 50  # En dessous, deux pages courtes d'un même gabarit paraîtraient identiques
+
+
+def content_hash(data):
+    """Empreinte SHA-256 d'un contenu (texte ou octets)"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+def simhash(text):
+    """SimHash 64 bits du texte, calculée sur des fragments de SHINGLE_SIZE mots (0 si trop court)"""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < MIN_SIMHASH_WORDS:
+        return 0
+    shingles = {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(max(1, len(words) - SHINGLE_SIZE + 1))}
+    # Chaque fragment vote pour chacun des 64 bits: colonnes des représentations binaires
+    hashes = [
+        format(int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'little'), '064b')
+        for s in shingles
+    ]
+    half = len(hashes) / 2
+    return int(''.join('1' if column.count('1') > half else '0' for column in zip(*hashes)), 2)
+
+
+class SimHashIndex:
+    """Index des SimHash des pages déjà vues, pour détecter les quasi-doublons.
+
+    Deux empreintes à distance de Hamming <= max_distance (< SIMHASH_BANDS)
+    partagent au moins une tranche de 16 bits identique: seules les empreintes
+    partageant une tranche avec la page sont comparées.
+    """
+
+    def __init__(self, max_distance=3):
+        self.max_distance = min(max_distance, SIMHASH_BANDS - 1)
+        self.bands = [{} for _ in range(SIMHASH_BANDS)]
+        self.by_url = {}  # URL -> empreinte
+
+    def __len__(self):
+        return len(self.by_url)
+
+    @staticmethod
+    def _band_keys(fingerprint):
+        return [(fingerprint >> (16 * band)) & 0xFFFF for band in range(SIMHASH_BANDS)]
+
+    def find(self, fingerprint, exclude=None):
+        """Retourne l'URL d'une page indexée proche de fingerprint (autre que exclude), ou None"""
+        for band, key in zip(self.bands, self._band_keys(fingerprint)):
+            for candidate, url in band.get(key, ()):
+                if url != exclude and bin(candidate ^ fingerprint).count('1') <= self.max_distance:
+                    return url
+        return None
+
+    def add(self, fingerprint, url):
+        if url in self.by_url:
+            return  # Page déjà indexée lors d'un crawl précédent
+        self.by_url[url] = fingerprint
+        for band, key in zip(self.bands, self._band_keys(fingerprint)):
+            band.setdefault(key, []).append((fingerprint, url))
+
+
+class ContentStore:
+    """Stockage par contenu: chaque contenu distinct n'est écrit qu'une fois.
+
+    paths associe l'empreinte d'un contenu au fichier qui le contient, aliases
+    associe chaque URL à l'empreinte de son contenu. Une URL dont le contenu est
+    déjà stocké est enregistrée comme alias du fichier existant. L'index SimHash
+    optionnel repère les pages HTML presque identiques (versions imprimables,
+    miroirs) dont les liens n'ont pas besoin d'être suivis.
+    """
+
+    def __init__(self, path, near_duplicates=False, max_distance=3, exists=os.path.exists):
+        self.path = path
+        self.exists = exists  # Vérifie qu'un emplacement enregistré existe toujours
+        self.paths = {}  # Empreinte -> fichier
+        self.aliases = {}  # URL -> empreinte
+        self.near_duplicates = near_duplicates
+        self.simhashes = SimHashIndex(max_distance) if near_duplicates else None
+        self.changes = []  # (url, empreinte, fichier) et (url, simhash) pas encore journalisés
+        self.lock = threading.Lock()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.paths = data.get('paths', {})
+            self.aliases = data.get('aliases', {})
+            if self.simhashes is not None:
+                for url, fingerprint in data.get('simhashes', {}).items():
+                    self.simhashes.add(fingerprint, url)
+            logging.info("Stockage par contenu chargé: %s contenus, %s URLs", len(self.paths), len(self.aliases))
+        except Exception as e:
+            logging.error(f"Erreur chargement stockage par contenu: {str(e)}")
+
+    def dump(self, f):
+        with self.lock:
+            data = {'paths': self.paths, 'aliases': self.aliases}
+            if self.simhashes is not None:
+                data['simhashes'] = self.simhashes.by_url
+            json.dump(data, f, ensure_ascii=False)
+
+    def lookup(self, digest):
+        """Fichier contenant déjà ce contenu, ou None"""
+        path = self.paths.get(digest)
+        return path if path and self.exists(path) else None
+
+    def claim(self, url, digest, path):
+        """Enregistre le contenu d'une URL écrit dans path.
+
+        Retourne le fichier existant si ce contenu était déjà stocké ailleurs
+        (path peut alors être supprimé), sinon None.
+        """
+        with self.lock:
+            existing = self.lookup(digest)
+            if existing and existing != path:
+                self._record(url, digest, None)
+                return existing
+            self._record(url, digest, path)
+            return None
+
+    def _record(self, url, digest, path):
+        """Associe l'URL à l'empreinte et, si path est donné, l'empreinte au fichier (verrou tenu)"""
+        previous = self.aliases.get(url)
+        self.aliases[url] = digest
+        if path is not None:
+            if previous is not None and previous != digest and self.paths.get(previous) == path:
+                # path va recevoir le nouveau contenu de l'URL: l'ancien n'y est plus stocké
+                del self.paths[previous]
+            self.paths[digest] = path
+        self.changes.append((url, digest, path))
+
+    def restore_claim(self, url, digest, path):
+        """Rejoue un enregistrement journalisé"""
+        with self.lock:
+            self._record(url, digest, path)
+            self.changes.pop()
+
+    def restore_simhash(self, url, fingerprint):
+        if self.simhashes is not None:
+            with self.lock:
+                self.simhashes.add(fingerprint, url)
+
+    def drain_changes(self):
+        """Enregistrements faits depuis l'appel précédent, à journaliser"""
+        with self.lock:
+            changes, self.changes = self.changes, []
+            return changes
+
+    def near_duplicate_of(self, url, fingerprint):
+        """URL d'une autre page presque identique déjà vue, ou None (la page est alors indexée)"""
+        if self.simhashes is None or not fingerprint:
+            return None
+        with self.lock:
+            original = self.simhashes.find(fingerprint, exclude=url)
+            if original is None:
+                self.simhashes.add(fingerprint, url)
+                self.changes.append((url, fingerprint))
+            return original
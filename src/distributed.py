@@ -0,0 +1,470 @@
+# src/distributed.py
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import zlib
+from collections import deque
+from urllib.parse import urlsplit
+
+SHARED_FRONTIER_FILE = 'shared_frontier.sqlite'
+
+# États d'une URL dans la file partagée SQLite
+PENDING, LEASED, DONE, SEEN = 0, 1, 2, 3
+
+
+def shard_of(url, shards, by='host'):
+    """Partition d'une URL: par hôte, toutes les URLs d'un même hôte vont au même worker"""
+    key = urlsplit(url).netloc.lower() if by == 'host' else url
+    return zlib.crc32(key.encode('utf-8')) % shards
+
+
+class SQLiteFrontierBackend:
+    """File et ensemble d'URLs vues partagés entre processus d'une même machine (SQLite en WAL).
+
+    Chaque URL est une ligne (clé normalisée unique) avec son état: en attente,
+    louée à un worker jusqu'à une échéance, traitée, ou seulement connue. Une
+    location expirée (worker arrêté) redevient disponible.
+    """
+
+    def __init__(self, path, shards):
+        self.path = path
+        self.shards = shards
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS urls (key TEXT PRIMARY KEY, url TEXT, depth INTEGER, "
+            "shard INTEGER, state INTEGER, expires REAL, worker TEXT)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS urls_queue ON urls (shard, state, depth)")
+
+    def _write(self, operation):
+        """Exécute operation(db) dans une transaction d'écriture exclusive entre processus"""
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                result = operation(self.db)
+                self.db.execute("COMMIT")
+                return result
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+
+    def add(self, entries):
+        """Ajoute des (clé, url, profondeur, partition, seulement_connue) jamais vues"""
+        rows = [(key, url, depth, shard, SEEN if seen_only else PENDING)
+                for key, url, depth, shard, seen_only in entries]
+        self._write(lambda db: db.executemany(
+            "INSERT OR IGNORE INTO urls (key, url, depth, shard, state) VALUES (?, ?, ?, ?, ?)", rows
+        ))
+
+    def lease(self, shards, count, timeout, worker):
+        """Loue jusqu'à count URLs en attente des partitions données, retourne [(clé, url, profondeur, jeton)]"""
+        now = time.time()
+        placeholders = ','.join('?' * len(shards))
+
+        def take(db):
+            rows = db.execute(
+                f"SELECT key, url, depth FROM urls WHERE shard IN ({placeholders}) "
+                f"AND (state = ? OR (state = ? AND expires < ?)) ORDER BY depth LIMIT ?",
+                (*shards, PENDING, LEASED, now, count)
+            ).fetchall()
+            db.executemany(
+                "UPDATE urls SET state = ?, expires = ?, worker = ? WHERE key = ?",
+                [(LEASED, now + timeout, worker, key) for key, _, _ in rows]
+            )
+            return [(key, url, depth, key) for key, url, depth in rows]
+
+        return self._write(take)
+
+    def complete(self, tokens):
+        self._write(lambda db: db.executemany(
+            "UPDATE urls SET state = ? WHERE key = ?", [(DONE, token) for token in tokens]
+        ))
+
+    def release(self, tokens):
+        """Remet immédiatement en file des URLs louées non traitées"""
+        self._write(lambda db: db.executemany(
+            "UPDATE urls SET state = ? WHERE key = ? AND state = ?", [(PENDING, token, LEASED) for token in tokens]
+        ))
+
+    def renew(self, worker, tokens, timeout):
+        self._write(lambda db: db.execute(
+            "UPDATE urls SET expires = ? WHERE worker = ? AND state = ?", (time.time() + timeout, worker, LEASED)
+        ))
+
+    def counts(self, shards=None):
+        """(URLs en attente, URLs louées) des partitions données, ou de toutes"""
+        now = time.time()
+        where, params = '', ()
+        if shards is not None:
+            where, params = f"AND shard IN ({','.join('?' * len(shards))})", tuple(shards)
+        with self.lock:
+            pending, leased = self.db.execute(
+                f"SELECT COALESCE(SUM(state = ? OR (state = ? AND expires < ?)), 0), "
+                f"COALESCE(SUM(state = ? AND expires >= ?), 0) FROM urls WHERE state IN (?, ?) {where}",
+                (PENDING, LEASED, now, LEASED, now, PENDING, LEASED, *params)
+            ).fetchone()
+        return pending, leased
+
+    def done_count(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM urls WHERE state = ?", (DONE,)).fetchone()[0]
+
+    def reset(self):
+        self._write(lambda db: db.execute("DELETE FROM urls"))
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+class RedisFrontierBackend:
+    """File et ensemble d'URLs vues partagés entre machines, dans Redis (ou un serveur compatible).
+
+    {préfixe}:seen est l'ensemble des clés déjà vues, {préfixe}:queue:N la file
+    de la partition N (triée par profondeur), {préfixe}:leases:N ses URLs
+    louées, triées par échéance, et {préfixe}:owners:N le worker de chaque
+    location. Les passages d'un ensemble à l'autre sont des transactions
+    MULTI/WATCH.
+    """
+
+    def __init__(self, url, shards, prefix='crawler'):
+        # Dépendance optionnelle, importée seulement pour ce backend
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("Le backend redis nécessite le paquet redis (pip install redis)")
+        self.client = redis.Redis.from_url(url)
+        self.shards = shards
+        self.prefix = prefix
+
+    def _key(self, *parts):
+        return ':'.join((self.prefix,) + tuple(str(part) for part in parts))
+
+    def add(self, entries):
+        if not entries:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        for key, _, _, _, _ in entries:
+            pipe.sadd(self._key('seen'), key)
+        added = pipe.execute()
+        pipe = self.client.pipeline(transaction=False)
+        for (key, url, depth, shard, seen_only), new in zip(entries, added):
+            if new and not seen_only:
+                pipe.zadd(self._key('queue', shard), {json.dumps([key, url, depth]): depth})
+        pipe.execute()
+
+    def _reclaim(self, shard):
+        """Remet en file les URLs louées dont l'échéance est passée"""
+        leases = self._key('leases', shard)
+
+        def move(pipe):
+            members = pipe.zrangebyscore(leases, '-inf', time.time())
+            pipe.multi()
+            if members:
+                pipe.zrem(leases, *members)
+                pipe.hdel(self._key('owners', shard), *members)
+                pipe.zadd(self._key('queue', shard), {member: json.loads(member)[2] for member in members})
+
+        self.client.transaction(move, leases)
+
+    def lease(self, shards, count, timeout, worker):
+        leased = []
+        expires = time.time() + timeout
+        for shard in shards:
+            if len(leased) >= count:
+                break
+            self._reclaim(shard)
+            queue = self._key('queue', shard)
+            wanted = count - len(leased)
+
+            def take(pipe):
+                # Retrait de la file et location dans une même transaction (MULTI/WATCH):
+                # un worker arrêté entre les deux ne peut pas perdre d'URL
+                members = pipe.zrange(queue, 0, wanted - 1)
+                pipe.multi()
+                if members:
+                    pipe.zrem(queue, *members)
+                    pipe.zadd(self._key('leases', shard), {member: expires for member in members})
+                    pipe.hset(self._key('owners', shard), mapping={member: worker for member in members})
+                return members
+
+            for member in self.client.transaction(take, queue, value_from_callable=True):
+                key, url, depth = json.loads(member)
+                leased.append((key, url, depth, (shard, member, worker)))
+        return leased
+
+    def _update_owned(self, tokens, update):
+        """Applique update(pipe, partition, membres) aux seules locations encore détenues par leur worker.
+
+        {préfixe}:owners:N associe chaque URL louée à son worker; toute location ou
+        reprise le modifie, ce qui annule (WATCH) puis rejoue la vérification.
+        """
+        groups = {}
+        for shard, member, worker in tokens:
+            groups.setdefault((shard, worker), []).append(member)
+        for (shard, worker), members in groups.items():
+            owners = self._key('owners', shard)
+
+            def apply(pipe):
+                current = pipe.hmget(owners, members)
+                owned = [member for member, owner in zip(members, current) if owner == worker.encode()]
+                pipe.multi()
+                if owned:
+                    update(pipe, shard, owned)
+
+            self.client.transaction(apply, owners)
+
+    def complete(self, tokens):
+        def finish(pipe, shard, members):
+            pipe.zrem(self._key('leases', shard), *members)
+            pipe.hdel(self._key('owners', shard), *members)
+
+        self._update_owned(tokens, finish)
+        self.client.incrby(self._key('done'), len(tokens))
+
+    def release(self, tokens):
+        def requeue(pipe, shard, members):
+            pipe.zrem(self._key('leases', shard), *members)
+            pipe.hdel(self._key('owners', shard), *members)
+            pipe.zadd(self._key('queue', shard), {member: json.loads(member)[2] for member in members})
+
+        self._update_owned(tokens, requeue)
+
+    def renew(self, worker, tokens, timeout):
+        expires = time.time() + timeout
+
+        def extend(pipe, shard, members):
+            # XX: ne recrée pas une location reprise puis terminée entre-temps
+            pipe.zadd(self._key('leases', shard), {member: expires for member in members}, xx=True)
+
+        self._update_owned(tokens, extend)
+
+    def counts(self, shards=None):
+        shards = range(self.shards) if shards is None else shards
+        now = time.time()
+        pipe = self.client.pipeline(transaction=False)
+        for shard in shards:
+            pipe.zcard(self._key('queue', shard))
+            pipe.zcount(self._key('leases', shard), '-inf', now)
+            pipe.zcount(self._key('leases', shard), now, '+inf')
+        results = pipe.execute()
+        pending = sum(results[0::3]) + sum(results[1::3])  # Locations expirées comprises
+        return pending, sum(results[2::3])
+
+    def done_count(self):
+        return int(self.client.get(self._key('done')) or 0)
+
+    def reset(self):
+        keys = list(self.client.scan_iter(match=self._key('*')))
+        if keys:
+            self.client.delete(*keys)
+
+    def close(self):
+        self.client.close()
+
+
+def create_frontier_backend(config):
+    """Backend de la file partagée selon la section distributed de la configuration"""
+    settings = config.get('distributed', {})
+    shards = settings.get('shards', 64)
+    backend = settings.get('backend', 'sqlite')
+    if backend == 'sqlite':
+        return SQLiteFrontierBackend(settings['sqlite_path'], shards)
+    if backend == 'redis':
+        return RedisFrontierBackend(settings.get('redis_url', 'redis://localhost:6379/0'), shards,
+                                    prefix=settings.get('key_prefix', 'crawler'))
+    raise ValueError(f"Backend de file partagée inconnu: {backend}")
+
+
+def start_local_redis(url):
+    """Démarre un serveur compatible Redis en mémoire (fakeredis) sur l'adresse de url"""
+    try:
+        from fakeredis import TcpFakeServer
+    except ImportError:
+        raise RuntimeError("Le serveur Redis local nécessite fakeredis (pip install fakeredis)")
+    parsed = urlsplit(url)
+    server = TcpFakeServer((parsed.hostname or 'localhost', parsed.port or 6379))
+    threading.Thread(target=server.serve_forever, name='LocalRedis', daemon=True).start()
+    logging.info("Serveur Redis local (fakeredis) démarré sur %s:%s", parsed.hostname, parsed.port)
+    return server
+
+
+class DistributedFrontier:
+    """File d'URLs d'un worker, adossée à une file partagée entre processus ou machines.
+
+    Même interface que URLFrontier. Les URLs sont réparties en partitions par
+    hachage de l'hôte (ou de l'URL entière avec shard_by: url); le worker i
+    traite les partitions N où N % workers == i. Par hôte, la politesse reste
+    locale à un seul worker. Les URLs sont
+    louées par lots pour lease_timeout secondes, prolongés tant que le worker
+    les traite: celles d'un worker arrêté reviennent dans la file à l'échéance.
+    Les ajouts et les fins de traitement sont envoyés par lots. L'appartenance
+    (in) ne consulte que les URLs connues localement: push() reste
+    dédoublonné par le backend.
+    """
+
+    FLUSH_SIZE = 500
+    FLUSH_INTERVAL = 0.5  # Secondes maximales avant l'envoi des lots
+    POLL_INTERVAL = 0.5  # Secondes entre deux consultations d'une file vide
+
+    def __init__(self, backend, normalize, worker_index, workers, seen, lease_size=100, lease_timeout=300,
+                 shard_by='host'):
+        self.backend = backend
+        self.shard_by = shard_by
+        self.normalize = normalize
+        self.worker = f"{socket.gethostname()}:{os.getpid()}:{worker_index}"
+        self.shards = [shard for shard in range(backend.shards) if shard % workers == worker_index]
+        self.seen = seen  # URLs connues localement (cache de l'ensemble partagé)
+        self.lease_size = lease_size
+        self.lease_timeout = lease_timeout
+        self.buffer = deque()  # (url, profondeur) louées, pas encore servies
+        self.outstanding = {}  # Clé -> jeton de location, jusqu'à done()
+        self.additions = []
+        self.completions = []
+        self.last_flush = time.monotonic()
+        self.last_renew = time.monotonic()
+        self.last_poll = 0.0
+        self.last_check = 0.0
+        self.own_pending = 0
+        self.global_active = True
+
+    def __len__(self):
+        return len(self.buffer) + self.own_pending
+
+    def __contains__(self, url):
+        return self.normalize(url) in self.seen
+
+    def _add(self, url, depth, seen_only):
+        key = self.normalize(url)
+        if key in self.seen:
+            return False
+        self.seen.add(key)
+        self.additions.append((key, url, depth, shard_of(url, self.backend.shards, self.shard_by), seen_only))
+        if len(self.additions) >= self.FLUSH_SIZE:
+            self.flush()
+        return True
+
+    def mark_seen(self, url):
+        self._add(url, 0, True)
+
+    def push(self, url, depth=0, priority=None):
+        return self._add(url, depth, False)
+
+    def restore(self, url, depth=0, priority=None):
+        # Les URLs louées avant l'arrêt reviennent d'elles-mêmes à l'échéance de leur location
+        self.seen.add(self.normalize(url))
+
+    def done(self, url):
+        token = self.outstanding.pop(self.normalize(url), None)
+        if token is not None:
+            self.completions.append(token)
+
+    def flush(self):
+        """Envoie au backend les URLs ajoutées et terminées"""
+        if self.additions:
+            self.backend.add(self.additions)
+            self.additions = []
+        if self.completions:
+            self.backend.complete(self.completions)
+            self.completions = []
+        self.last_flush = time.monotonic()
+
+    def pop(self):
+        now = time.monotonic()
+        if len(self.additions) + len(self.completions) and now - self.last_flush >= self.FLUSH_INTERVAL:
+            self.flush()
+        if self.outstanding and now - self.last_renew >= self.lease_timeout / 3:
+            self.backend.renew(self.worker, list(self.outstanding.values()), self.lease_timeout)
+            self.last_renew = now
+        if not self.buffer and now - self.last_poll >= self.POLL_INTERVAL:
+            self.flush()
+            self.last_poll = now
+            for key, url, depth, token in self.backend.lease(self.shards, self.lease_size,
+                                                             self.lease_timeout, self.worker):
+                self.outstanding[key] = token
+                self.buffer.append((url, depth))
+            if self.buffer:
+                self.last_poll = 0.0  # File non vide: pas d'attente avant le lot suivant
+            self.own_pending, _ = self.backend.counts(self.shards)
+        return self.buffer.popleft() if self.buffer else None
+
+    def has_pending(self):
+        """Vrai tant que le crawl n'est pas terminé: il reste des URLs en attente ou louées, partout"""
+        if self.buffer or self.additions or self.completions:
+            return True
+        now = time.monotonic()
+        if now - self.last_check >= self.POLL_INTERVAL:
+            self.flush()
+            self.last_check = now
+            pending, leased = self.backend.counts()
+            self.global_active = pending + leased > 0
+        return self.global_active
+
+    def snapshot(self):
+        # Les URLs en attente sont conservées par le backend
+        return []
+
+    def close(self):
+        try:
+            self.flush()
+            # URLs louées non traitées (arrêt sur max_pages ou signal): rendues aux autres workers
+            if self.outstanding:
+                self.backend.release(list(self.outstanding.values()))
+                self.outstanding = {}
+        except Exception as e:
+            logging.error(f"Erreur envoi des derniers lots à la file partagée: {str(e)}")
+        self.backend.close()
+
+
+class Coordinator:
+    """Prépare la file partagée et suit l'avancement des workers"""
+
+    def __init__(self, config):
+        self.config = config
+        self.backend = create_frontier_backend(config)
+
+    def seed(self, start_urls, normalize, resume=False):
+        if not resume:
+            self.backend.reset()
+        shard_by = self.config.get('distributed', {}).get('shard_by', 'host')
+        self.backend.add([(normalize(url), url, 0, shard_of(url, self.backend.shards, shard_by), False)
+                          for url in start_urls])
+
+    def wait(self, processes, interval=10):
+        """Journalise l'avancement jusqu'à la fin des workers locaux.
+
+        Sans worker local (workers sur d'autres machines), attend que la file
+        partagée soit vide et qu'aucune URL ne soit plus louée.
+        """
+        last_report = time.monotonic()
+        while True:
+            time.sleep(0.5)
+            if processes and all(process.poll() is not None for process in processes):
+                break
+            if not processes or time.monotonic() - last_report >= interval:
+                try:
+                    pending, leased = self.backend.counts()
+                except Exception as e:
+                    logging.error(f"Erreur lecture de la file partagée: {str(e)}")
+                    continue
+                if not processes and pending + leased == 0:
+                    break
+                if time.monotonic() - last_report >= interval:
+                    last_report = time.monotonic()
+                    self.log_progress(pending, leased)
+        self.log_progress(*self.backend.counts())
+        return [process.returncode for process in processes]
+
+    def log_progress(self, pending, leased):
+        logging.info("File partagée: %s en attente, %s en cours, %s traitées",
+                     pending, leased, self.backend.done_count())
+
+    def close(self):
+        self.backend.close()
@@ -0,0 +1,113 @@
+# src/domains.py
+import logging
+from src.url_filter import URLFilter
+
+# Hôtes mémorisés au-delà desquels le cache hôte -> domaine est vidé
+MAX_CACHED_HOSTS = 100000
+
+
+class CrawlDomain:
+    """Un domaine du crawl: URLs de départ, configuration propre et règles de filtrage compilées"""
+
+    __slots__ = ('name', 'start_urls', 'config', 'url_filter')
+
+    def __init__(self, name, start_urls, config):
+        self.name = name
+        self.start_urls = start_urls
+        self.config = config
+        self.url_filter = URLFilter(config)
+
+
+def domain_config(config, entry):
+    """Configuration d'un domaine: la configuration globale, complétée ou surchargée par son entrée.
+
+    Les exclusions (motifs, extensions) s'ajoutent aux exclusions globales, les
+    règles d'inclusion et les réglages crawler du domaine remplacent les globaux.
+    """
+    start_urls = list(entry.get('start_urls') or [entry['start_url']])
+    merged = dict(config)
+    merged['domain'] = {'name': entry['name'], 'start_url': start_urls[0]}
+    excluded = config.get('excluded', {})
+    own_excluded = entry.get('excluded', {})
+    merged['excluded'] = {
+        'patterns': list(excluded.get('patterns', [])) + list(own_excluded.get('patterns', [])),
+        'extensions': list(excluded.get('extensions', [])) + list(own_excluded.get('extensions', [])),
+    }
+    merged['included'] = entry.get('included', config.get('included', {}))
+    merged['crawler'] = {**config['crawler'], **entry.get('crawler', {})}
+    # Sitemaps propres au domaine; ceux de la section sitemaps ne valent que pour un domaine unique
+    sitemap_urls = entry.get('sitemaps', [] if config.get('domains') else config.get('sitemaps', {}).get('urls'))
+    merged['sitemaps'] = {**config.get('sitemaps', {}), 'urls': sitemap_urls or []}
+    return merged, start_urls
+
+
+class DomainSet:
+    """Domaines d'un crawl (section domains, ou l'unique section domain) et rattachement des URLs.
+
+    Une URL appartient au domaine dont le nom figure dans son hôte (le plus
+    long en cas d'ambiguïté), comme pour le filtre d'un seul domaine. Expose
+    l'interface de URLFilter: chaque URL est filtrée par les règles de son domaine.
+    """
+
+    def __init__(self, config):
+        self.domains = []
+        for entry in config.get('domains') or [config['domain']]:
+            merged, start_urls = domain_config(config, entry)
+            self.domains.append(CrawlDomain(entry['name'], start_urls, merged))
+        self.by_name = {domain.name: domain for domain in self.domains}
+        if len(self.by_name) != len(self.domains):
+            raise ValueError("Noms de domaines en double dans la section domains")
+        self.multi = bool(config.get('domains'))
+        # Les plus longs d'abord: sous-domaine configuré séparément de son domaine parent
+        self.names = sorted(((domain.name.lower(), domain) for domain in self.domains),
+                            key=lambda item: len(item[0]), reverse=True)
+        self.hosts = {}  # Hôte -> domaine (None hors périmètre)
+        if self.multi:
+            logging.info("Crawl multi-domaines: %s", ', '.join(self.by_name))
+
+    def __iter__(self):
+        return iter(self.domains)
+
+    def __len__(self):
+        return len(self.domains)
+
+    def start_urls(self):
+        return [url for domain in self.domains for url in domain.start_urls]
+
+    def for_host(self, host):
+        host = host.lower()
+        domain = self.hosts.get(host, False)
+        if domain is False:
+            domain = next((domain for name, domain in self.names if name in host), None)
+            if len(self.hosts) >= MAX_CACHED_HOSTS:
+                self.hosts.clear()
+            self.hosts[host] = domain
+        return domain
+
+    def domain_of(self, url):
+        """Domaine d'une URL, ou None si elle n'appartient à aucun domaine du crawl"""
+        host, _ = URLFilter.split(url)
+        return self.for_host(host) if host else None
+
+    def rejection(self, url, depth=None):
+        domain = self.domain_of(url) if url else None
+        if domain is None:
+            return 'out_of_domain'
+        return domain.url_filter.rejection(url, depth)
+
+    def accepts(self, url, depth=None):
+        return self.rejection(url, depth) is None
+
+    def filter(self, urls, depth=None):
+        """Liens à explorer parmi ceux d'une page, chacun selon les règles de son domaine"""
+        return self.partition(urls, depth)[0]
+
+    def partition(self, urls, depth=None):
+        accepted, rejected = [], []
+        for url in dict.fromkeys(urls):
+            reason = self.rejection(url, depth)
+            if reason is None:
+                accepted.append(url)
+            else:
+                rejected.append((url, reason))
+        return accepted, rejected
@@ -1,45 +1,145 @@
 # src/extractors.py
 from src.constants import *
-from bs4 import BeautifulSoup
-from urllib.parse import urlparse
+import functools
+import importlib.util
 import logging
 
+from src.canonicalizer import URLCanonicalizer
+
+# BeautifulSoup, selectolax et lxml sont importés à la première page analysée
+# par le backend choisi: les autres ne sont jamais chargés
+
+
+@functools.lru_cache(maxsize=None)
+def load_selectolax():
+    """Analyseur Lexbor de selectolax (backend optionnel, le plus rapide)"""
+    from selectolax.lexbor import LexborHTMLParser
+    return LexborHTMLParser
+
+
+@functools.lru_cache(maxsize=None)
+def load_lxml():
+    """Modules lxml.html et lxml.etree (backend optionnel)"""
+    import lxml.html
+    from lxml import etree
+    return lxml.html, etree
+
+
+def module_installed(name):
+    """Vrai si le module est installé, sans l'importer"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ModuleNotFoundError:
+        return False
+
+# Balises dont le contenu n'est pas du texte visible
+REMOVED_TAGS = ['script', 'style', 'head', 'title', 'meta']
+
+
 class ContentExtractor:
     """Classe gérant l'extraction de contenu"""
-    
-    @staticmethod
-    def extract_text_from_html(html_content):
+
+    BACKENDS = ('selectolax', 'lxml', 'html.parser')
+
+    def __init__(self, config=None):
+        parser = 'auto'
+        if config:
+            parser = config.get('extractor', {}).get('parser', 'auto')
+        self.backend = self.resolve_backend(parser)
+        self.canonicalizer = URLCanonicalizer(config)
+        logging.info("Backend d'extraction HTML: %s", self.backend)
+
+    @classmethod
+    def available_backends(cls):
+        """Liste les backends utilisables dans l'environnement courant"""
+        available = []
+        if module_installed('selectolax.lexbor'):
+            available.append('selectolax')
+        if module_installed('lxml.html'):
+            available.append('lxml')
+        available.append('html.parser')
+        return available
+
+    @classmethod
+    def resolve_backend(cls, parser):
+        """Choisit le backend demandé, ou le plus rapide disponible en mode 'auto'"""
+        available = cls.available_backends()
+        if parser == 'auto':
+            return available[0]
+        if parser not in cls.BACKENDS:
+            raise ValueError(f"Backend d'extraction inconnu: {parser}")
+        if parser not in available:
+            logging.warning("Backend %s non installé, utilisation de html.parser", parser)
+            return 'html.parser'
+        return parser
+
+    def extract(self, html_content, base_url):
+        """Analyse le document une seule fois et retourne (texte, liens)"""
         try:
-            soup = BeautifulSoup(html_content, "html.parser")
-            for element in soup(['script', 'style', 'head', 'title', 'meta', '[document]']):
-                element.decompose()
-            
-            text = soup.get_text(separator='\n', strip=True)
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            return '\n'.join(chunk for chunk in chunks if chunk)
+            if self.backend == 'selectolax':
+                text, hrefs, base_href = self._parse_selectolax(html_content)
+            elif self.backend == 'lxml':
+                text, hrefs, base_href = self._parse_lxml(html_content)
+            else:
+                text, hrefs, base_href = self._parse_html_parser(html_content)
+            return self.clean_text(text), self.resolve_links(hrefs, base_url, base_href)
         except Exception as e:
-            logging.error(f"Erreur extraction HTML: {str(e)}")
-            return ""
-    
+            logging.error("Erreur extraction HTML: %s", e)
+            return "", []
+
+    def extract_text_from_html(self, html_content):
+        return self.extract(html_content, '')[0]
+
+    def extract_links(self, html_content, base_url):
+        return self.extract(html_content, base_url)[1]
+
     @staticmethod
-    def extract_links(html_content, base_url):
-        try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            links = []
-            for a in soup.find_all('a', href=True):
-                href = a['href']
-                if href:
-                    # Normalise les URLs relatives
-                    if not href.startswith(('http://', 'https://')):
-                        if href.startswith('//'):
-                            href = f"https:{href}"
-                        elif href.startswith('/'):
-                            href = f"https://{urlparse(base_url).netloc}{href}"
-                        else:
-                            href = f"https://{urlparse(base_url).netloc}/{href}"
-                    links.append(href)
-            return links
-        except Exception as e:
-            logging.error(f"Erreur extraction liens: {str(e)}")
-            return []
+    def _parse_html_parser(html_content):
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html_content, "html.parser")
+        hrefs = [a['href'] for a in soup.find_all('a', href=True)]
+        base = soup.find('base', href=True)
+        base_href = base['href'] if base else None
+        for element in soup(REMOVED_TAGS + ['[document]']):
+            element.decompose()
+        return soup.get_text(separator='\n', strip=True), hrefs, base_href
+
+    @staticmethod
+    def _parse_lxml(html_content):
+        if not html_content or not html_content.strip():
+            return "", [], None
+        html, etree = load_lxml()
+        root = html.fromstring(html_content)
+        hrefs = [a.get('href') for a in root.iter('a') if a.get('href') is not None]
+        base = next((b.get('href') for b in root.iter('base') if b.get('href')), None)
+        etree.strip_elements(root, *REMOVED_TAGS, with_tail=False)
+        texts = (t.strip() for t in root.itertext())
+        return '\n'.join(t for t in texts if t), hrefs, base
+
+    @staticmethod
+    def _parse_selectolax(html_content):
+        tree = load_selectolax()(html_content)
+        hrefs = [node.attributes.get('href') for node in tree.css('a[href]')]
+        base = tree.css_first('base[href]')
+        base_href = base.attributes.get('href') if base is not None else None
+        tree.strip_tags(REMOVED_TAGS)
+        if tree.root is None:
+            return "", hrefs, base_href
+        return tree.root.text(separator='\n', strip=True), hrefs, base_href
+
+    @staticmethod
+    def clean_text(text):
+        lines = (line.strip() for line in text.splitlines())
+        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+        return '\n'.join(chunk for chunk in chunks if chunk)
+
+    def resolve_href(self, href, base_url):
+        """URL absolue et canonique d'un lien, ou None (ancre, mailto:, javascript:...)"""
+        return self.canonicalizer.resolve(base_url, href)
+
+    def resolve_links(self, hrefs, page_url, base_href=None):
+        """Résout les liens d'une page par rapport à son URL ou à son <base href>, sans doublons"""
+        base_url = self.canonicalizer.base_for(page_url, base_href)
+        resolve = self.canonicalizer.resolve
+        links = (resolve(base_url, href) for href in hrefs if href)
+        return list(dict.fromkeys(link for link in links if link))
@@ -33,7 +33,7 @@ class FileHandler:
         for category in self.downloadable_extensions.keys():
             category_dir = os.path.join(self.files_dir, category)
             os.makedirs(category_dir, exist_ok=True)
-            logging.info(f"Répertoire pour la catégorie '{category}' créé: {category_dir}")
+            logging.info("Répertoire pour la catégorie '%s' créé: %s", category, category_dir)
     
     def get_file_category(self, url):
         """Détermine la catégorie d'un fichier basé sur son extension"""
@@ -71,3 +71,75 @@ class FileHandler:
         filename = f"{filename}{ext}"
         
         return filename
+
+
+class DownloadTooLarge(Exception):
+    """Le corps de la réponse dépasse la taille maximale autorisée"""
+
+
+class SpoolFile:
+    """Écrit un téléchargement par morceaux dans un fichier temporaire, publié ensuite par publish()"""
+
+    SUFFIX = '.part'
+
+    def __init__(self, path, max_bytes=None):
+        self.path = path
+        self.temp_path = f"{path}{self.SUFFIX}"
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.digest = hashlib.sha256()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.file = open(self.temp_path, 'wb')
+
+    def write(self, chunk):
+        self.size += len(chunk)
+        if self.max_bytes and self.size > self.max_bytes:
+            raise DownloadTooLarge(f"Taille maximale dépassée ({self.max_bytes} octets)")
+        self.digest.update(chunk)
+        self.file.write(chunk)
+
+    def commit(self):
+        """Ferme le fichier temporaire complet et retourne son chemin (à publier ou supprimer)"""
+        self.file.close()
+        return self.temp_path
+
+    @classmethod
+    def final_path(cls, temp_path):
+        return temp_path[:-len(cls.SUFFIX)]
+
+    @classmethod
+    def publish(cls, temp_path):
+        """Renomme un fichier temporaire complet à son emplacement final et retourne ce dernier"""
+        path = cls.final_path(temp_path)
+        os.replace(temp_path, path)
+        return path
+
+    def abort(self):
+        self.file.close()
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+
+class MemoryBuffer:
+    """Accumule un téléchargement en mémoire, dans la limite de max_bytes"""
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes
+        self.buffer = bytearray()
+        self.digest = hashlib.sha256()
+
+    @property
+    def size(self):
+        return len(self.buffer)
+
+    def write(self, chunk):
+        if self.max_bytes and len(self.buffer) + len(chunk) > self.max_bytes:
+            raise DownloadTooLarge(f"Taille maximale dépassée ({self.max_bytes} octets)")
+        self.digest.update(chunk)
+        self.buffer.extend(chunk)
+
+    def commit(self):
+        return bytes(self.buffer)
+
+    def abort(self):
+        self.buffer = bytearray()
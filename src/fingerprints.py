@@ -0,0 +1,220 @@
+# src/fingerprints.py
+import hashlib
+import math
+import struct
+import sys
+from array import array
+
+# Format binaire des checkpoints: signature, version, puis les données du type
+MAGIC_FINGERPRINT_SET = b'CFPS'
+MAGIC_BLOOM_FILTER = b'CSBF'
+FORMAT_VERSION = 1
+
+
+def url_fingerprint(url):
+    """Empreinte 64 bits non nulle d'une URL normalisée"""
+    digest = hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') or 1
+
+
+class FingerprintSet:
+    """Ensemble exact d'URLs stockées sous forme d'empreintes 64 bits.
+
+    Les empreintes sont rangées dans un tableau à adressage ouvert (sondage
+    linéaire, 0 = case vide), soit 8 octets par case au lieu d'une chaîne Python
+    et d'une entrée de set par URL.
+    """
+
+    MAX_LOAD = 0.7
+
+    def __init__(self, capacity=1 << 16):
+        size = 1 << max(4, math.ceil(math.log2(max(capacity, 1) / self.MAX_LOAD)))
+        self.table = array('Q', bytes(8 * size))
+        self.mask = size - 1
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, url):
+        return self._find(url_fingerprint(url)) >= 0
+
+    def add(self, url):
+        """Ajoute une URL, retourne True si elle n'était pas déjà présente"""
+        return self.add_fingerprint(url_fingerprint(url))
+
+    def add_fingerprint(self, fingerprint):
+        table, mask = self.table, self.mask
+        index = fingerprint & mask
+        while True:
+            slot = table[index]
+            if slot == fingerprint:
+                return False
+            if slot == 0:
+                break
+            index = (index + 1) & mask
+        table[index] = fingerprint
+        self.count += 1
+        if self.count > self.MAX_LOAD * len(table):
+            self._resize(len(table) * 2)
+        return True
+
+    def _find(self, fingerprint):
+        table, mask = self.table, self.mask
+        index = fingerprint & mask
+        while True:
+            slot = table[index]
+            if slot == fingerprint:
+                return index
+            if slot == 0:
+                return -1
+            index = (index + 1) & mask
+
+    def _resize(self, size):
+        old_table = self.table
+        self.table = array('Q', bytes(8 * size))
+        self.mask = size - 1
+        self.count = 0
+        for fingerprint in old_table:
+            if fingerprint:
+                self.add_fingerprint(fingerprint)
+
+    def dump(self, f):
+        """Écrit l'ensemble au format binaire (seules les empreintes sont stockées)"""
+        f.write(MAGIC_FINGERPRINT_SET + struct.pack('<BQ', FORMAT_VERSION, self.count))
+        fingerprints = array('Q', (fp for fp in self.table if fp))
+        if sys.byteorder == 'big':
+            fingerprints.byteswap()
+        fingerprints.tofile(f)
+
+    @classmethod
+    def load_body(cls, f):
+        _, count = struct.unpack('<BQ', f.read(9))
+        fingerprints = array('Q')
+        fingerprints.fromfile(f, count)
+        if sys.byteorder == 'big':
+            fingerprints.byteswap()
+        instance = cls(capacity=count)
+        for fingerprint in fingerprints:
+            instance.add_fingerprint(fingerprint)
+        return instance
+
+
+class BloomFilter:
+    """Filtre de Bloom de taille fixe, indexé par double hachage de l'empreinte"""
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def contains_fingerprint(self, fingerprint):
+        bits, num_bits = self.bits, self.num_bits
+        position = fingerprint & 0xFFFFFFFF
+        step = (fingerprint >> 32) | 1
+        for _ in range(self.num_hashes):
+            bit = position % num_bits
+            if not bits[bit >> 3] & (1 << (bit & 7)):
+                return False
+            position += step
+        return True
+
+    def add_fingerprint(self, fingerprint):
+        bits, num_bits = self.bits, self.num_bits
+        position = fingerprint & 0xFFFFFFFF
+        step = (fingerprint >> 32) | 1
+        for _ in range(self.num_hashes):
+            bit = position % num_bits
+            bits[bit >> 3] |= 1 << (bit & 7)
+            position += step
+        self.count += 1
+
+
+class ScalableBloomFilter:
+    """Filtre de Bloom extensible (Almeida et al.) à taux de faux positifs borné.
+
+    Quand un filtre est plein, un nouveau filtre deux fois plus grand et au taux
+    d'erreur plus strict est ajouté, de sorte que le taux global reste sous
+    error_rate quel que soit le nombre d'URLs. Une URL jamais vue peut être
+    considérée comme vue avec une probabilité error_rate.
+    """
+
+    GROWTH = 2
+    TIGHTENING = 0.5
+
+    def __init__(self, initial_capacity=100000, error_rate=0.001):
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.filters = []
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, url):
+        fingerprint = url_fingerprint(url)
+        return any(f.contains_fingerprint(fingerprint) for f in self.filters)
+
+    def add(self, url):
+        """Ajoute une URL, retourne True si elle n'était (probablement) pas présente"""
+        fingerprint = url_fingerprint(url)
+        if any(f.contains_fingerprint(fingerprint) for f in self.filters):
+            return False
+        if not self.filters or self.filters[-1].count >= self.filters[-1].capacity:
+            index = len(self.filters)
+            self.filters.append(BloomFilter(
+                self.initial_capacity * self.GROWTH ** index,
+                self.error_rate * (1 - self.TIGHTENING) * self.TIGHTENING ** index
+            ))
+        self.filters[-1].add_fingerprint(fingerprint)
+        self.count += 1
+        return True
+
+    def dump(self, f):
+        f.write(MAGIC_BLOOM_FILTER + struct.pack(
+            '<BQdQI', FORMAT_VERSION, self.initial_capacity, self.error_rate,
+            self.count, len(self.filters)
+        ))
+        for bloom in self.filters:
+            f.write(struct.pack('<QdQ', bloom.capacity, bloom.error_rate, bloom.count))
+            f.write(bloom.bits)
+
+    @classmethod
+    def load_body(cls, f):
+        _, initial_capacity, error_rate, count, num_filters = struct.unpack('<BQdQI', f.read(29))
+        instance = cls(initial_capacity, error_rate)
+        instance.count = count
+        for _ in range(num_filters):
+            capacity, filter_error_rate, filter_count = struct.unpack('<QdQ', f.read(24))
+            bloom = BloomFilter(capacity, filter_error_rate)
+            bloom.bits = bytearray(f.read(len(bloom.bits)))
+            bloom.count = filter_count
+            instance.filters.append(bloom)
+        return instance
+
+
+def create_seen_set(config):
+    """Crée l'ensemble d'URLs vues selon la section seen_set de la configuration"""
+    settings = config.get('seen_set', {})
+    mode = settings.get('mode', 'exact')
+    if mode == 'bloom':
+        return ScalableBloomFilter(
+            initial_capacity=settings.get('initial_capacity', 100000),
+            error_rate=settings.get('error_rate', 0.001)
+        )
+    if mode != 'exact':
+        raise ValueError(f"Mode d'ensemble d'URLs inconnu: {mode}")
+    return FingerprintSet(capacity=settings.get('initial_capacity', 100000))
+
+
+def load_seen_set(f):
+    """Relit un ensemble sauvegardé par dump(), quel que soit son type"""
+    magic = f.read(4)
+    if magic == MAGIC_FINGERPRINT_SET:
+        return FingerprintSet.load_body(f)
+    if magic == MAGIC_BLOOM_FILTER:
+        return ScalableBloomFilter.load_body(f)
+    raise ValueError("Format d'ensemble d'URLs inconnu")
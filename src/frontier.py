@@ -0,0 +1,211 @@
+# src/frontier.py
+import heapq
+import logging
+import os
+import sqlite3
+
+
+class URLFrontier:
+    """File d'URLs à visiter, dédoublonnée dès l'ajout.
+
+    Les URLs sont servies par priorité croissante (la profondeur par défaut,
+    ou un score fourni par l'appelant), puis dans l'ordre d'ajout. Au-delà de
+    max_memory entrées en mémoire, les nouvelles URLs débordent dans une base
+    SQLite, ce qui borne réellement la mémoire utilisée par la file.
+    """
+
+    SPILL_BATCH = 1000
+
+    def __init__(self, normalize, max_memory=10000, spill_path=None, seen=None):
+        self.normalize = normalize
+        self.max_memory = max_memory
+        self.spill_path = spill_path
+        # URLs normalisées déjà ajoutées (ou déjà visitées): set, FingerprintSet ou filtre de Bloom
+        self.seen = seen if seen is not None else set()
+        self.heap = []  # (priorité, séquence, url, profondeur)
+        self.sequence = 0
+        self.db = None
+        self.disk_count = 0
+        self.spill_buffer = []
+        self.disk_head = None  # Plus petite (priorité, séquence) sur disque, None si inconnue
+
+    def __len__(self):
+        return len(self.heap) + self.disk_count + len(self.spill_buffer)
+
+    def __contains__(self, url):
+        return self.normalize(url) in self.seen
+
+    def mark_seen(self, url):
+        """Enregistre une URL comme connue sans l'ajouter à la file"""
+        self.seen.add(self.normalize(url))
+
+    def push(self, url, depth=0, priority=None):
+        """Ajoute une URL si elle n'a jamais été vue, retourne True si elle a été ajoutée"""
+        key = self.normalize(url)
+        if key in self.seen:
+            return False
+        self.seen.add(key)
+        self._insert(depth if priority is None else priority, url, depth)
+        return True
+
+    def restore(self, url, depth=0, priority=None):
+        """Remet en file une URL d'un checkpoint, même si elle est déjà marquée comme vue"""
+        self.seen.add(self.normalize(url))
+        self._insert(depth if priority is None else priority, url, depth)
+
+    def pop(self):
+        """Retourne (url, profondeur) de plus faible priorité, ou None si la file est vide"""
+        self._flush_spill()
+        # À priorité égale, une entrée restée sur disque a été ajoutée avant celles
+        # de la mémoire ajoutées après le débordement: la séquence départage
+        if self.disk_count and (not self.heap or self._disk_head() < self.heap[0][:2]):
+            self._refill()
+        if not self.heap:
+            return None
+        _, _, url, depth = heapq.heappop(self.heap)
+        return url, depth
+
+    def has_pending(self):
+        return len(self) > 0
+
+    def done(self, url):
+        """Fin de traitement d'une URL servie par pop() (utilisé par la file distribuée)"""
+
+    def snapshot(self):
+        """Liste des (url, profondeur) en attente, pour la sauvegarde d'état"""
+        self._flush_spill()
+        entries = [(url, depth) for _, _, url, depth in sorted(self.heap)]
+        if self.db is not None:
+            rows = self.db.execute("SELECT url, depth FROM frontier ORDER BY priority, seq")
+            entries.extend((url, depth) for url, depth in rows)
+        return entries
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+        if self.spill_path and os.path.exists(self.spill_path):
+            os.remove(self.spill_path)
+
+    def _insert(self, priority, url, depth):
+        self.sequence += 1
+        if len(self.heap) < self.max_memory or self.spill_path is None:
+            heapq.heappush(self.heap, (priority, self.sequence, url, depth))
+        else:
+            self.spill_buffer.append((priority, self.sequence, url, depth))
+            if len(self.spill_buffer) >= self.SPILL_BATCH:
+                self._flush_spill()
+
+    def _open_db(self):
+        if os.path.exists(self.spill_path):
+            os.remove(self.spill_path)
+        self.db = sqlite3.connect(self.spill_path)
+        self.db.execute("PRAGMA journal_mode=OFF")
+        self.db.execute("PRAGMA synchronous=OFF")
+        self.db.execute(
+            "CREATE TABLE frontier (priority REAL, seq INTEGER, url TEXT, depth INTEGER)"
+        )
+        self.db.execute("CREATE INDEX frontier_order ON frontier (priority, seq)")
+        logging.info("Débordement de la file sur disque: %s", self.spill_path)
+
+    def _flush_spill(self):
+        if not self.spill_buffer:
+            return
+        if self.db is None:
+            self._open_db()
+        with self.db:
+            self.db.executemany("INSERT INTO frontier VALUES (?, ?, ?, ?)", self.spill_buffer)
+        self.disk_count += len(self.spill_buffer)
+        self.disk_head = None
+        self.spill_buffer = []
+
+    def _disk_head(self):
+        if self.disk_head is None:
+            self.disk_head = tuple(self.db.execute(
+                "SELECT priority, seq FROM frontier ORDER BY priority, seq LIMIT 1"
+            ).fetchone())
+        return self.disk_head
+
+    def _refill(self):
+        """Recharge en mémoire les entrées de plus faible priorité stockées sur disque"""
+        batch = max(self.max_memory - len(self.heap), self.SPILL_BATCH)
+        rows = self.db.execute(
+            "SELECT rowid, priority, seq, url, depth FROM frontier ORDER BY priority, seq LIMIT ?",
+            (batch,)
+        ).fetchall()
+        with self.db:
+            self.db.executemany("DELETE FROM frontier WHERE rowid = ?", [(row[0],) for row in rows])
+        for _, priority, seq, url, depth in rows:
+            heapq.heappush(self.heap, (priority, seq, url, depth))
+        self.disk_count -= len(rows)
+        self.disk_head = None
+
+
+class DomainFrontier:
+    """Une file URLFrontier par domaine, servies à tour de rôle.
+
+    Toutes les files partagent le même ensemble d'URLs vues. pop() passe d'un
+    domaine au suivant, ce qui donne à chaque domaine une part équitable des
+    workers quelle que soit la taille de sa file. ready(domaine) permet à
+    l'appelant de sauter un domaine (file de l'ordonnanceur déjà pleine), et
+    retire() écarte un domaine qui a atteint sa limite de pages.
+    """
+
+    def __init__(self, frontiers, domain_of, seen, ready=None):
+        self.frontiers = frontiers  # Nom du domaine -> URLFrontier
+        self.names = list(frontiers)
+        self.domain_of = domain_of  # URL -> nom du domaine
+        self.seen = seen
+        self.ready = ready
+        self.retired = set()
+        self.next = 0
+
+    def __len__(self):
+        return sum(len(frontier) for name, frontier in self.frontiers.items() if name not in self.retired)
+
+    def __contains__(self, url):
+        frontier = self.frontiers.get(self.domain_of(url))
+        return frontier is not None and url in frontier
+
+    def mark_seen(self, url):
+        frontier = self.frontiers.get(self.domain_of(url))
+        if frontier is not None:
+            frontier.mark_seen(url)
+
+    def push(self, url, depth=0, priority=None):
+        frontier = self.frontiers.get(self.domain_of(url))
+        return frontier is not None and frontier.push(url, depth, priority)
+
+    def restore(self, url, depth=0, priority=None):
+        frontier = self.frontiers.get(self.domain_of(url))
+        if frontier is not None:
+            frontier.restore(url, depth, priority)
+
+    def pop(self):
+        count = len(self.names)
+        for offset in range(count):
+            name = self.names[(self.next + offset) % count]
+            if name in self.retired or (self.ready is not None and not self.ready(name)):
+                continue
+            entry = self.frontiers[name].pop()
+            if entry is not None:
+                self.next = (self.next + offset + 1) % count
+                return entry
+        return None
+
+    def retire(self, name):
+        """Ne sert plus les URLs d'un domaine (elles restent dans l'état sauvegardé)"""
+        self.retired.add(name)
+
+    def has_pending(self):
+        return len(self) > 0
+
+    def done(self, url):
+        pass
+
+    def snapshot(self):
+        return [entry for frontier in self.frontiers.values() for entry in frontier.snapshot()]
+
+    def close(self):
+        for frontier in self.frontiers.values():
+            frontier.close()
@@ -0,0 +1,86 @@
+# src/manifest.py
+import json
+import logging
+import os
+import threading
+
+
+class CrawlManifest:
+    """Inventaire des contenus déjà récupérés, conservé d'un crawl à l'autre.
+
+    Pour chaque URL: validateurs HTTP (ETag, Last-Modified), empreinte SHA-256
+    du corps, fichier de sortie et, pour les pages HTML, liens extraits. Le mode
+    incrémental s'en sert pour envoyer des requêtes conditionnelles et, quand
+    rien n'a changé, reprendre les liens sans extraire ni réécrire la page.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.staged = {}  # Réponses reçues dont le contenu n'est pas encore sauvegardé
+        self.changed = set()  # URLs dont l'entrée n'est pas encore journalisée
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, url):
+        return self.entries.get(url)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get('entries', {})
+            logging.info("Manifeste chargé: %s URLs", len(self.entries))
+        except Exception as e:
+            logging.error(f"Erreur chargement manifeste: {str(e)}")
+            self.entries = {}
+
+    def dump(self, f):
+        with self.lock:
+            json.dump({'entries': self.entries}, f, ensure_ascii=False)
+
+    def conditional_headers(self, url):
+        """En-têtes If-None-Match / If-Modified-Since d'après la dernière réponse connue"""
+        entry = self.entries.get(url)
+        headers = {}
+        if entry and 'path' in entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def is_unchanged(self, url, content_hash):
+        entry = self.entries.get(url)
+        return entry is not None and entry.get('hash') == content_hash and 'path' in entry
+
+    def stage(self, url, **fields):
+        """Retient les informations d'une réponse jusqu'à la sauvegarde de son contenu"""
+        with self.lock:
+            self.staged[url] = fields
+
+    def commit(self, url, **fields):
+        """Enregistre l'entrée d'une URL une fois son contenu sauvegardé"""
+        with self.lock:
+            entry = self.entries.setdefault(url, {})
+            entry.update(self.staged.pop(url, {}))
+            entry.update(fields)
+            self.changed.add(url)
+
+    def drain_changes(self):
+        """Entrées enregistrées depuis l'appel précédent, à journaliser: [(url, entrée)]"""
+        with self.lock:
+            changed, self.changed = self.changed, set()
+            return [(url, dict(self.entries[url])) for url in changed if url in self.entries]
+
+    def restore(self, url, entry):
+        """Rejoue une entrée journalisée"""
+        with self.lock:
+            self.entries[url] = entry
+
+    def discard(self, url):
+        with self.lock:
+            self.staged.pop(url, None)
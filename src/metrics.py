@@ -0,0 +1,257 @@
+# src/metrics.py
+import bisect
+import http.server
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+STATS_FILE = 'crawl_stats.json'
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class Histogram:
+    """Histogramme cumulatif à seaux fixes, au format Prometheus"""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Dernier seau: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Estimation d'un quantile: borne supérieure du seau qui le contient"""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+
+class MetricsRegistry:
+    """Compteurs, jauges et histogrammes du crawler, partagés par tous les threads.
+
+    Les compteurs et histogrammes sont étiquetés (statut HTTP, hôte, étape...).
+    Les jauges sont des fonctions évaluées à la lecture (taille de la file,
+    URLs vues). Exportable au format texte Prometheus ou en dictionnaire JSON.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counters = {}  # nom -> {étiquettes: valeur}
+        self.histograms = {}  # nom -> {étiquettes: Histogram}
+        self.gauges = {}  # nom -> fonction
+        self.help = {}
+        self.lock = threading.Lock()
+        self.start_time = time.time()
+
+    def describe(self, name, text):
+        self.help[name] = text
+
+    def inc(self, name, value=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def gauge(self, name, read):
+        self.gauges[name] = read
+
+    @contextmanager
+    def time_stage(self, stage):
+        """Mesure le temps passé dans une étape (fetch, extract, pdf, save)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(stage, time.perf_counter() - start)
+
+    def observe_stage(self, stage, seconds):
+        self.observe('crawler_stage_seconds', seconds, stage=stage)
+
+    def total(self, name):
+        with self.lock:
+            return sum(self.counters.get(name, {}).values())
+
+    def read_gauges(self):
+        values = {}
+        for name, read in self.gauges.items():
+            try:
+                values[name] = read()
+            except Exception as e:
+                logging.error(f"Erreur lecture métrique {name}: {str(e)}")
+        return values
+
+    @staticmethod
+    def _labels(key, extra=None):
+        pairs = list(key) + ([extra] if extra else [])
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{str(value)}"' for name, value in pairs) + '}'
+
+    def render_prometheus(self):
+        """Exposition au format texte Prometheus"""
+        lines = []
+        for name, value in self.read_gauges().items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        with self.lock:
+            for name, series in self.counters.items():
+                if name in self.help:
+                    lines.append(f"# HELP {name} {self.help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{self._labels(key)} {value}")
+            for name, series in self.histograms.items():
+                if name in self.help:
+                    lines.append(f"# HELP {name} {self.help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip(self.buckets + ('+Inf',), histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{self._labels(key, ('le', bound))} {cumulative}")
+                    lines.append(f"{name}_sum{self._labels(key)} {histogram.sum}")
+                    lines.append(f"{name}_count{self._labels(key)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self):
+        """Vue synthétique pour le fichier de statistiques JSON"""
+        elapsed = max(time.time() - self.start_time, 1e-9)
+        pages = self.total('crawler_pages_total')
+        downloaded = self.total('crawler_bytes_total')
+        data = {
+            'elapsed_seconds': round(elapsed, 1),
+            'pages': pages,
+            'pages_per_second': round(pages / elapsed, 2),
+            'bytes': downloaded,
+            'bytes_per_second': round(downloaded / elapsed),
+        }
+        data.update(self.read_gauges())
+        with self.lock:
+            data['pages_by_kind'] = {
+                dict(key).get('kind', ''): value for key, value in self.counters.get('crawler_pages_total', {}).items()
+            }
+            data['status_codes'] = {
+                dict(key).get('status', ''): value
+                for key, value in self.counters.get('crawler_responses_total', {}).items()
+            }
+            data['rejected'] = {
+                dict(key).get('reason', ''): value
+                for key, value in self.counters.get('crawler_rejected_total', {}).items()
+            }
+            data['stages'] = {
+                dict(key).get('stage', ''): {
+                    'count': histogram.count,
+                    'total_seconds': round(histogram.sum, 3),
+                    'mean_seconds': round(histogram.sum / histogram.count, 4) if histogram.count else None
+                }
+                for key, histogram in self.histograms.get('crawler_stage_seconds', {}).items()
+            }
+            data['hosts'] = {
+                dict(key).get('host', ''): {
+                    'requests': histogram.count,
+                    'mean_seconds': round(histogram.sum / histogram.count, 4) if histogram.count else None,
+                    'p50_seconds': histogram.quantile(0.5),
+                    'p95_seconds': histogram.quantile(0.95)
+                }
+                for key, histogram in self.histograms.get('crawler_request_seconds', {}).items()
+            }
+        return data
+
+
+class MetricsReporter:
+    """Publie les métriques: fichier JSON périodique et endpoint Prometheus optionnel"""
+
+    def __init__(self, registry, config, output_dir):
+        settings = config.get('metrics', {})
+        self.registry = registry
+        self.interval = settings.get('interval', 10)
+        self.stats_path = os.path.join(output_dir, STATS_FILE) if settings.get('stats_file', True) else None
+        self.port = settings.get('port')
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.server = None
+
+    def start(self):
+        if self.port:
+            self.server = self._start_server()
+        self.thread = threading.Thread(target=self._run, name='MetricsReporter', daemon=True)
+        self.thread.start()
+
+    def _start_server(self):
+        registry = self.registry
+
+        class MetricsHandler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Pas de ligne de log par lecture des métriques
+
+        try:
+            server = http.server.ThreadingHTTPServer(('', self.port), MetricsHandler)
+        except OSError as e:
+            logging.error(f"Endpoint de métriques indisponible sur le port {self.port}: {str(e)}")
+            return None
+        threading.Thread(target=server.serve_forever, name='MetricsServer', daemon=True).start()
+        logging.info("Métriques Prometheus exposées sur http://0.0.0.0:%s/metrics", self.port)
+        return server
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.report()
+
+    def report(self):
+        try:
+            snapshot = self.registry.snapshot()
+            logging.info(
+                "Progression: %s pages (%s pages/s, %.2f Mo/s), %s URLs en file",
+                snapshot['pages'], snapshot['pages_per_second'],
+                snapshot['bytes_per_second'] / 1e6, snapshot.get('crawler_queue_depth', 0)
+            )
+            if self.stats_path:
+                with open(self.stats_path + '.tmp', 'w', encoding='utf-8') as f:
+                    json.dump(snapshot, f, indent=2)
+                os.replace(self.stats_path + '.tmp', self.stats_path)
+        except Exception as e:
+            logging.error(f"Erreur écriture des statistiques: {str(e)}")
+
+    def close(self):
+        """Écrit les statistiques finales puis arrête le thread et l'endpoint"""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.report()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
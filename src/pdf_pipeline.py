@@ -0,0 +1,111 @@
+# src/pdf_pipeline.py
+import concurrent.futures
+import logging
+import multiprocessing
+import signal
+import threading
+import time
+
+
+# PDFProcessor propre à chaque processus d'extraction
+_processor = None
+
+
+class ExtractionTimeout(BaseException):
+    """L'extraction d'un document a dépassé le délai autorisé.
+
+    Dérive de BaseException pour traverser les except Exception de PDFProcessor.
+    """
+
+
+def _init_worker(config):
+    global _processor
+    # Les arrêts sont gérés par le processus principal
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    # Importé ici: le processus principal ne charge jamais les bibliothèques PDF
+    from src.pdf_processor import PDFProcessor
+    _processor = PDFProcessor(config)
+
+
+def _on_timeout(signum, frame):
+    raise ExtractionTimeout()
+
+
+def _extract(path, timeout):
+    """Exécuté dans un processus d'extraction: (texte du PDF, OCR compris, durée en secondes)"""
+    start = time.perf_counter()
+    if timeout and hasattr(signal, 'SIGALRM'):
+        signal.signal(signal.SIGALRM, _on_timeout)
+        signal.alarm(timeout)
+    try:
+        return _processor.extract_text_from_pdf(path), time.perf_counter() - start
+    finally:
+        if timeout and hasattr(signal, 'SIGALRM'):
+            signal.alarm(0)
+
+
+class PDFExtractionPipeline:
+    """Étape d'extraction des PDFs dans un pool de processus, séparée du téléchargement.
+
+    Les workers de téléchargement déposent le chemin du PDF et repartent aussitôt;
+    pdfplumber et Tesseract tournent dans des processus dédiés, sans bloquer le GIL
+    ni un créneau réseau. Au plus queue_size documents sont en attente: au-delà,
+    submit() attend qu'une extraction se termine. Le callback reçoit (url, texte)
+    dès que le texte est prêt, depuis un thread interne du pool. on_timing reçoit
+    la durée d'extraction de chaque document, mesurée dans son processus.
+    """
+
+    def __init__(self, config, on_timing=None):
+        settings = config.get('pdf', {})
+        self.config = config
+        self.workers = settings.get('workers', 2)
+        self.timeout = settings.get('timeout', 300)
+        self.slots = threading.BoundedSemaphore(settings.get('queue_size', 20))
+        self.executor = None
+        self.on_timing = on_timing
+
+    def start(self):
+        if self.executor is None:
+            # spawn: les processus ne reçoivent pas une copie des threads et verrous du crawler
+            self.executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=({'pdf': self.config.get('pdf', {})},)
+            )
+            logging.info("Pipeline PDF démarré (%s processus)", self.workers)
+
+    def submit(self, url, path, callback):
+        """Confie un PDF déjà écrit sur disque à l'étape d'extraction"""
+        self.start()
+        self.slots.acquire()
+        try:
+            future = self.executor.submit(_extract, path, self.timeout)
+        except Exception:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda f: self._done(url, f, callback))
+
+    def _done(self, url, future, callback):
+        self.slots.release()
+        try:
+            text, elapsed = future.result()
+        except ExtractionTimeout:
+            logging.error("Délai d'extraction PDF dépassé (%ss): %s", self.timeout, url)
+            return
+        except Exception as e:
+            logging.error("Erreur extraction PDF %s: %s", url, e)
+            return
+        if self.on_timing is not None:
+            self.on_timing(elapsed)
+        try:
+            callback(url, text)
+        except Exception as e:
+            logging.error("Erreur sauvegarde texte PDF %s: %s", url, e)
+
+    def close(self):
+        """Attend la fin des extractions en cours puis arrête les processus"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
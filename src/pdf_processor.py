@@ -1,58 +1,127 @@
 # src/pdf_processor.py
-from PyPDF2 import PdfReader
-import pdfplumber
-import pytesseract
-from PIL import Image
+import functools
+import importlib.util
 import io
 import logging
 
+# pdfplumber, PyMuPDF, pytesseract et PIL sont importés à la première
+# extraction: ils ne sont chargés que dans les processus qui traitent des PDFs
+
+
+@functools.lru_cache(maxsize=None)
+def load_pymupdf():
+    """Module PyMuPDF (backend optionnel, nettement plus rapide que pdfplumber), ou None"""
+    try:
+        import pymupdf
+    except ImportError:
+        try:
+            import fitz as pymupdf  # Anciennes versions de PyMuPDF
+        except ImportError:
+            return None
+    return pymupdf
+
+
+def pymupdf_installed():
+    """Vrai si PyMuPDF est installé, sans l'importer"""
+    return any(importlib.util.find_spec(name) is not None for name in ('pymupdf', 'fitz'))
+
+
 class PDFProcessor:
-    """Gère l'extraction avancée de texte à partir de PDFs"""
-    
-    def __init__(self):
+    """Gère l'extraction avancée de texte à partir de PDFs.
+
+    Le document est ouvert une seule fois: le texte de chaque page est lu, et
+    seules les pages sans couche texte (pages scannées) passent par l'OCR.
+    """
+
+    BACKENDS = ('pymupdf', 'pdfplumber')
+
+    def __init__(self, config=None):
+        settings = config.get('pdf', {}) if config else {}
+        self.backend = self.resolve_backend(settings.get('backend', 'auto'))
+        self.ocr_enabled = settings.get('ocr', True)
+        self.ocr_dpi = settings.get('ocr_dpi', 300)
         self.tesseract_config = r'--oem 3 --psm 6'
-        self.languages = ['fra']  # Ajoutez d'autres langues si nécessaire, par exemple ['fra', 'eng']
-    
+        self.languages = settings.get('ocr_languages', ['fra'])  # Par exemple ['fra', 'eng']
+
+    @classmethod
+    def available_backends(cls):
+        """Liste les backends utilisables dans l'environnement courant"""
+        available = []
+        if pymupdf_installed():
+            available.append('pymupdf')
+        available.append('pdfplumber')
+        return available
+
+    @classmethod
+    def resolve_backend(cls, backend):
+        """Choisit le backend demandé, ou le plus rapide disponible en mode 'auto'"""
+        available = cls.available_backends()
+        if backend == 'auto':
+            return available[0]
+        if backend not in cls.BACKENDS:
+            raise ValueError(f"Backend d'extraction PDF inconnu: {backend}")
+        if backend not in available:
+            logging.warning("Backend %s non installé, utilisation de pdfplumber", backend)
+            return 'pdfplumber'
+        return backend
+
+    @staticmethod
+    def open_source(pdf_content):
+        """Accepte le chemin d'un PDF sur disque ou son contenu en mémoire"""
+        return pdf_content if isinstance(pdf_content, str) else io.BytesIO(pdf_content)
+
     def extract_text_from_pdf(self, pdf_content):
-        """Extrait le texte d'un PDF en utilisant pdfplumber et OCR si nécessaire"""
-        text = ""
+        """Extrait le texte d'un PDF, avec OCR des seules pages sans texte"""
         try:
-            # Première tentative avec pdfplumber
-            with pdfplumber.open(io.BytesIO(pdf_content)) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-            
-            if not text.strip():
-                # Si pdfplumber ne trouve pas de texte, utiliser OCR avec pytesseract
-                logging.info("pdfplumber n'a pas pu extraire de texte, tentative avec OCR")
-                text = self.extract_text_via_ocr(pdf_content)
-            
-            return text
+            if self.backend == 'pymupdf':
+                pages = self._pages_pymupdf(pdf_content)
+            else:
+                pages = self._pages_pdfplumber(pdf_content)
+            return ''.join(page_text + "\n" for page_text in pages if page_text)
         except Exception as e:
-            logging.error(f"Erreur extraction PDF: {str(e)}")
+            logging.error("Erreur extraction PDF: %s", e)
             return ""
-    
-    def extract_text_via_ocr(self, pdf_content):
-        """Extrait le texte d'un PDF en utilisant OCR (Tesseract)"""
-        text = ""
+
+    def _pages_pymupdf(self, pdf_content):
+        pymupdf = load_pymupdf()
+        if isinstance(pdf_content, str):
+            document = pymupdf.open(pdf_content)
+        else:
+            document = pymupdf.open(stream=pdf_content, filetype='pdf')
+        with document:
+            for page_number, page in enumerate(document, start=1):
+                page_text = page.get_text()
+                if page_text.strip() or not self.ocr_enabled:
+                    yield page_text
+                    continue
+                from PIL import Image
+                pixmap = page.get_pixmap(dpi=self.ocr_dpi)
+                mode = 'RGBA' if pixmap.alpha else 'RGB'
+                yield self.ocr_page(
+                    Image.frombytes(mode, (pixmap.width, pixmap.height), pixmap.samples),
+                    page_number
+                )
+
+    def _pages_pdfplumber(self, pdf_content):
+        import pdfplumber
+        with pdfplumber.open(self.open_source(pdf_content)) as pdf:
+            for page_number, page in enumerate(pdf.pages, start=1):
+                page_text = page.extract_text()
+                if (page_text and page_text.strip()) or not self.ocr_enabled:
+                    yield page_text
+                    continue
+                yield self.ocr_page(page.to_image(resolution=self.ocr_dpi).original, page_number)
+
+    def ocr_page(self, pil_image, page_number):
+        """Extrait le texte de l'image d'une page avec OCR (Tesseract)"""
+        logging.debug("Extraction OCR pour la page %s", page_number)
         try:
-            with pdfplumber.open(io.BytesIO(pdf_content)) as pdf:
-                for page_number, page in enumerate(pdf.pages, start=1):
-                    if not page.extract_text():
-                        logging.info(f"Extraction OCR pour la page {page_number}")
-                        # Extraire l'image complète de la page
-                        pil_image = page.to_image(resolution=300).original
-                        
-                        # Utiliser pytesseract pour extraire le texte de l'image
-                        ocr_text = pytesseract.image_to_string(
-                            pil_image,
-                            config=self.tesseract_config,
-                            lang='+'.join(self.languages)
-                        )
-                        text += ocr_text + "\n"
-            return text
+            import pytesseract
+            return pytesseract.image_to_string(
+                pil_image,
+                config=self.tesseract_config,
+                lang='+'.join(self.languages)
+            )
         except Exception as e:
-            logging.error(f"Erreur extraction OCR PDF: {str(e)}")
+            logging.error("Erreur extraction OCR PDF (page %s): %s", page_number, e)
             return ""
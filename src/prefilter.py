@@ -0,0 +1,78 @@
+# src/prefilter.py
+import logging
+import mimetypes
+import threading
+from pathlib import Path
+from urllib.parse import urlparse
+
+# Décisions de la prédiction de type
+FETCH = 'fetch'  # Type conservé, la réponse est téléchargée directement
+PROBE = 'probe'  # Type incertain, vérifié par une requête HEAD avant le téléchargement
+SKIP = 'skip'    # Type jamais conservé, aucune requête
+
+# Extensions des types conservés par le crawler (HTML, PDF, images, Word)
+STORED_EXTENSIONS = {'.pdf', '.doc', '.docx', '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg'}
+# Extensions habituelles des pages générées côté serveur
+PAGE_EXTENSIONS = {'', '.html', '.htm', '.php', '.asp', '.aspx', '.jsp', '.cfm', '.shtml'}
+
+
+class DownloadPrefilter:
+    """Prédit le type d'une URL pour éviter les téléchargements inutiles.
+
+    L'extension de l'URL suffit le plus souvent: les pages et les types conservés
+    sont téléchargés directement, les catégories jamais conservées (vidéos,
+    archives...) sont écartées sans requête. Les extensions inconnues sont
+    vérifiées par une requête HEAD. Les compteurs par catégorie donnent le
+    nombre de réponses évitées et les octets économisés quand la taille est connue.
+    """
+
+    def __init__(self, config, file_handler):
+        settings = config.get('prefilter', {})
+        self.enabled = settings.get('enabled', True)
+        self.probe_unknown = settings.get('probe_unknown', True)
+        self.file_handler = file_handler
+        self.stats = {}  # Catégorie -> [réponses évitées, octets économisés]
+        self.lock = threading.Lock()
+
+    def predict(self, url):
+        """Retourne FETCH, PROBE ou SKIP d'après l'extension de l'URL"""
+        if not self.enabled:
+            return FETCH
+        ext = Path(urlparse(url).path).suffix.lower()
+        if ext in PAGE_EXTENSIONS or ext in STORED_EXTENSIONS:
+            return FETCH
+        if self.file_handler.get_file_category(url) != 'other':
+            return SKIP
+        return PROBE if self.probe_unknown else FETCH
+
+    def skip_url(self, url):
+        """Comptabilise une URL écartée d'après son extension"""
+        self.record(self.file_handler.get_file_category(url), None)
+        logging.debug("Téléchargement évité d'après l'extension: %s", url)
+
+    def skip_response(self, content_type, content_length=None):
+        """Comptabilise une réponse écartée d'après ses en-têtes, avant lecture du corps"""
+        self.record(self.category_for_content_type(content_type), content_length)
+
+    def category_for_content_type(self, content_type):
+        main_type = content_type.lower().split(';')[0].strip()
+        ext = mimetypes.guess_extension(main_type) if main_type else None
+        if ext is None:
+            return 'other'
+        return self.file_handler.get_file_category(f"file{ext}")
+
+    def record(self, category, content_length):
+        size = content_length or 0
+        with self.lock:
+            counters = self.stats.setdefault(category, [0, 0])
+            counters[0] += 1
+            counters[1] += size
+
+    def log_summary(self):
+        if not self.stats:
+            return
+        with self.lock:
+            total_bytes = sum(size for _, size in self.stats.values())
+            for category, (count, size) in sorted(self.stats.items()):
+                logging.info("Téléchargements évités (%s): %s, %s octets économisés", category, count, size)
+        logging.info("Total économisé par le préfiltrage: %s octets", total_bytes)
@@ -7,11 +7,18 @@ import os
 from urllib.parse import urlparse
 import logging
 
+from src.canonicalizer import URLCanonicalizer
+from src.domains import DomainSet
+
 class URLProcessor:
     """Classe gérant le traitement des URLs"""
     
     def __init__(self, config):
         self.config = config
+        self.domains = DomainSet(config)
+        # Un seul domaine: ses règles directement, sans recherche du domaine de chaque URL
+        self.url_filter = self.domains if self.domains.multi else self.domains.domains[0].url_filter
+        self.canonicalizer = URLCanonicalizer(config)
     
     def sanitize_filename(self, url):
         try:
@@ -57,8 +64,8 @@ class URLProcessor:
     
     def normalize_url(self, url):
         try:
-            parsed = urlparse(url)
-            return f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
+            # Clé de dédoublonnage: forme canonique, requête comprise (mémorisée)
+            return self.canonicalizer.canonicalize(url)
         except Exception as e:
             logging.error(f"Erreur lors de la normalisation de l'URL: {str(e)}")
             return url
@@ -73,28 +80,20 @@ class URLProcessor:
                 parsed.scheme,
                 parsed.netloc,
                 parsed.scheme in ['http', 'https'],
-                self.config['domain']['name'] in parsed.netloc
+                self.domains.for_host(parsed.netloc) is not None
             ])
         except Exception as e:
             logging.error(f"Erreur lors de la validation de l'URL: {str(e)}")
             return False
     
-    def should_process_url(self, url):
-        if not url:
-            return False
-            
-        try:
-            lower_url = url.lower()
-            
-            # Vérifie les patterns exclus
-            if any(pattern in lower_url for pattern in self.config['excluded']['patterns']):
-                return False
-                
-            # Vérifie les extensions exclues
-            if any(lower_url.endswith(ext) for ext in self.config['excluded']['extensions']):
-                return False
-                
-            return self.is_valid_url(url)
-        except Exception as e:
-            logging.error(f"Erreur lors de la vérification de l'URL: {str(e)}")
-            return False
+    def should_process_url(self, url, depth=None):
+        # Règles compilées au démarrage, une seule analyse de l'URL
+        return self.url_filter.accepts(url, depth)
+
+    def filter_links(self, links, depth=None):
+        """Filtre en une fois les liens d'une page ajoutés à la profondeur depth"""
+        return self.url_filter.filter(links, depth)
+
+    def partition_links(self, links, depth=None):
+        """(liens acceptés, [(lien, motif)] écartés) parmi les liens d'une page"""
+        return self.url_filter.partition(links, depth)
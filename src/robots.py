@@ -0,0 +1,158 @@
+# src/robots.py
+import logging
+import re
+import time
+from urllib.parse import urlsplit
+
+# Taille maximale lue d'un robots.txt (RFC 9309: au moins 500 Kio)
+MAX_ROBOTS_SIZE = 512 * 1024
+
+
+class RobotsRules:
+    """Règles robots.txt d'un hôte pour notre agent, compilées une fois.
+
+    La règle la plus longue qui correspond au chemin l'emporte, Allow gagnant
+    à longueur égale (RFC 9309). Les règles sans joker sont de simples tests
+    de préfixe, les autres (* et $) sont des expressions régulières.
+    """
+
+    __slots__ = ('rules', 'crawl_delay', 'sitemaps')
+
+    def __init__(self, rules=(), crawl_delay=None, sitemaps=()):
+        # (longueur, autorisé, préfixe ou regex), du plus spécifique au moins spécifique
+        self.rules = sorted(
+            ((len(pattern), allow, self._compile(pattern)) for allow, pattern in rules if pattern),
+            key=lambda rule: (rule[0], rule[1]),
+            reverse=True
+        )
+        self.crawl_delay = crawl_delay
+        self.sitemaps = list(sitemaps)
+
+    @staticmethod
+    def _compile(pattern):
+        if '*' not in pattern and not pattern.endswith('$'):
+            return pattern
+        anchored = pattern.endswith('$')
+        body = re.escape(pattern[:-1] if anchored else pattern).replace(r'\*', '.*')
+        return re.compile(body + ('$' if anchored else ''))
+
+    def allowed(self, path):
+        for _, allow, rule in self.rules:
+            if (path.startswith(rule) if isinstance(rule, str) else rule.match(path)):
+                return allow
+        return True
+
+
+ALLOW_ALL = RobotsRules()
+
+
+def parse_robots(text, agent='*'):
+    """Règles du groupe User-agent correspondant à agent (ou du groupe *), Crawl-delay et Sitemap"""
+    agent = agent.lower()
+    groups = {}  # Agent -> [(autorisé, motif)], [crawl-delay]
+    sitemaps = []
+    current = []  # Groupes du bloc User-agent en cours
+    in_rules = False
+    for line in text.splitlines():
+        line = line.split('#', 1)[0].strip()
+        if ':' not in line:
+            continue
+        field, value = (part.strip() for part in line.split(':', 1))
+        field = field.lower()
+        if field == 'user-agent':
+            if in_rules:
+                current, in_rules = [], False
+            current.append(groups.setdefault(value.lower(), ([], [])))
+        elif field in ('allow', 'disallow'):
+            in_rules = True
+            for rules, _ in current:
+                rules.append((field == 'allow', value))
+        elif field == 'crawl-delay':
+            in_rules = True
+            try:
+                delay = float(value)
+            except ValueError:
+                continue
+            for _, delays in current:
+                delays.append(delay)
+        elif field == 'sitemap':
+            sitemaps.append(value)
+
+    # Groupe le plus spécifique dont le nom est contenu dans notre jeton, sinon *
+    matching = [name for name in groups if name != '*' and name in agent]
+    name = max(matching, key=len) if matching else '*'
+    rules, delays = groups.get(name, ([], []))
+    return RobotsRules(rules, delays[0] if delays else None, sitemaps)
+
+
+class RobotsCache:
+    """Règles robots.txt par origine (schéma, hôte, port), téléchargées à la première URL de l'hôte.
+
+    Un robots.txt absent (4xx) autorise tout. En cas d'erreur serveur ou réseau,
+    tout est aussi autorisé mais le fichier est redemandé après retry_after
+    secondes. Utilisé depuis le thread de la boucle principale (thread d'état du
+    moteur async); seul fetch(), sans état, peut être appelé d'un autre thread.
+    """
+
+    def __init__(self, config, session, on_rules=None):
+        settings = config.get('robots', {})
+        self.enabled = settings.get('enabled', True)
+        self.agent = settings.get('user_agent', '*')
+        self.ttl = settings.get('cache_ttl', 86400)
+        self.retry_after = settings.get('retry_after', 300)
+        self.timeout = (config['timeouts']['connect'], config['timeouts']['read'])
+        self.session = session
+        self.on_rules = on_rules  # Appelé avec (hôte, règles) après chaque téléchargement
+        self.hosts = {}  # Origine -> RobotsRules
+        self.expires = {}  # Origine -> date (monotone) du prochain téléchargement
+
+    @staticmethod
+    def origin(url):
+        """(origine, hôte) d'une URL"""
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}", parts.netloc
+
+    def expired(self, origin):
+        """Vrai si le robots.txt de l'origine doit être téléchargé avant de juger ses URLs"""
+        return self.enabled and (origin not in self.hosts or time.monotonic() >= self.expires[origin])
+
+    def rules_for(self, url):
+        origin, host = self.origin(url)
+        if origin not in self.hosts or time.monotonic() >= self.expires[origin]:
+            self.store(origin, host, *self.fetch(origin))
+        return self.hosts[origin]
+
+    def store(self, origin, host, rules, ttl):
+        """Met en cache les règles téléchargées par fetch (thread de la boucle principale)"""
+        self.hosts[origin] = rules
+        self.expires[origin] = time.monotonic() + ttl
+        if self.on_rules is not None:
+            self.on_rules(host, rules)
+
+    def fetch(self, origin):
+        """(règles, durée de validité) du robots.txt de l'origine"""
+        url = f"{origin}/robots.txt"
+        try:
+            response = self.session.get(url, timeout=self.timeout, stream=True)
+            try:
+                if 400 <= response.status_code < 500:
+                    return ALLOW_ALL, self.ttl
+                if response.status_code >= 500:
+                    logging.warning("robots.txt indisponible (%s): %s", response.status_code, url)
+                    return ALLOW_ALL, self.retry_after
+                text = response.raw.read(MAX_ROBOTS_SIZE, decode_content=True).decode('utf-8', errors='replace')
+            finally:
+                response.close()
+        except Exception as e:
+            logging.warning("robots.txt indisponible: %s (%s)", url, e)
+            return ALLOW_ALL, self.retry_after
+        rules = parse_robots(text, self.agent)
+        logging.info("robots.txt chargé: %s (%s règles, Crawl-delay: %s)", url, len(rules.rules), rules.crawl_delay)
+        return rules, self.ttl
+
+    def allowed(self, url):
+        if not self.enabled:
+            return True
+        parts = urlsplit(url)
+        path = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        return self.rules_for(url).allowed(path)
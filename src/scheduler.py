@@ -0,0 +1,189 @@
+# src/scheduler.py
+import heapq
+import random
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# Statuts HTTP qui signalent une surcharge du serveur
+THROTTLE_STATUSES = (429, 503)
+
+
+def parse_retry_after(value):
+    """Convertit un en-tête Retry-After (secondes ou date HTTP) en secondes"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostState:
+    """État de politesse d'un hôte"""
+
+    __slots__ = ('queue', 'next_ready', 'free', 'busy', 'backoff', 'scheduled', 'min_delay',
+                 'group', 'delay_min', 'delay_max')
+
+    def __init__(self, group, delay_min, delay_max, max_active):
+        self.queue = deque()
+        self.next_ready = 0.0  # Date avant laquelle aucune requête ne part (Crawl-delay, 429/503)
+        # Créneaux de concurrence: date de disponibilité des créneaux libres (tas) et
+        # de ceux occupés par une requête en cours (tas)
+        self.free = [0.0] * max_active
+        self.busy = []
+        self.backoff = 0.0
+        self.scheduled = None  # Date de disponibilité actuellement dans le tas
+        self.min_delay = 0.0  # Crawl-delay de robots.txt
+        self.group = group  # Domaine de l'hôte
+        self.delay_min = delay_min
+        self.delay_max = delay_max
+
+    @property
+    def active(self):
+        return len(self.busy)
+
+    def ready_at(self):
+        """Date de départ possible de la prochaine requête, None si tous les créneaux sont occupés"""
+        if not self.free:
+            return None
+        return max(self.next_ready, self.free[0])
+
+
+class HostScheduler:
+    """Ordonnanceur de politesse par hôte.
+
+    Chaque hôte a sa propre file et per_host_concurrency créneaux (max_workers
+    par défaut). Le délai delay_min-delay_max sépare deux requêtes d'un même
+    créneau: n créneaux donnent n fois le débit d'un seul. Crawl-delay et les
+    reculs après 429/503 s'appliquent à l'hôte entier. pop() retourne toujours
+    une URL d'un hôte prêt, ce qui remplace la pause globale entre les lots. Les réponses 429/503 augmentent
+    le délai de l'hôte concerné (en respectant Retry-After), les succès le réduisent.
+    policy(hôte) retourne (groupe, section crawler) pour donner à chaque hôte
+    les délais et la concurrence de son domaine; le nombre d'URLs en attente
+    est aussi tenu par groupe. Utilisé uniquement depuis le thread de la boucle
+    principale.
+    """
+
+    def __init__(self, config, policy=None):
+        crawler_config = config['crawler']
+        self.crawler_config = crawler_config
+        self.max_backoff = crawler_config.get('max_backoff', 300)
+        self.policy = policy
+        self.hosts = {}
+        self.ready = []  # Tas de (date de disponibilité, hôte)
+        self.pending = 0
+        self.group_pending = {}  # Groupe -> URLs en attente
+
+    def __len__(self):
+        return self.pending
+
+    def host_state(self, host):
+        state = self.hosts.get(host)
+        if state is None:
+            group, settings = self.policy(host) if self.policy is not None else (None, self.crawler_config)
+            state = self.hosts[host] = HostState(
+                group,
+                settings['delay_min'],
+                settings['delay_max'],
+                settings.get('per_host_concurrency') or self.crawler_config['max_workers']
+            )
+        return state
+
+    def drain(self, group):
+        """Retire et retourne les éléments en attente des hôtes d'un groupe"""
+        items = []
+        for state in self.hosts.values():
+            if state.group == group and state.queue:
+                items.extend(state.queue)
+                state.queue.clear()
+        self.pending -= len(items)
+        self.group_pending[group] = self.group_pending.get(group, 0) - len(items)
+        return items
+
+    def pending_in(self, group):
+        """URLs en attente pour les hôtes d'un groupe"""
+        return self.group_pending.get(group, 0)
+
+    def set_host_delay(self, host, delay):
+        """Délai minimal entre deux requêtes vers l'hôte (Crawl-delay)"""
+        self.host_state(host).min_delay = delay or 0.0
+
+    def push(self, host, item, front=False):
+        state = self.host_state(host)
+        if front:
+            state.queue.appendleft(item)
+        else:
+            state.queue.append(item)
+        self.pending += 1
+        self.group_pending[state.group] = self.group_pending.get(state.group, 0) + 1
+        self._schedule(host, state)
+
+    def pop(self, now=None):
+        """Retourne (hôte, élément) pour le prochain hôte prêt, ou None"""
+        now = time.monotonic() if now is None else now
+        while self.ready and self.ready[0][0] <= now:
+            ready_at, host = heapq.heappop(self.ready)
+            state = self.hosts[host]
+            if state.scheduled != ready_at:
+                continue  # Entrée périmée, l'hôte a été reprogrammé
+            state.scheduled = None
+            if not state.queue or not state.free:
+                continue
+            item = state.queue.popleft()
+            self.pending -= 1
+            self.group_pending[state.group] -= 1
+            # Le créneau est repris après son délai, compté depuis le départ de la requête
+            heapq.heappop(state.free)
+            heapq.heappush(state.busy, now + self._delay(state))
+            state.next_ready = now + max(state.backoff, state.min_delay)
+            self._schedule(host, state)
+            return host, item
+        return None
+
+    def release(self, host, throttled=False, retry_after=None):
+        """Libère un créneau de l'hôte après une requête et ajuste son délai"""
+        state = self.hosts[host]
+        if state.busy:
+            heapq.heappush(state.free, heapq.heappop(state.busy))
+        if throttled:
+            backoff = max(state.backoff * 2, state.delay_max, 1.0)
+            if retry_after is not None:
+                backoff = max(backoff, retry_after)
+            state.backoff = min(backoff, self.max_backoff)
+            state.next_ready = max(state.next_ready, time.monotonic() + state.backoff)
+        elif state.backoff:
+            # Retour progressif au rythme normal après une série de succès
+            state.backoff = state.backoff / 2 if state.backoff / 2 > state.delay_max else 0.0
+        self._schedule(host, state)
+
+    def wait_time(self, now=None):
+        """Secondes avant qu'un hôte ne soit prêt, None si aucun n'est en attente"""
+        if not self.ready:
+            return None
+        now = time.monotonic() if now is None else now
+        return max(0.0, self.ready[0][0] - now)
+
+    def snapshot(self):
+        """Liste des éléments en attente, pour la sauvegarde d'état"""
+        return [item for state in self.hosts.values() for item in state.queue]
+
+    def _delay(self, state):
+        return max(random.uniform(state.delay_min, state.delay_max), state.backoff, state.min_delay)
+
+    def _schedule(self, host, state):
+        ready_at = state.ready_at()
+        if not state.queue or ready_at is None:
+            return
+        if state.scheduled == ready_at:
+            return
+        state.scheduled = ready_at
+        heapq.heappush(self.ready, (ready_at, host))
@@ -1,41 +1,230 @@
 # src/session.py
 from src.constants import *
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
-from fake_useragent import UserAgent
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.cookies import RequestsCookieJar
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+import random
+import threading
 import requests
 import logging
 
+# HTTP/2 optionnel, via httpx (pip install "httpx[http2]"), importé par load_httpx
+httpx = None
+
+# User-Agents de navigateurs courants, tirés au hasard (aucun téléchargement)
+USER_AGENTS = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36 Edg/124.0.0.0',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:125.0) Gecko/20100101 Firefox/125.0',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4.1 Safari/605.1.15',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 14.4; rv:125.0) Gecko/20100101 Firefox/125.0',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:125.0) Gecko/20100101 Firefox/125.0',
+)
+
+
+def load_httpx():
+    """Importe httpx à la première session HTTP/2, False s'il n'est pas installé"""
+    global httpx
+    if httpx is None:
+        try:
+            import httpx as module
+        except ImportError:
+            return False
+        httpx = module
+    return True
+
+# Statuts pour lesquels une nouvelle tentative a des chances d'aboutir
+# (429 et 503 sont gérés par l'ordonnanceur de l'hôte)
+RETRY_STATUSES = (408, 500, 502, 504)
+
+# Erreurs réseau transitoires du moteur à threads
+TRANSIENT_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+class RetryPolicy:
+    """Politique unique de nouvelles tentatives, commune aux deux moteurs.
+
+    max_retries est le nombre total de tentatives. Seules les erreurs réseau
+    transitoires et les statuts de RETRY_STATUSES sont retentés, avec un délai
+    exponentiel plafonné à backoff_max et une part aléatoire pour étaler les
+    reprises des workers.
+    """
+
+    def __init__(self, config):
+        timeouts = config['timeouts']
+        self.attempts = max(1, timeouts['max_retries'])
+        self.backoff_base = timeouts.get('backoff_base', 1)
+        self.backoff_max = timeouts.get('backoff_max', 30)
+
+    def should_retry(self, attempt, status=None):
+        """Vrai si la tentative attempt (à partir de 0) peut être suivie d'une autre"""
+        if attempt >= self.attempts - 1:
+            return False
+        return status is None or status in RETRY_STATUSES
+
+    def delay(self, attempt):
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+
+class _HTTPXStream:
+    """Corps d'une réponse httpx lu comme le flux brut d'une réponse requests"""
+
+    def __init__(self, response):
+        self.response = response
+        self.chunks = response.iter_bytes()
+        self.buffer = bytearray()
+
+    def read(self, amt=None, decode_content=True):
+        while amt is None or len(self.buffer) < amt:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                break
+            self.buffer += chunk
+        if amt is None:
+            amt = len(self.buffer)
+        data = bytes(self.buffer[:amt])
+        del self.buffer[:amt]
+        return data
+
+    def close(self):
+        self.response.close()
+
+
+class HTTP2Adapter(BaseAdapter):
+    """Adaptateur requests qui envoie les requêtes avec httpx, en HTTP/2 quand le serveur l'accepte.
+
+    Les redirections restent gérées par requests. Les cookies posés par le
+    serveur ne sont pas conservés.
+    """
+
+    def __init__(self, pool_connections, pool_maxsize):
+        super().__init__()
+        logging.getLogger('httpx').setLevel(logging.WARNING)  # Une ligne INFO par requête sinon
+        self.client = httpx.Client(
+            http2=True,
+            verify=False,
+            follow_redirects=False,
+            limits=httpx.Limits(
+                max_connections=pool_connections * pool_maxsize,
+                max_keepalive_connections=pool_connections * pool_maxsize
+            )
+        )
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        try:
+            response = self.client.send(
+                self.client.build_request(
+                    request.method,
+                    request.url,
+                    headers={k: v for k, v in request.headers.items() if k.lower() != 'connection'},
+                    content=request.body,
+                    timeout=httpx.Timeout(read, connect=connect)
+                ),
+                stream=True
+            )
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(e, request=request)
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(e, request=request)
+
+        result = requests.Response()
+        result.status_code = response.status_code
+        result.reason = response.reason_phrase
+        result.headers = CaseInsensitiveDict(response.headers)
+        result.encoding = get_encoding_from_headers(result.headers)
+        result.raw = _HTTPXStream(response)
+        result.url = request.url
+        result.request = request
+        result.connection = self
+        return result
+
+    def close(self):
+        self.client.close()
+
+
+class PooledSession:
+    """Sessions requests propres à chaque thread, partageant un même pool de connexions.
+
+    requests.Session n'est pas garanti thread-safe: chaque worker a la sienne,
+    mais toutes utilisent le même adaptateur (pool urllib3 thread-safe, dimensionné
+    d'après max_workers), les mêmes en-têtes et le même stock de cookies.
+    """
+
+    def __init__(self, adapter, headers, max_redirects):
+        self.adapter = adapter
+        self.headers = headers
+        self.cookies = RequestsCookieJar()  # Protégé par son propre verrou
+        self.max_redirects = max_redirects
+        self.local = threading.local()
+
+    def session(self):
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount("http://", self.adapter)
+            session.mount("https://", self.adapter)
+            session.headers = self.headers
+            session.cookies = self.cookies
+            session.max_redirects = self.max_redirects
+            # Désactive la vérification SSL
+            session.verify = False
+            self.local.session = session
+        return session
+
+    def request(self, method, url, **kwargs):
+        return self.session().request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.session().get(url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.session().head(url, **kwargs)
+
+    def close(self):
+        self.adapter.close()
+
+
 class SafeSession:
     """Classe gérant les sessions HTTP de manière sécurisée"""
-    
+
     @staticmethod
     def create(config):
         try:
-            session = requests.Session()
-            retry_strategy = Retry(
-                total=config['timeouts']['max_retries'],
-                backoff_factor=1,
-                status_forcelist=[429, 500, 502, 503, 504],
-                allowed_methods=["HEAD", "GET", "OPTIONS"],
-                raise_on_status=False  # Modifier pour ne pas lever d'exception sur certains statuts
-            )
-            
-            adapter = HTTPAdapter(max_retries=retry_strategy)
-            session.mount("http://", adapter)
-            session.mount("https://", adapter)
-            
-            session.headers.update({
-                'User-Agent': UserAgent().random,
+            settings = config.get('http', {})
+            max_workers = config['crawler']['max_workers']
+            pool_connections = settings.get('pool_connections') or max(10, max_workers)
+            pool_maxsize = settings.get('pool_maxsize') or max_workers
+
+            # Pas de nouvelles tentatives dans urllib3: elles sont gérées par RetryPolicy
+            if settings.get('http2', False) and load_httpx():
+                adapter = HTTP2Adapter(pool_connections, pool_maxsize)
+                logging.info("HTTP/2 activé (httpx)")
+            else:
+                if settings.get('http2', False):
+                    logging.warning("httpx non installé, utilisation de HTTP/1.1")
+                adapter = HTTPAdapter(
+                    pool_connections=pool_connections,
+                    pool_maxsize=pool_maxsize,
+                    max_retries=0
+                )
+
+            headers = CaseInsensitiveDict({
+                'User-Agent': settings.get('user_agent') or random.choice(USER_AGENTS),
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
                 'Accept-Language': 'en-US,en;q=0.5',
                 'Connection': 'keep-alive',
             })
-            
-            # Désactive la vérification SSL
-            session.verify = False
-            
-            return session
+
+            return PooledSession(adapter, headers, config['timeouts'].get('max_redirects', 10))
         except Exception as e:
             logging.error(f"Erreur lors de la création de la session: {str(e)}")
             raise
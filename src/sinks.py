@@ -0,0 +1,279 @@
+# src/sinks.py
+import glob
+import gzip
+import json
+import logging
+import os
+import queue
+import threading
+import uuid
+from datetime import datetime, timezone
+
+SEGMENTS_DIR = 'segments'
+INDEX_FILE = 'index.tsv'
+
+
+def format_text_record(url, content_type, text, timestamp):
+    """Mise en forme historique des fichiers texte, avec en-tête et pied de page"""
+    return f"""URL: {url}
+Timestamp: {timestamp.strftime("%Y-%m-%d %H:%M:%S")}
+Content Type: {content_type}
+{'=' * 100}
+
+{text}
+
+{'=' * 100}
+Fin du contenu de : {url}"""
+
+
+class FileSink:
+    """Un fichier .txt par URL sous text/ (disposition historique)"""
+
+    def __init__(self, output_dir, url_processor):
+        self.text_dir = os.path.join(output_dir, 'text')
+        self.url_processor = url_processor
+        os.makedirs(self.text_dir, exist_ok=True)
+
+    def location(self, url):
+        return os.path.join(self.text_dir, f"{self.url_processor.sanitize_filename(url)}.txt")
+
+    def exists(self, location):
+        return os.path.exists(location)
+
+    def write(self, url, content_type, text):
+        """Écrit le texte d'une URL, retourne son emplacement"""
+        filepath = self.location(url)
+        with open(filepath, "w", encoding='utf-8') as f:
+            f.write(format_text_record(url, content_type, text, datetime.now()))
+        return filepath
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class SegmentSink:
+    """Regroupe les textes dans des segments compressés (JSONL ou WARC) en rotation.
+
+    Les enregistrements sont mis en file et écrits par lots par un thread dédié:
+    un membre gzip par enregistrement, ce qui permet de relire un enregistrement
+    isolé à partir de son décalage. index.tsv associe chaque URL à
+    (segment, décalage, longueur). Un nouveau segment est ouvert au-delà de
+    segment_size octets, et à chaque lancement du crawler.
+    """
+
+    FORMATS = ('jsonl', 'warc')
+
+    def __init__(self, output_dir, record_format='jsonl', segment_size=100 * 1024 * 1024,
+                 batch_size=100, flush_interval=1.0):
+        if record_format not in self.FORMATS:
+            raise ValueError(f"Format de segment inconnu: {record_format}")
+        self.segments_dir = os.path.join(output_dir, SEGMENTS_DIR)
+        self.index_path = os.path.join(self.segments_dir, INDEX_FILE)
+        self.format = record_format
+        self.segment_size = segment_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        os.makedirs(self.segments_dir, exist_ok=True)
+
+        self.indexed = self._load_index()
+        self.segment_number = self._last_segment_number()
+        self.segment = None
+        self.segment_name = None
+        self.index = open(self.index_path, 'a', encoding='utf-8')
+        self.queue = queue.Queue(maxsize=batch_size * 10)
+        self.thread = threading.Thread(target=self._run, name='SegmentWriter', daemon=True)
+        self.thread.start()
+
+    def _load_index(self):
+        indexed = set()
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    indexed.add(line.split('\t', 1)[0])
+        return indexed
+
+    def _last_segment_number(self):
+        numbers = [0]
+        for path in glob.glob(os.path.join(self.segments_dir, 'text-*.gz')):
+            try:
+                numbers.append(int(os.path.basename(path).split('-')[1].split('.')[0]))
+            except (IndexError, ValueError):
+                continue
+        return max(numbers)
+
+    def location(self, url):
+        return f"{self.index_path}#{url}"
+
+    def exists(self, location):
+        path, _, url = location.partition('#')
+        return path == self.index_path and url in self.indexed
+
+    def write(self, url, content_type, text):
+        """Met l'enregistrement en file d'écriture, retourne son emplacement"""
+        self.indexed.add(url)
+        self.queue.put((url, content_type, text, datetime.now(timezone.utc)))
+        return self.location(url)
+
+    def flush(self):
+        """Attend que tous les enregistrements en file soient écrits"""
+        self.queue.join()
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        if self.segment is not None:
+            self.segment.close()
+        self.index.close()
+
+    def _run(self):
+        while True:
+            batch = []
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            stop = item is None
+            if not stop:
+                batch.append(item)
+            # Regroupe les enregistrements déjà en attente, sans les attendre
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                else:
+                    batch.append(item)
+            try:
+                if batch:
+                    self._write_batch(batch)
+            except Exception as e:
+                logging.error(f"Erreur écriture segment: {str(e)}")
+            finally:
+                for _ in range(len(batch) + (1 if stop else 0)):
+                    self.queue.task_done()
+            if stop:
+                return
+
+    def _write_batch(self, batch):
+        chunks, index_lines = [], []
+        if self.segment is None or self.segment.tell() >= self.segment_size:
+            self._rotate()
+        offset = self.segment.tell()
+        for url, content_type, text, timestamp in batch:
+            member = gzip.compress(self._encode(url, content_type, text, timestamp))
+            chunks.append(member)
+            index_lines.append(f"{url}\t{self.segment_name}\t{offset}\t{len(member)}\n")
+            offset += len(member)
+        self.segment.write(b''.join(chunks))
+        self.segment.flush()
+        self.index.write(''.join(index_lines))
+        self.index.flush()
+
+    def _rotate(self):
+        if self.segment is not None:
+            self.segment.close()
+        self.segment_number += 1
+        extension = 'warc' if self.format == 'warc' else 'jsonl'
+        self.segment_name = f"text-{self.segment_number:05d}.{extension}.gz"
+        self.segment = open(os.path.join(self.segments_dir, self.segment_name), 'ab')
+        if self.format == 'warc':
+            self.segment.write(gzip.compress(self._warc_record(
+                'warcinfo', None, 'application/warc-fields',
+                b"software: web-crawler\r\nformat: WARC File Format 1.0\r\n",
+                datetime.now(timezone.utc)
+            )))
+        logging.info("Nouveau segment de sortie: %s", self.segment_name)
+
+    def _encode(self, url, content_type, text, timestamp):
+        if self.format == 'warc':
+            return self._warc_record('resource', url, 'text/plain; charset=utf-8',
+                                     text.encode('utf-8'), timestamp,
+                                     {'WARC-Source-Content-Type': content_type})
+        record = {
+            'url': url,
+            'content_type': content_type,
+            'timestamp': timestamp.isoformat(),
+            'text': text
+        }
+        return (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+
+    @staticmethod
+    def _warc_record(record_type, url, content_type, payload, timestamp, extra=None):
+        headers = [
+            'WARC/1.0',
+            f"WARC-Type: {record_type}",
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>",
+            f"WARC-Date: {timestamp.strftime('%Y-%m-%dT%H:%M:%SZ')}",
+        ]
+        if url:
+            headers.append(f"WARC-Target-URI: {url}")
+        for name, value in (extra or {}).items():
+            headers.append(f"{name}: {value}")
+        headers.append(f"Content-Type: {content_type}")
+        headers.append(f"Content-Length: {len(payload)}")
+        return ('\r\n'.join(headers) + '\r\n\r\n').encode('utf-8') + payload + b'\r\n\r\n'
+
+
+class DomainSink:
+    """Une destination par domaine (crawl multi-domaines), chacune dans le sous-dossier du domaine"""
+
+    def __init__(self, sinks, domain_of, default):
+        self.sinks = sinks  # Nom du domaine -> destination
+        self.domain_of = domain_of
+        self.default = default  # URLs hors des domaines configurés
+
+    def sink_for(self, url):
+        domain = self.domain_of(url)
+        return self.sinks[domain.name] if domain is not None else self.default
+
+    def location(self, url):
+        return self.sink_for(url).location(url)
+
+    def exists(self, location):
+        return any(sink.exists(location) for sink in self.sinks.values()) or self.default.exists(location)
+
+    def write(self, url, content_type, text):
+        return self.sink_for(url).write(url, content_type, text)
+
+    def flush(self):
+        for sink in self.sinks.values():
+            sink.flush()
+        self.default.flush()
+
+    def close(self):
+        for sink in self.sinks.values():
+            sink.close()
+        self.default.close()
+
+
+def create_sink(config, output_dir, url_processor):
+    """Crée la destination des textes extraits selon la section output de la configuration"""
+    domains = url_processor.domains
+    if domains.multi:
+        return DomainSink(
+            {domain.name: create_output_sink(config, os.path.join(output_dir, domain.name), url_processor)
+             for domain in domains},
+            domains.domain_of,
+            create_output_sink(config, output_dir, url_processor)
+        )
+    return create_output_sink(config, output_dir, url_processor)
+
+
+def create_output_sink(config, output_dir, url_processor):
+    settings = config.get('output', {})
+    sink = settings.get('sink', 'files')
+    if sink == 'files':
+        return FileSink(output_dir, url_processor)
+    if sink in SegmentSink.FORMATS:
+        return SegmentSink(
+            output_dir,
+            record_format=sink,
+            segment_size=settings.get('segment_size', 100 * 1024 * 1024),
+            batch_size=settings.get('batch_size', 100)
+        )
+    raise ValueError(f"Destination de sortie inconnue: {sink}")
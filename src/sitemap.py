@@ -0,0 +1,131 @@
+# src/sitemap.py
+import gzip
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from urllib.parse import urljoin
+from xml.etree.ElementTree import iterparse, ParseError
+
+# Âge (jours) d'une page dont la priorité vaut 0.5: les pages récentes passent en premier
+PRIORITY_HALF_LIFE_DAYS = 365
+
+# Espace de noms du protocole sitemap; les extensions (image:, video:, xhtml:...)
+# ont leurs propres <loc> qui ne désignent pas la page
+SITEMAP_NAMESPACE = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+
+
+def parse_lastmod(value):
+    """Date W3C d'un <lastmod> (AAAA-MM-JJ ou date et heure ISO 8601), None si invalide"""
+    if not value:
+        return None
+    try:
+        date = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return date if date.tzinfo else date.replace(tzinfo=timezone.utc)
+
+
+def lastmod_priority(lastmod, base=1, now=None):
+    """Priorité de file d'une URL de sitemap: de base (modifiée à l'instant) à base + 1 (jamais datée)"""
+    if lastmod is None:
+        return base + 1
+    now = now or datetime.now(timezone.utc)
+    age = max((now - lastmod).total_seconds() / 86400, 0.0)
+    return base + age / (age + PRIORITY_HALF_LIFE_DAYS)
+
+
+class _Prefixed:
+    """Flux dont les premiers octets, déjà lus, sont rendus avant la suite"""
+
+    def __init__(self, head, stream):
+        self.head = head
+        self.stream = stream
+
+    def read(self, size=-1):
+        if not self.head:
+            return self.stream.read(size if size and size > 0 else None)
+        data, self.head = self.head, b''
+        if size is None or size < 0:
+            return data + self.stream.read()
+        return data + (self.stream.read(size - len(data)) if size > len(data) else b'')
+
+
+class SitemapReader:
+    """Lecture en flux des sitemaps XML, index de sitemaps compris, compressés ou non.
+
+    Les documents sont analysés au fil du téléchargement (iterparse) et chaque
+    élément est libéré après lecture: la mémoire reste constante quelle que soit
+    la taille du sitemap. read() produit des (url, lastmod).
+    """
+
+    def __init__(self, config, session):
+        settings = config.get('sitemaps', {})
+        self.max_urls = settings.get('max_urls', 1000000)
+        self.max_sitemaps = settings.get('max_sitemaps', 1000)
+        self.timeout = (config['timeouts']['connect'], config['timeouts']['read'])
+        self.session = session
+
+    def read(self, sitemap_urls):
+        pending = deque(dict.fromkeys(sitemap_urls))
+        visited = set(pending)
+        fetched = produced = 0
+        while pending and fetched < self.max_sitemaps:
+            sitemap_url = pending.popleft()
+            fetched += 1
+            try:
+                for kind, loc, lastmod in self.entries(sitemap_url):
+                    if kind == 'sitemap':
+                        loc = urljoin(sitemap_url, loc)
+                        if loc not in visited:
+                            visited.add(loc)
+                            pending.append(loc)
+                        continue
+                    yield loc, lastmod
+                    produced += 1
+                    if produced >= self.max_urls:
+                        logging.info("Limite de %s URLs de sitemap atteinte", self.max_urls)
+                        return
+            except ParseError as e:
+                logging.error(f"Sitemap invalide {sitemap_url}: {str(e)}")
+            except Exception as e:
+                logging.error(f"Erreur lecture sitemap {sitemap_url}: {str(e)}")
+        if pending:
+            logging.info("Limite de %s sitemaps atteinte, %s ignorés", self.max_sitemaps, len(pending))
+
+    def entries(self, sitemap_url):
+        """(type, loc, lastmod) des <url> et <sitemap> d'un document, dans l'ordre de lecture"""
+        response = self.session.get(sitemap_url, timeout=self.timeout, stream=True)
+        try:
+            if response.status_code != 200:
+                logging.warning("Sitemap inaccessible (%s): %s", response.status_code, sitemap_url)
+                return
+            # Content-Encoding est décodé par le transport; un fichier .xml.gz servi
+            # tel quel est reconnu à sa signature et décompressé à la volée
+            response.raw.decode_content = True
+            head = response.raw.read(2)
+            stream = _Prefixed(head, response.raw)
+            if head == b'\x1f\x8b':
+                stream = gzip.GzipFile(fileobj=stream)
+            root = None
+            loc = lastmod = None
+            for event, element in iterparse(stream, events=('start', 'end')):
+                if root is None:
+                    root = element
+                if event == 'start':
+                    continue
+                tag = element.tag
+                if tag.startswith(SITEMAP_NAMESPACE):
+                    tag = tag[len(SITEMAP_NAMESPACE):]
+                elif tag.startswith('{'):
+                    continue  # Élément d'une extension
+                if tag == 'loc':
+                    loc = (element.text or '').strip()
+                elif tag == 'lastmod':
+                    lastmod = parse_lastmod(element.text)
+                elif tag in ('url', 'sitemap'):
+                    if loc:
+                        yield tag, loc, lastmod
+                    loc = lastmod = None
+                    root.clear()  # Libère les éléments déjà lus
+        finally:
+            response.close()
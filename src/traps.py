@@ -0,0 +1,189 @@
+# src/traps.py
+import json
+import logging
+import re
+import zlib
+from collections import Counter
+from urllib.parse import urlsplit, parse_qsl
+
+REPORT_FILE = 'rejections.json'
+
+# Segment ou paramètre qui ressemble à une date (calendriers, archives)
+DATE_PATTERN = re.compile(r'(?:^|[^0-9])(?:19|20)\d{2}[-/_.]?(?:0[1-9]|1[0-2])(?:[^0-9]|$)')
+DATE_PARAMS = frozenset(('date', 'day', 'month', 'year', 'week', 'cal', 'calendar', 'start', 'end'))
+DIGITS = re.compile(r'\d+')
+
+# Verdicts de TrapDetector.check
+ACCEPT, DEPRIORITIZE, DROP = 'accept', 'deprioritize', 'drop'
+
+
+class RejectionReport:
+    """Compte les URLs écartées par motif (chaque URL une seule fois), avec quelques exemples de chacun"""
+
+    EXAMPLES = 5
+
+    def __init__(self, seen=None, on_reject=None):
+        self.seen = seen if seen is not None else set()  # URLs déjà comptées, chacune une seule fois
+        self.counts = Counter()
+        self.examples = {}
+        self.on_reject = on_reject  # Appelé avec le motif (métriques)
+
+    def reject(self, reason, url):
+        if url in self.seen:
+            return
+        self.seen.add(url)
+        self.counts[reason] += 1
+        examples = self.examples.setdefault(reason, [])
+        if len(examples) < self.EXAMPLES:
+            examples.append(url)
+        if self.on_reject is not None:
+            self.on_reject(reason)
+
+    def as_dict(self):
+        return {
+            reason: {'count': count, 'examples': self.examples.get(reason, [])}
+            for reason, count in self.counts.most_common()
+        }
+
+    def dump(self, f):
+        json.dump(self.as_dict(), f, indent=2, ensure_ascii=False)
+
+    def load(self, path):
+        """Reprend les compteurs d'un rapport précédent (mode reprise)"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for reason, entry in json.load(f).items():
+                    self.counts[reason] += entry['count']
+                    self.examples[reason] = entry['examples'][:self.EXAMPLES]
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.error(f"Erreur chargement du rapport de rejets: {str(e)}")
+
+    def log_summary(self):
+        if self.counts:
+            summary = ', '.join(f"{reason}: {count}" for reason, count in self.counts.most_common())
+            logging.info("URLs écartées: %s", summary)
+
+
+class TrapDetector:
+    """Budgets par hôte et par préfixe de chemin, et heuristiques de pièges à crawler.
+
+    check() retourne (verdict, motif) pour une URL sur le point d'être mise en
+    file. Un budget épuisé écarte toujours l'URL; un piège détecté (segments
+    répétés, chemin trop profond, trop de paramètres, paramètre aux valeurs
+    innombrables, calendrier) l'écarte ou la relègue en fin de file selon
+    l'action configurée. admit() compte une URL effectivement mise en file.
+    """
+
+    def __init__(self, config):
+        settings = config.get('traps', {})
+        self.enabled = settings.get('enabled', True)
+        self.action = DEPRIORITIZE if settings.get('action', 'drop') == 'deprioritize' else DROP
+        self.penalty = settings.get('deprioritize_penalty', 100)
+        self.max_per_host = settings.get('max_urls_per_host')
+        self.max_per_prefix = settings.get('max_urls_per_prefix')
+        self.prefix_segments = settings.get('prefix_segments', 2)
+        self.max_path_segments = settings.get('max_path_segments', 20)
+        self.max_segment_repeats = settings.get('max_segment_repeats', 3)
+        self.max_query_params = settings.get('max_query_params', 10)
+        self.max_param_values = settings.get('max_param_values', 200)
+        self.max_calendar_urls = settings.get('max_calendar_urls', 100)
+
+        self.host_counts = Counter()
+        self.prefix_counts = Counter()
+        self.param_values = {}  # (hôte, chemin, paramètre) -> empreintes des valeurs vues
+        self.saturated_params = set()  # Clés dont le nombre de valeurs a dépassé la limite
+        self.calendar_counts = Counter()  # Modèle de chemin daté -> URLs vues
+
+    def prefix(self, host, segments):
+        return host + '/' + '/'.join(segments[:self.prefix_segments])
+
+    def check(self, url):
+        if not self.enabled:
+            return ACCEPT, None
+        parts = urlsplit(url)
+        host = parts.netloc.lower()
+        segments = [segment for segment in parts.path.split('/') if segment]
+
+        if self.max_per_host is not None and self.host_counts[host] >= self.max_per_host:
+            return DROP, 'host_budget'
+        if self.max_per_prefix is not None and self.prefix_counts[self.prefix(host, segments)] >= self.max_per_prefix:
+            return DROP, 'prefix_budget'
+
+        reason = self.trap_reason(host, parts.path, segments, parts.query)
+        if reason is not None:
+            return self.action, reason
+        return ACCEPT, None
+
+    def trap_reason(self, host, path, segments, query):
+        if len(segments) > self.max_path_segments:
+            return 'path_too_deep'
+        if self.has_repeating_segments(segments):
+            return 'repeating_segments'
+        params = parse_qsl(query, keep_blank_values=True) if query else []
+        if len(params) > self.max_query_params:
+            return 'query_params'
+        for name, value in params:
+            key = (host, path, name)
+            if key in self.saturated_params:
+                if zlib.crc32(value.encode('utf-8')) not in self.param_values[key]:
+                    return 'param_cardinality'
+                continue
+            values = self.param_values.setdefault(key, set())
+            values.add(zlib.crc32(value.encode('utf-8')))
+            if len(values) >= self.max_param_values:
+                # Les valeurs déjà vues restent admises, les nouvelles sont écartées
+                self.saturated_params.add(key)
+        if self.is_calendar(path, params):
+            template = host + DIGITS.sub('#', path) + '?' + '&'.join(sorted(name for name, _ in params))
+            self.calendar_counts[template] += 1
+            if self.calendar_counts[template] > self.max_calendar_urls:
+                return 'calendar'
+        return None
+
+    def has_repeating_segments(self, segments):
+        """Vrai si un segment non numérique, ou une suite de segments répétée d'affilée
+        (/a/b/a/b/a/b/a/b), revient plus de max_segment_repeats fois"""
+        words = [segment for segment in segments if not segment.isdigit()]
+        if not words:
+            return False
+        limit = self.max_segment_repeats
+        if Counter(words).most_common(1)[0][1] > limit:
+            return True
+        count = len(segments)
+        for size in range(1, count // (limit + 1) + 1):
+            for start in range(count - (limit + 1) * size + 1):
+                block = segments[start:start + size]
+                if all(s.isdigit() for s in block):
+                    continue
+                repeats = 1
+                while segments[start + repeats * size:start + (repeats + 1) * size] == block:
+                    repeats += 1
+                if repeats > limit:
+                    return True
+        return False
+
+    @staticmethod
+    def is_calendar(path, params):
+        if DATE_PATTERN.search(path):
+            return True
+        return any(name.lower() in DATE_PARAMS and any(c.isdigit() for c in value) for name, value in params)
+
+    def admit(self, url):
+        """Compte une URL mise en file dans les budgets de son hôte et de son préfixe"""
+        if not self.enabled:
+            return
+        parts = urlsplit(url)
+        host = parts.netloc.lower()
+        self.host_counts[host] += 1
+        if self.max_per_prefix is not None:
+            self.prefix_counts[self.prefix(host, [s for s in parts.path.split('/') if s])] += 1
+
+    def state(self):
+        """Compteurs des budgets, pour la sauvegarde d'état"""
+        return {'hosts': dict(self.host_counts), 'prefixes': dict(self.prefix_counts)}
+
+    def restore(self, state):
+        self.host_counts.update(state.get('hosts', {}))
+        self.prefix_counts.update(state.get('prefixes', {}))
@@ -0,0 +1,126 @@
+# src/url_filter.py
+import logging
+import re
+from urllib.parse import urlsplit
+
+
+class URLFilter:
+    """Règles d'inclusion et d'exclusion des URLs, compilées une seule fois au démarrage.
+
+    Les motifs exclus forment une seule expression régulière (alternance de
+    littéraux), les extensions exclues un ensemble interrogé par suffixe du
+    dernier segment du chemin, et chaque URL n'est analysée qu'une fois.
+    Règles d'inclusion optionnelles: préfixes d'URL et expressions régulières
+    (une URL doit en satisfaire au moins une), et profondeur maximale.
+    """
+
+    def __init__(self, config):
+        excluded = config.get('excluded', {})
+        included = config.get('included', {})
+        self.domain = config['domain']['name'].lower()
+        self.max_url_length = config['files']['max_url_length']
+        self.max_depth = config['crawler'].get('max_depth')
+
+        patterns = [pattern.lower() for pattern in excluded.get('patterns', []) if pattern]
+        self.excluded_pattern = self._compile_literals(patterns)
+        self.excluded_extensions = frozenset(ext.lower() for ext in excluded.get('extensions', []) if ext)
+
+        self.included_prefixes = tuple(included.get('prefixes', []))
+        included_patterns = included.get('patterns', [])
+        self.included_pattern = re.compile('|'.join(f"(?:{p})" for p in included_patterns)) if included_patterns else None
+
+    @staticmethod
+    def _compile_literals(literals):
+        if not literals:
+            return None
+        # Les plus longs d'abord: l'alternance s'arrête au premier littéral trouvé
+        return re.compile('|'.join(re.escape(literal) for literal in sorted(set(literals), key=len, reverse=True)))
+
+    @staticmethod
+    def split(url):
+        """(hôte, chemin) d'une URL http(s), ou (None, None) pour un autre schéma.
+
+        Découpage direct, plusieurs fois plus rapide que urlsplit sur les liens absolus
+        produits par l'extracteur; urlsplit reste utilisé pour les cas inhabituels.
+        """
+        if url.startswith('https://'):
+            start = 8
+        elif url.startswith('http://'):
+            start = 7
+        else:
+            return None, None
+        if '\\' in url or '@' in url:
+            parsed = urlsplit(url)
+            return parsed.netloc, parsed.path
+        end = len(url)
+        for separator in '?#':
+            position = url.find(separator, start)
+            if position != -1 and position < end:
+                end = position
+        slash = url.find('/', start, end)
+        if slash == -1:
+            return url[start:end], ''
+        return url[start:slash], url[slash:end]
+
+    def has_excluded_extension(self, path):
+        """Vrai si le dernier segment du chemin (en minuscules) finit par une extension exclue"""
+        if not self.excluded_extensions:
+            return False
+        name = path[path.rfind('/') + 1:]
+        dot = name.find('.')
+        while dot != -1:
+            # Chaque suffixe à partir d'un point: couvre aussi les extensions doubles (.tar.gz)
+            if name[dot:] in self.excluded_extensions:
+                return True
+            dot = name.find('.', dot + 1)
+        return False
+
+    def is_included(self, url):
+        if not self.included_prefixes and self.included_pattern is None:
+            return True
+        if self.included_prefixes and url.startswith(self.included_prefixes):
+            return True
+        return self.included_pattern is not None and self.included_pattern.search(url) is not None
+
+    def rejection(self, url, depth=None):
+        """Motif pour lequel l'URL ne doit pas être explorée, None si elle est acceptée"""
+        if not url or len(url) > self.max_url_length:
+            return 'url_length'
+        if depth is not None and self.max_depth is not None and depth > self.max_depth:
+            return 'max_depth'
+        try:
+            lower_url = url.lower()
+            if self.excluded_pattern is not None and self.excluded_pattern.search(lower_url):
+                return 'excluded_pattern'
+            netloc, path = self.split(lower_url)
+            if not netloc or self.domain not in netloc:
+                return 'out_of_domain'
+            if self.has_excluded_extension(path):
+                return 'excluded_extension'
+            return None if self.is_included(url) else 'not_included'
+        except Exception as e:
+            logging.error(f"Erreur lors de la vérification de l'URL: {str(e)}")
+            return 'invalid'
+
+    def accepts(self, url, depth=None):
+        """Vrai si l'URL doit être explorée (depth: profondeur à laquelle elle serait ajoutée)"""
+        return self.rejection(url, depth) is None
+
+    def filter(self, urls, depth=None):
+        """Liens à explorer parmi ceux d'une page, sans doublons et dans leur ordre d'apparition"""
+        return self.partition(urls, depth)[0]
+
+    def partition(self, urls, depth=None):
+        """(liens acceptés, [(lien, motif)] écartés), sans doublons et dans leur ordre d'apparition"""
+        urls = dict.fromkeys(urls)
+        if depth is not None and self.max_depth is not None and depth > self.max_depth:
+            return [], [(url, 'max_depth') for url in urls]
+        accepted, rejected = [], []
+        rejection = self.rejection
+        for url in urls:
+            reason = rejection(url)
+            if reason is None:
+                accepted.append(url)
+            else:
+                rejected.append((url, reason))
+        return accepted, rejected
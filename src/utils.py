@@ -3,9 +3,17 @@ from src.constants import *
 import yaml
 import logging
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+import atexit
+import json
+import queue
 import sys
 import os
+import threading
+import time
+
+# Modèles de messages suivis au-delà desquels le limiteur repart de zéro
+MAX_RATE_LIMITED_MESSAGES = 10000
 
 def load_config(config_path="config/settings.yaml"):
     """Charge la configuration depuis le fichier YAML"""
@@ -16,21 +24,93 @@ def load_config(config_path="config/settings.yaml"):
         logging.error(f"Erreur lors du chargement de la configuration: {str(e)}")
         raise
 
+class RateLimitFilter(logging.Filter):
+    """Limite le nombre de messages d'un même modèle (logger, niveau, message avant formatage) par intervalle.
+
+    Au-delà de per_message messages dans la fenêtre, les suivants sont supprimés
+    et leur nombre est signalé à l'ouverture de la fenêtre suivante. Les messages
+    plus graves que max_level passent toujours.
+    """
+
+    def __init__(self, per_message=20, interval=10.0, max_level=logging.WARNING):
+        super().__init__()
+        self.per_message = per_message
+        self.interval = interval
+        self.max_level = max_level
+        self.windows = {}  # Modèle -> [début de la fenêtre, messages émis, messages supprimés]
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno > self.max_level:
+            return True
+        key = (record.name, record.levelno, record.msg)
+        now = time.monotonic()
+        suppressed = 0
+        with self.lock:
+            window = self.windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                if window is not None:
+                    suppressed = window[2]
+                elif len(self.windows) >= MAX_RATE_LIMITED_MESSAGES:
+                    self.windows.clear()
+                window = self.windows[key] = [now, 0, 0]
+            if window[1] >= self.per_message:
+                window[2] += 1
+                return False
+            window[1] += 1
+        if suppressed:
+            logging.getLogger(record.name).log(
+                record.levelno, "%s message(s) semblable(s) supprimé(s) en %ss: %s",
+                suppressed, self.interval, record.msg
+            )
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par message (format structuré pour l'ingestion des logs)"""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'thread': record.threadName,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
 def setup_logging(config):
-    """Configure le système de logging avec des handlers multiples et des formats avancés"""
+    """Configure le système de logging: file d'attente vers un thread d'écriture (fichier et console).
+
+    Les threads du crawler ne font que déposer les messages dans une file non
+    bornée (QueueHandler); les écritures disque et console se font dans le
+    thread du QueueListener, arrêté à la sortie du programme. Retourne le listener.
+    """
     try:
+        settings = config.get('logging', {})
         log_dir = config['files'].get('log_dir', 'logs')
         os.makedirs(log_dir, exist_ok=True)
-        log_file = os.path.join(log_dir, f'crawler_log_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log')
+        json_format = settings.get('format', 'text') == 'json'
+        log_file = os.path.join(
+            log_dir, f'crawler_log_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{"jsonl" if json_format else "log"}'
+        )
         
         # Création d'un logger personnalisé
         logger = logging.getLogger()
-        logger.setLevel(logging.INFO)
+        logger.setLevel(settings.get('level', 'INFO').upper())
         
         # Format commun
-        formatter = logging.Formatter(
-            '%(asctime)s - %(levelname)s - [%(threadName)s] - %(message)s'
-        )
+        if json_format:
+            formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter(
+                '%(asctime)s - %(levelname)s - [%(threadName)s] - %(message)s'
+            )
         
         # Handler pour le fichier avec rotation
         file_handler = RotatingFileHandler(
@@ -39,14 +119,31 @@ def setup_logging(config):
             backupCount=config['files']['max_log_backups']
         )
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers = [file_handler]
         
         # Handler pour la console
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        if settings.get('console', True):
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setFormatter(formatter)
+            console_handler.setLevel(settings.get('console_level', 'INFO').upper())
+            handlers.append(console_handler)
+
+        # Les threads déposent les messages, le listener les écrit
+        queue_handler = QueueHandler(queue.SimpleQueue())
+        rate_limit = settings.get('rate_limit', {})
+        if rate_limit.get('enabled', True):
+            queue_handler.addFilter(RateLimitFilter(
+                per_message=rate_limit.get('per_message', 20),
+                interval=rate_limit.get('interval', 10),
+                max_level=logging.getLevelName(rate_limit.get('max_level', 'WARNING').upper())
+            ))
+        listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)  # Vide la file avant la sortie du programme
+        logger.addHandler(queue_handler)
         
         logging.info("Configuration du logging terminée")
+        return listener
     except Exception as e:
         print(f"Erreur lors de la configuration du logging: {str(e)}")
         raise
@@ -0,0 +1,51 @@
+# tests/test_distributed.py
+import json
+import time
+
+import pytest
+
+from src.distributed import RedisFrontierBackend
+
+fakeredis = pytest.importorskip('fakeredis')
+
+
+@pytest.fixture
+def backend():
+    backend = RedisFrontierBackend('redis://localhost:6379/0', shards=1, prefix='test')
+    backend.client = fakeredis.FakeRedis()
+    backend.add([(f"k{i}", f"https://ex.com/{i}", 1, 0, False) for i in range(3)])
+    return backend
+
+
+def lease_expiry(backend, token):
+    return backend.client.zscore(backend._key('leases', 0), token[1])
+
+
+def test_lease_moves_urls_and_records_owner(backend):
+    leased = backend.lease([0], 2, 60, 'a')
+    assert [key for key, _, _, _ in leased] == ['k0', 'k1']
+    assert backend.counts() == (1, 2)
+    owners = backend.client.hgetall(backend._key('owners', 0))
+    assert {json.loads(member)[0]: owner for member, owner in owners.items()} == {'k0': b'a', 'k1': b'a'}
+
+
+def test_renew_ignores_lease_taken_over_by_another_worker(backend):
+    stale = backend.lease([0], 1, -1, 'a')[0][3]
+    taken = backend.lease([0], 1, 60, 'b')[0][3]
+    assert taken[1] == stale[1]
+    expiry = lease_expiry(backend, taken)
+    backend.renew('a', [stale], 600)
+    assert lease_expiry(backend, taken) == expiry
+    backend.renew('b', [taken], 600)
+    assert lease_expiry(backend, taken) > time.time() + 300
+
+
+def test_release_and_complete_only_touch_own_leases(backend):
+    stale = backend.lease([0], 1, -1, 'a')[0][3]
+    taken = backend.lease([0], 1, 60, 'b')[0][3]
+    backend.release([stale])
+    backend.complete([stale])
+    assert lease_expiry(backend, taken) is not None
+    backend.release([taken])
+    assert backend.counts() == (3, 0)
+    assert backend.client.hlen(backend._key('owners', 0)) == 0
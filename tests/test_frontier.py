@@ -0,0 +1,34 @@
+# tests/test_frontier.py
+from src.frontier import URLFrontier
+
+
+def drain(frontier):
+    urls = []
+    while True:
+        entry = frontier.pop()
+        if entry is None:
+            return urls
+        urls.append(entry[0])
+
+
+def test_spill_keeps_fifo_order_at_equal_priority(tmp_path):
+    frontier = URLFrontier(lambda url: url, max_memory=3, spill_path=str(tmp_path / 'spill.db'))
+    frontier.SPILL_BATCH = 2
+    for i in range(8):
+        frontier.push(f"https://ex.com/{i}", depth=1)
+    # La mémoire se libère: les ajouts suivants y vont alors que des URLs plus anciennes sont sur disque
+    assert frontier.pop()[0] == "https://ex.com/0"
+    assert frontier.disk_count
+    for i in range(8, 12):
+        frontier.push(f"https://ex.com/{i}", depth=1)
+    assert drain(frontier) == [f"https://ex.com/{i}" for i in range(1, 12)]
+    frontier.close()
+
+
+def test_spill_serves_lower_priority_first(tmp_path):
+    frontier = URLFrontier(lambda url: url, max_memory=2, spill_path=str(tmp_path / 'spill.db'))
+    frontier.SPILL_BATCH = 1
+    for i, depth in enumerate([2, 2, 1, 0, 1]):
+        frontier.push(f"https://ex.com/{i}", depth=depth)
+    assert drain(frontier) == [f"https://ex.com/{i}" for i in (3, 2, 4, 0, 1)]
+    frontier.close()
@@ -0,0 +1,46 @@
+# tests/test_scheduler.py
+from src.scheduler import HostScheduler
+
+
+def scheduler(**crawler):
+    settings = {'delay_min': 1, 'delay_max': 1, 'max_workers': 5}
+    settings.update(crawler)
+    return HostScheduler({'crawler': settings})
+
+
+def starts(scheduler, duration):
+    """Requêtes parties vers un hôte en duration secondes, réponses instantanées"""
+    now, count = 0.0, 0
+    while now < duration:
+        if scheduler.pop(now=now):
+            count += 1
+            scheduler.release('h')
+        else:
+            now += scheduler.wait_time(now=now)
+    return count
+
+
+def test_delay_applies_per_slot():
+    for slots in (1, 3):
+        tasks = scheduler(per_host_concurrency=slots)
+        for i in range(100):
+            tasks.push('h', i)
+        assert starts(tasks, 10) == 10 * slots
+
+
+def test_concurrency_defaults_to_max_workers():
+    tasks = scheduler()
+    for i in range(10):
+        tasks.push('h', i)
+    assert [tasks.pop(now=0) for _ in range(6)][-1] is None
+    assert tasks.host_state('h').active == 5
+
+
+def test_crawl_delay_spaces_all_slots():
+    tasks = scheduler(per_host_concurrency=3)
+    tasks.set_host_delay('h', 10)
+    for i in range(3):
+        tasks.push('h', i)
+    assert tasks.pop(now=0) == ('h', 0)
+    assert tasks.pop(now=5) is None
+    assert tasks.pop(now=10) == ('h', 1)
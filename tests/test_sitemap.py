@@ -0,0 +1,56 @@
+# tests/test_sitemap.py
+import io
+
+from src.sitemap import SitemapReader
+
+CONFIG = {'timeouts': {'connect': 1, 'read': 1}}
+
+
+class FakeResponse:
+    def __init__(self, body, status_code=200):
+        self.status_code = status_code
+        self.raw = io.BytesIO(body)
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def get(self, url, **kwargs):
+        return FakeResponse(self.documents[url])
+
+
+def read(documents, start):
+    return [(url, lastmod) for url, lastmod in SitemapReader(CONFIG, FakeSession(documents)).read([start])]
+
+
+def test_image_extension_does_not_replace_page_url():
+    document = b'''<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+        xmlns:image="http://www.google.com/schemas/sitemap-image/1.1"
+        xmlns:xhtml="http://www.w3.org/1999/xhtml">
+  <url>
+    <loc>https://ex.com/page</loc>
+    <lastmod>2024-01-02</lastmod>
+    <image:image><image:loc>https://ex.com/img.jpg</image:loc></image:image>
+    <xhtml:link rel="alternate" hreflang="en" href="https://ex.com/en/page"/>
+  </url>
+  <url>
+    <image:image><image:loc>https://ex.com/other.jpg</image:loc></image:image>
+    <loc>https://ex.com/second</loc>
+  </url>
+</urlset>'''
+    entries = read({'https://ex.com/sitemap.xml': document}, 'https://ex.com/sitemap.xml')
+    assert [url for url, _ in entries] == ['https://ex.com/page', 'https://ex.com/second']
+    assert entries[0][1].year == 2024
+    assert entries[1][1] is None
+
+
+def test_sitemap_without_namespace_and_index():
+    index = b'''<sitemapindex><sitemap><loc>/pages.xml</loc></sitemap></sitemapindex>'''
+    pages = b'''<urlset><url><loc>https://ex.com/a</loc></url></urlset>'''
+    documents = {'https://ex.com/sitemap.xml': index, 'https://ex.com/pages.xml': pages}
+    assert read(documents, 'https://ex.com/sitemap.xml') == [('https://ex.com/a', None)]